@@ -0,0 +1,314 @@
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from logging import Logger
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Union
+from openai import pydantic_function_tool
+from pydantic import BaseModel
+from Models.llm_metrics import get_llm_metrics
+
+
+BATCH_ENDPOINT = "/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_json_schema_response_format(response_format: type) -> dict:
+    """
+    Builds the strict JSON schema response format of a pydantic model, as the SDK sends it for `parse()` calls.
+
+    The schema goes through the SDK's public strict-schema transformation (`pydantic_function_tool`: every
+    property required, no additional properties, $refs inlined where needed).
+
+    Args:
+        response_format (type): The pydantic response model.
+
+    Returns:
+        dict: The response format.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": response_format.__name__,
+            "schema": pydantic_function_tool(response_format)["function"]["parameters"],
+            "strict": True
+        }
+    }
+
+
+def build_batch_request(
+        custom_id: str,
+        deployment: str,
+        messages: list,
+        response_format: Union[type, dict, None],
+        temperature: Optional[float] = None
+    ) -> dict:
+    """
+    Builds one line of a Batch API input file.
+
+    Args:
+        custom_id (str): Id used to map the result back to its request.
+        deployment (str): The (batch) deployment name.
+        messages (list): The chat messages.
+        response_format (Union[type, dict, None]): The pydantic response model (sent as a strict JSON schema) or response format dictionary.
+        temperature (Optional[float]): The sampling temperature. Defaults to None (deployment default).
+
+    Returns:
+        dict: The batch request line.
+    """
+    body = {"model": deployment, "messages": messages}
+    if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+        body["response_format"] = build_json_schema_response_format(response_format)
+    elif response_format:
+        body["response_format"] = response_format
+    if temperature is not None:
+        body["temperature"] = temperature
+
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+
+def parse_batch_result(line: dict, response_format: Union[type, dict, None]) -> dict:
+    """
+    Parses one line of a Batch API output file into the structured response.
+
+    Args:
+        line (dict): The batch output line.
+        response_format (Union[type, dict, None]): The pydantic response model, or a response format dictionary.
+
+    Returns:
+        dict: The parsed response.
+    """
+    if line.get("error"):
+        raise RuntimeError(f"Batch request {line.get('custom_id')} failed: {line['error']}")
+
+    response = line.get("response") or {}
+    if response.get("status_code") != 200:
+        raise RuntimeError(f"Batch request {line.get('custom_id')} returned HTTP {response.get('status_code')}: {response.get('body')}")
+
+    content = response["body"]["choices"][0]["message"]["content"]
+    if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+        return response_format.model_validate_json(content).model_dump()
+    return json.loads(content)
+
+
+class BatchRunner:
+    """
+    Runs chat completion requests through the Azure OpenAI Batch API.
+
+    Requests are written to JSONL input files (split to stay under the service's per-file limits), uploaded,
+    submitted as batches, polled until done, and their results mapped back by custom id. The client only needs
+    `files.create`, `files.content`, `batches.create` and `batches.retrieve`, so `LocalBatchEndpoint` can stand
+    in for Azure in tests and benchmarks.
+    """
+
+    def __init__(
+            self,
+            client,
+            batch_dir: str = "./cache/batches",
+            poll_interval_seconds: float = 60.0,
+            max_requests_per_file: int = 50000,
+            max_bytes_per_file: int = 180 * 1024 ** 2,
+            timeout_seconds: float = 24 * 3600.0,
+            logger: Logger = logging.getLogger(__name__)
+        ):
+        """
+        Initializes the runner.
+
+        Args:
+            client: An (Azure) OpenAI client, or a `LocalBatchEndpoint`.
+            batch_dir (str): Directory of the JSONL input files. Defaults to "./cache/batches".
+            poll_interval_seconds (float): Seconds between status polls. Defaults to 60.
+            max_requests_per_file (int): Maximum requests per batch file. Defaults to 50000.
+            max_bytes_per_file (int): Maximum size of a batch file. Defaults to 180 MiB.
+            timeout_seconds (float): Give up polling after this long. Defaults to 24 hours.
+        """
+        self.client = client
+        self.batch_dir = batch_dir
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_requests_per_file = max_requests_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.timeout_seconds = timeout_seconds
+        self.logger = logger
+
+    def write_files(self, requests: List[dict], run_name: str) -> List[str]:
+        """
+        Writes batch requests to JSONL input files.
+
+        Args:
+            requests (List[dict]): Batch request lines (see `build_batch_request`).
+            run_name (str): Prefix of the file names.
+
+        Returns:
+            List[str]: Paths of the written files.
+        """
+        os.makedirs(self.batch_dir, exist_ok=True)
+
+        paths: List[str] = []
+        lines: List[str] = []
+        size = 0
+
+        def flush() -> None:
+            if lines:
+                path = os.path.join(self.batch_dir, f"{run_name}_{len(paths):03d}.jsonl")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.writelines(lines)
+                paths.append(path)
+                lines.clear()
+
+        for request in requests:
+            line = json.dumps(request, ensure_ascii=False) + "\n"
+            line_size = len(line.encode("utf-8"))
+            if lines and (len(lines) >= self.max_requests_per_file or size + line_size > self.max_bytes_per_file):
+                flush()
+                size = 0
+            lines.append(line)
+            size += line_size
+        flush()
+
+        return paths
+
+    def submit(self, paths: List[str]) -> List[str]:
+        """
+        Uploads batch input files and creates one batch per file.
+
+        Args:
+            paths (List[str]): Paths of the JSONL input files.
+
+        Returns:
+            List[str]: The batch ids.
+        """
+        batch_ids = []
+        for path in paths:
+            with open(path, "rb") as file:
+                input_file = self.client.files.create(file=file, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h"
+            )
+            self.logger.info(f"Submitted batch {batch.id} from {path}...")
+            batch_ids.append(batch.id)
+
+        get_llm_metrics().increment("batches_submitted", len(batch_ids))
+        return batch_ids
+
+    def _read_file(self, file_id: Optional[str]) -> List[dict]:
+        if not file_id:
+            return []
+        content = self.client.files.content(file_id)
+        text = content.text if hasattr(content, "text") else content.read().decode("utf-8")
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    def wait(self, batch_ids: List[str]) -> Dict[str, dict]:
+        """
+        Polls batches until they finish and collects their output lines.
+
+        Args:
+            batch_ids (List[str]): The batch ids.
+
+        Returns:
+            Dict[str, dict]: Output (and error) lines by custom id.
+        """
+        deadline = time.monotonic() + self.timeout_seconds
+        pending = list(batch_ids)
+        results: Dict[str, dict] = {}
+
+        while pending:
+            for batch_id in list(pending):
+                batch = self.client.batches.retrieve(batch_id)
+                if batch.status not in TERMINAL_STATUSES:
+                    continue
+
+                pending.remove(batch_id)
+                self.logger.info(f"Batch {batch_id} {batch.status}...")
+                for line in self._read_file(getattr(batch, "output_file_id", None)) + self._read_file(getattr(batch, "error_file_id", None)):
+                    results[line["custom_id"]] = line
+
+            if pending:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Batches still running after {self.timeout_seconds}s: {pending}")
+                time.sleep(self.poll_interval_seconds)
+
+        return results
+
+    def run(self, requests: List[dict], run_name: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Writes, submits and waits for a set of batch requests.
+
+        Args:
+            requests (List[dict]): Batch request lines (see `build_batch_request`).
+            run_name (Optional[str]): Prefix of the batch file names. Defaults to a timestamp.
+
+        Returns:
+            Dict[str, dict]: Output (and error) lines by custom id. Requests without a line were not processed.
+        """
+        if not requests:
+            return {}
+        run_name = run_name or time.strftime("batch_%Y%m%d_%H%M%S")
+        return self.wait(self.submit(self.write_files(requests, run_name)))
+
+
+class LocalBatchEndpoint:
+    """
+    A local stand-in for the Batch API (`files` and `batches` of an OpenAI client), for tests and benchmarks.
+
+    Each batch is processed on a background thread by `responder`, which maps a request body to the chat
+    completion body it should return (or raises to produce an error line).
+    """
+
+    def __init__(self, responder: Callable[[dict], dict], processing_seconds: float = 0.0):
+        """
+        Args:
+            responder (Callable[[dict], dict]): Returns the chat completion body of a request body.
+            processing_seconds (float): Simulated time before a batch completes. Defaults to 0.
+        """
+        self.responder = responder
+        self.processing_seconds = processing_seconds
+        self._files: Dict[str, bytes] = {}
+        self._batches: Dict[str, SimpleNamespace] = {}
+        self._lock = threading.Lock()
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file, purpose: str) -> SimpleNamespace:
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self._lock:
+            self._files[file_id] = file.read()
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def _file_content(self, file_id: str) -> SimpleNamespace:
+        with self._lock:
+            return SimpleNamespace(text=self._files[file_id].decode("utf-8"))
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> SimpleNamespace:
+        batch = SimpleNamespace(id=f"batch-{uuid.uuid4().hex}", status="in_progress", input_file_id=input_file_id, output_file_id=None, error_file_id=None)
+        with self._lock:
+            self._batches[batch.id] = batch
+        threading.Thread(target=self._process, args=(batch,), daemon=True).start()
+        return batch
+
+    def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        with self._lock:
+            return SimpleNamespace(**vars(self._batches[batch_id]))
+
+    def _process(self, batch: SimpleNamespace) -> None:
+        time.sleep(self.processing_seconds)
+        outputs, errors = [], []
+        for line in self._file_content(batch.input_file_id).text.splitlines():
+            request = json.loads(line)
+            try:
+                body = self.responder(request["body"])
+                outputs.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None})
+            except Exception as e:
+                errors.append({"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}})
+
+        output_file = self._create_file(io.BytesIO("".join(json.dumps(line) + "\n" for line in outputs).encode("utf-8")), "batch_output")
+        error_file = self._create_file(io.BytesIO("".join(json.dumps(line) + "\n" for line in errors).encode("utf-8")), "batch_output")
+        with self._lock:
+            batch.output_file_id = output_file.id
+            batch.error_file_id = error_file.id if errors else None
+            batch.status = "completed"
@@ -0,0 +1,158 @@
+from langfuse.openai import AzureOpenAI, AsyncAzureOpenAI # type: ignore
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient # type: ignore
+from dotenv import load_dotenv
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+import asyncio
+import httpx # type: ignore
+import os
+import threading
+import warnings
+
+
+AZURE_ENDPOINT = "https://data-ai-labs.openai.azure.com/"
+AZURE_API_VERSION = "2024-08-01-preview"
+
+T = TypeVar("T")
+
+_instances: Dict[str, Any] = {}
+_registry_lock = threading.RLock()
+_environment_loaded = False
+_pool_size = int(os.getenv("LLM_HTTP_POOL_SIZE", 64))
+
+
+def _load_environment() -> None:
+    """
+    Loads the .env file and silences pydantic warnings, once per process and only when a client is first needed.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        load_dotenv()
+        warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
+        _environment_loaded = True
+
+
+def configure_client_pool(max_connections: int) -> None:
+    """
+    Sizes the keep-alive connection pool of provider clients created from now on. Call it with the run's
+    concurrency before the first request.
+
+    Args:
+        max_connections (int): Maximum number of (keep-alive) connections per client.
+    """
+    global _pool_size
+    with _registry_lock:
+        _pool_size = max(1, max_connections)
+
+
+def get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Returns the process-wide instance registered under a name, creating it with `factory` on first use.
+
+    Args:
+        name (str): Registry name.
+        factory (Callable[[], Any]): Builds the instance.
+
+    Returns:
+        Any: The shared instance.
+    """
+    with _registry_lock:
+        if name not in _instances:
+            _load_environment()
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def get_azure_openai_client() -> AzureOpenAI:
+    """
+    Returns the process-wide Azure OpenAI client. Credentials are read and TLS connections opened once per
+    process, and connections are kept alive in a pool sized by `configure_client_pool` (LLM_HTTP_POOL_SIZE,
+    default 64).
+
+    Returns:
+        AzureOpenAI: The shared client.
+    """
+    def create_client() -> AzureOpenAI:
+        limits = httpx.Limits(max_connections=_pool_size, max_keepalive_connections=_pool_size)
+        return AzureOpenAI(
+            azure_endpoint=AZURE_ENDPOINT,
+            api_key=os.getenv("GPT_KEY"),
+            api_version=AZURE_API_VERSION,
+            http_client=DefaultHttpxClient(limits=limits),
+            max_retries=0  # Retries are handled by GPTModel's RetryPolicy
+        )
+
+    return get_or_create("azure_openai", create_client)
+
+
+def get_async_azure_openai_client() -> AsyncAzureOpenAI:
+    """
+    Returns the process-wide async Azure OpenAI client. It must only be awaited on the shared event loop
+    (see `run_coroutine`), which owns its connection pool.
+
+    Returns:
+        AsyncAzureOpenAI: The shared async client.
+    """
+    def create_client() -> AsyncAzureOpenAI:
+        # Every in-flight async request (see `get_llm_semaphore`) gets its own keep-alive connection
+        pool_size = max(_pool_size, int(os.getenv("LLM_MAX_CONCURRENCY", 32)))
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        return AsyncAzureOpenAI(
+            azure_endpoint=AZURE_ENDPOINT,
+            api_key=os.getenv("GPT_KEY"),
+            api_version=AZURE_API_VERSION,
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+            max_retries=0  # Retries are handled by GPTModel's RetryPolicy
+        )
+
+    return get_or_create("async_azure_openai", create_client)
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process-wide event loop, running on a daemon thread. Async clients and semaphores are bound
+    to this single loop, so item worker threads can share them.
+
+    Returns:
+        asyncio.AbstractEventLoop: The shared, running event loop.
+    """
+    def create_loop() -> asyncio.AbstractEventLoop:
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return loop
+
+    return get_or_create("event_loop", create_loop)
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """
+    Returns the process-wide semaphore bounding in-flight async LLM requests across every item
+    (LLM_MAX_CONCURRENCY, default 32).
+
+    Returns:
+        asyncio.Semaphore: The shared semaphore, bound to the shared event loop.
+    """
+    return get_or_create("llm_semaphore", lambda: asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", 32))))
+
+
+def run_coroutine(coroutine: Awaitable[T]) -> T:
+    """
+    Runs a coroutine on the shared event loop and blocks the calling (worker) thread until it completes.
+
+    Args:
+        coroutine (Awaitable[T]): The coroutine to run.
+
+    Returns:
+        T: The coroutine result.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
+
+def reset_client_registry() -> None:
+    """
+    Drops every registered client and model (and stops the shared event loop) so the next call builds new ones.
+    """
+    with _registry_lock:
+        loop = _instances.get("event_loop")
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        _instances.clear()
@@ -0,0 +1,223 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Optional
+from Models.client_registry import get_or_create
+from Models.llm_metrics import get_llm_metrics
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    Whether an error means the deployment is overloaded: rate limits (429), server errors (5xx) and timeouts.
+
+    Args:
+        error (BaseException): The error raised by a request.
+
+    Returns:
+        bool: True for overload errors.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in type(error).__name__:
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+class AdaptiveConcurrencyController:
+    """
+    An AIMD (additive increase, multiplicative decrease) limit on in-flight LLM requests.
+
+    Every completed request is a signal: a fast success raises the limit by about one per limit's worth of
+    requests, a 429/5xx or timeout cuts it by `decrease_factor`. Decreases happen at most once per window of
+    in-flight requests (requests started before the last cut don't cut again), so one burst of 429s halves
+    the limit once instead of collapsing it. Slow successes (above `latency_target_seconds`) hold the limit.
+    Sync and async callers wait in the same FIFO queue.
+    """
+
+    def __init__(
+            self,
+            initial_limit: int = 8,
+            min_limit: int = 1,
+            max_limit: int = 64,
+            decrease_factor: float = 0.5,
+            latency_target_seconds: Optional[float] = 30,
+            clock: Callable[[], float] = time.monotonic
+        ):
+        """
+        Initializes the controller.
+
+        Args:
+            initial_limit (int): Starting concurrency limit. Defaults to 8.
+            min_limit (int): Lowest concurrency limit. Defaults to 1.
+            max_limit (int): Highest concurrency limit. Defaults to 64.
+            decrease_factor (float): Multiplier applied to the limit on overload. Defaults to 0.5.
+            latency_target_seconds (Optional[float]): Successes slower than this don't raise the limit. Defaults to 30.
+            clock (Callable[[], float]): Monotonic clock in seconds. Defaults to time.monotonic.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_target_seconds = latency_target_seconds
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = -math.inf
+        self._waiters: deque = deque()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """
+        The current concurrency limit.
+        """
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        The number of requests currently holding a slot.
+        """
+        return self._in_flight
+
+    def _publish(self) -> None:
+        metrics = get_llm_metrics()
+        metrics.set_gauge("concurrency_limit", int(self._limit))
+        metrics.set_gauge("concurrency_in_flight", self._in_flight)
+
+    def _grant_waiters(self) -> None:
+        # Called with the lock held
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(lambda future=future: future.done() or future.set_result(None))
+
+    def acquire(self) -> None:
+        """
+        Blocks the calling thread until a slot is free.
+        """
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                self._publish()
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        """
+        Waits (without blocking the event loop) until a slot is free.
+        """
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                self._publish()
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter not in self._waiters
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self._release_slot()
+            raise
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._grant_waiters()
+            self._publish()
+
+    def release(self, started_at: float, error: Optional[BaseException] = None) -> None:
+        """
+        Frees a slot and adapts the limit to the request's outcome.
+
+        Args:
+            started_at (float): Clock time the request was sent.
+            error (Optional[BaseException]): The error raised by the request, None on success.
+        """
+        now = self._clock()
+        with self._lock:
+            self._in_flight -= 1
+
+            if error is not None and is_overload_error(error):
+                # Multiplicative decrease, once per window of in-flight requests
+                if started_at >= self._last_decrease:
+                    self._limit = max(self.min_limit, math.floor(self._limit * self.decrease_factor))
+                    self._last_decrease = now
+                    get_llm_metrics().increment("concurrency_decreases")
+            elif error is None:
+                latency = now - started_at
+                if self.latency_target_seconds is None or latency <= self.latency_target_seconds:
+                    # Additive increase: about +1 per limit's worth of healthy requests
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+            self._grant_waiters()
+            self._publish()
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds a slot for the duration of a sync request and feeds its outcome back to the limit.
+        """
+        self.acquire()
+        started_at = self._clock()
+        try:
+            yield
+        except BaseException as e:
+            self.release(started_at, e)
+            raise
+        self.release(started_at)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """
+        Holds a slot for the duration of an async request and feeds its outcome back to the limit.
+        """
+        await self.aacquire()
+        started_at = self._clock()
+        try:
+            yield
+        except BaseException as e:
+            self.release(started_at, e)
+            raise
+        self.release(started_at)
+
+
+def get_concurrency_controller() -> Optional[AdaptiveConcurrencyController]:
+    """
+    Returns the process-wide concurrency controller of LLM requests, configured from the environment:
+        LLM_CONCURRENCY_ADAPTIVE: "0" disables the controller (default "1").
+        LLM_CONCURRENCY_INITIAL: starting limit (default 8).
+        LLM_CONCURRENCY_MAX: highest limit (default LLM_MAX_CONCURRENCY, else 32).
+        LLM_LATENCY_TARGET_SECONDS: latency above which the limit stops growing (default 30).
+
+    Returns:
+        Optional[AdaptiveConcurrencyController]: The shared controller, or None if disabled.
+    """
+    if os.getenv("LLM_CONCURRENCY_ADAPTIVE", "1") == "0":
+        return None
+
+    return get_or_create(
+        "concurrency_controller",
+        lambda: AdaptiveConcurrencyController(
+            initial_limit=int(os.getenv("LLM_CONCURRENCY_INITIAL", 8)),
+            max_limit=int(os.getenv("LLM_CONCURRENCY_MAX", os.getenv("LLM_MAX_CONCURRENCY", 32))),
+            latency_target_seconds=float(os.getenv("LLM_LATENCY_TARGET_SECONDS", 30))
+        )
+    )
@@ -1,32 +1,44 @@
-import time
-from langfuse.openai import AzureOpenAI # type: ignore
-import os
-from typing import Type, Union
+from langfuse.openai import AzureOpenAI, AsyncAzureOpenAI # type: ignore
+import asyncio
+import threading
+from contextlib import nullcontext
+from typing import Optional, Tuple, Type, Union
 from Workflow.structured_outputs import *
 from pydantic import BaseModel
-from dotenv import load_dotenv
-import warnings
 from Tools.tools import count_tokens
-load_dotenv()
+from Models.response_cache import ResponseCache, get_response_cache
+from Models.client_registry import get_async_azure_openai_client, get_azure_openai_client, get_or_create
+from Models.llm_metrics import get_cached_tokens, get_llm_metrics
+from Models.rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+from Models.concurrency_controller import AdaptiveConcurrencyController, get_concurrency_controller
+from Models.retry_policy import RetryPolicy
+from Models.hedging import HedgeRejected, get_request_hedger
 
 class GPTModel():
     def __init__(
         self,
         json_mode: bool = True,
+        response_cache: Optional[ResponseCache] = None,
+        client: Optional[AzureOpenAI] = None,
+        async_client: Optional[AsyncAzureOpenAI] = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        concurrency_controller: Optional[AdaptiveConcurrencyController] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         """
         Initializes the GPTModel with the specified parameters.
 
+        The model holds no per-request state, so one instance can be shared by every worker thread.
+
         Args:
-            key (str): The API key for authenticating with Azure OpenAI.
             json_mode (bool, optional): Whether to enable JSON mode for responses. Defaults to True.
-            system_instruction (str | None, optional): An optional system instruction to initialize the messages.
-            tools (Optional[List], optional): List of tools for function calling. If provided, function calling will be enabled.
-            rate_limit_per_minute (int, optional): Maximum number of API requests per minute. Defaults to 20.
+            response_cache (Optional[ResponseCache], optional): Cache of structured responses. Defaults to the process-wide cache.
+            client (Optional[AzureOpenAI], optional): Azure OpenAI client. Defaults to the process-wide client.
+            async_client (Optional[AsyncAzureOpenAI], optional): Async Azure OpenAI client. Defaults to the process-wide async client.
+            rate_limiter (Optional[TokenBucketRateLimiter], optional): RPM/TPM limiter of the deployment. Defaults to the process-wide limiter.
+            concurrency_controller (Optional[AdaptiveConcurrencyController], optional): Adaptive limit on in-flight requests. Defaults to the process-wide controller.
+            retry_policy (Optional[RetryPolicy], optional): Retries of rate limited and transient errors. Defaults to RetryPolicy().
         """
-        # Ignore pydantic filter warnings
-        warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
-
         # JSON mode is enabled if tools are provided or json_mode is explicitly set to True
         self.response_format: Union[BaseModel, dict, None] = {"type": "json_object"} if json_mode else None
 
@@ -34,85 +46,284 @@ class GPTModel():
         self.token_usage = {
             'completion_tokens': 0,
             'prompt_tokens': 0,
-            'total_tokens': 0
+            'total_tokens': 0,
+            'cached_prompt_tokens': 0
         }
+        self._usage_lock = threading.Lock()
 
-        # Initialize the Azure OpenAI client with the provided API key and endpoint
-        self.client = AzureOpenAI(
-                azure_endpoint="https://data-ai-labs.openai.azure.com/",
-                api_key=os.getenv("GPT_KEY"),
-                api_version="2024-08-01-preview",
-            )
+        # Responses already answered in earlier runs are served from disk
+        self.deployment = "wesel-4o"
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+
+        # Reuse the process-wide Azure OpenAI client and its connection pool
+        self.client = client if client is not None else get_azure_openai_client()
+        self._async_client = async_client
+
+        # Requests and tokens are reserved against the deployment's quota before each call
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+
+        # In-flight requests adapt to the deployment's latency and 429/5xx errors
+        self.concurrency_controller = concurrency_controller if concurrency_controller is not None else get_concurrency_controller()
+
+        # Rate limits and transient errors are retried within a time budget
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+
+    @property
+    def async_client(self) -> AsyncAzureOpenAI:
+        """
+        The async Azure OpenAI client, resolved on first use so sync-only callers never build it.
+        """
+        if self._async_client is None:
+            self._async_client = get_async_azure_openai_client()
+        return self._async_client
 
-    def generate_response(self, system_instruction: str, user_instruction:str, response_format:BaseModel, temperature:float = 0.2, max_retries:int = 3) -> dict:
+    def record_usage(self, usage: Optional[dict]) -> None:
         """
-        Generates a response based on the provided messages and appends it to the message history.
+        Adds the token usage of one completion to this model's and the run's counters.
 
-        This method sends the accumulated messages to the Azure OpenAI client to get a completion
-        and then processes the response. It updates the internal message history with the new
-        response and returns either the tool calls (if any are present) or the response content.
+        Args:
+            usage (Optional[dict]): The completion usage.
+        """
+        usage = dict(usage or {})
+        # Prompt tokens served from the provider's prompt cache (requests sharing a stable prefix)
+        usage['cached_prompt_tokens'] = get_cached_tokens(usage)
+        with self._usage_lock:
+            self.token_usage = {
+                key: self.token_usage[key] + (usage.get(key) or 0)
+                for key in self.token_usage
+            }
+        get_llm_metrics().record_usage(usage)
+
+    def prepare_request(self, system_instruction: str, user_instruction: str, response_format: BaseModel, temperature: float = 0.2, cache_mode: Optional[str] = None) -> Tuple[list, Union[BaseModel, dict, None], int, Optional[str], Optional[dict]]:
+        """
+        Builds the messages of a request and looks it up in the response cache. Shared by the sync and async paths.
 
         Args:
-            messages (list[dict], optional): A list of message dictionaries to be appended to
-                                           the current message history. Defaults to an empty list.
+            system_instruction (str): The system prompt.
+            user_instruction (str): The user message.
+            response_format (BaseModel): The pydantic model the response is parsed into. Defaults to the JSON mode format when empty.
+            temperature (float, optional): The sampling temperature. Defaults to 0.2.
+            cache_mode (Optional[str], optional): Response cache mode for this call. Defaults to the cache's configured mode.
 
         Returns:
-            str | list[dict]: The response content as a string or a list of tool calls if tool
-                           calls are present in the response.
+            Tuple[list, Union[BaseModel, dict, None], int, Optional[str], Optional[dict]]: The messages, the response format,
+                the prompt token count, the cache key (None without a cache) and the cached response (None on a miss).
         """
-        # Add the new messages to the message history
-        self.messages = []
+        messages = []
 
         if system_instruction:
-            self.messages.append({
+            messages.append({
                         "role": "system",
                         "content": system_instruction
                     })
-        
+
         if user_instruction:
-            self.messages.append({
+            messages.append({
                         "role": "user",
                         "content": user_instruction
                     })
-        
-        if response_format:
-            self.response_format = response_format
 
-        retries = 0
-        while retries < max_retries:
-            try:
+        response_format = response_format or self.response_format
 
-                # Token limiter
-                total_tokens = count_tokens(str(self.messages))
-                if total_tokens > 100000:
-                    self.messages = [message for message in self.messages if message['role'] != 'user']
-                    self.messages.append({
-                        "role": "user",
-                        "content": user_instruction[:100000]
-                    })
+        # Token limiter
+        total_tokens = count_tokens(str(messages))
+        if total_tokens > 100000:
+            messages = [message for message in messages if message['role'] != 'user']
+            messages.append({
+                "role": "user",
+                "content": user_instruction[:100000]
+            })
+            total_tokens = count_tokens(str(messages))
+
+        # Response cache
+        cache_key, cached_response = None, None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(self.deployment, messages, response_format, temperature)
+            cached_response = self.response_cache.get(cache_key, mode=cache_mode)
+            if cached_response is not None:
+                get_llm_metrics().increment("cache_hits")
+
+        return messages, response_format, total_tokens, cache_key, cached_response
 
+    def reserve_tokens(self, prompt_tokens: int) -> int:
+        """
+        Blocks until the rate limiter admits a request of `prompt_tokens` plus its estimated completion.
+
+        Args:
+            prompt_tokens (int): Prompt size of the request.
+
+        Returns:
+            int: Reserved tokens, to be reconciled by `complete_response` (0 without a limiter).
+        """
+        if self.rate_limiter is None:
+            return 0
+        reserved_tokens = self.rate_limiter.estimate_tokens(prompt_tokens)
+        get_llm_metrics().increment("rate_limit_wait_seconds", self.rate_limiter.acquire(reserved_tokens))
+        return reserved_tokens
+
+    def try_reserve_tokens(self, prompt_tokens: int) -> int:
+        """
+        Reserves tokens only if the rate limiter can admit the request right away (used by hedges).
+
+        Args:
+            prompt_tokens (int): Prompt size of the request.
+
+        Returns:
+            int: Reserved tokens (0 without a limiter).
+        """
+        if self.rate_limiter is None:
+            return 0
+        reserved_tokens = self.rate_limiter.estimate_tokens(prompt_tokens)
+        if self.rate_limiter.try_acquire(reserved_tokens) > 0:
+            raise HedgeRejected("Rate limiter has no spare quota for a hedge")
+        return reserved_tokens
+
+    async def areserve_tokens(self, prompt_tokens: int) -> int:
+        """
+        Async variant of `reserve_tokens`.
+
+        Args:
+            prompt_tokens (int): Prompt size of the request.
+
+        Returns:
+            int: Reserved tokens, to be reconciled by `complete_response` (0 without a limiter).
+        """
+        if self.rate_limiter is None:
+            return 0
+        reserved_tokens = self.rate_limiter.estimate_tokens(prompt_tokens)
+        get_llm_metrics().increment("rate_limit_wait_seconds", await self.rate_limiter.aacquire(reserved_tokens))
+        return reserved_tokens
+
+    def release_tokens(self, reserved_tokens: int, prompt_tokens: int) -> None:
+        """
+        Settles the reservation of a request cancelled before it returned (e.g. the losing request of a hedge),
+        which never gets a usage to reconcile: only its prompt is charged, the estimated completion is refunded.
+
+        Args:
+            reserved_tokens (int): Tokens reserved with the rate limiter.
+            prompt_tokens (int): Prompt size of the request.
+        """
+        if self.rate_limiter is not None and reserved_tokens:
+            self.rate_limiter.reconcile(reserved_tokens, {"total_tokens": prompt_tokens})
+
+    def complete_response(self, structured_response, cache_key: Optional[str] = None, cache_mode: Optional[str] = None, reserved_tokens: int = 0) -> dict:
+        """
+        Records the usage of a completion, caches its parsed output and returns it. Shared by the sync and async paths.
+
+        Args:
+            structured_response: The parsed chat completion.
+            cache_key (Optional[str], optional): The request's cache key. Defaults to None (not cached).
+            cache_mode (Optional[str], optional): Response cache mode for this call. Defaults to the cache's configured mode.
+            reserved_tokens (int, optional): Tokens reserved with the rate limiter. Defaults to 0.
+
+        Returns:
+            dict: The parsed response.
+        """
+        # Capture token usage
+        usage = dict(structured_response.usage)
+        self.record_usage(usage)
+        if self.rate_limiter is not None and reserved_tokens:
+            self.rate_limiter.reconcile(reserved_tokens, usage)
+
+        parsed = structured_response.choices[0].message.parsed
+        response = parsed.model_dump() if isinstance(parsed, BaseModel) else dict(parsed)
+        if cache_key is not None:
+            self.response_cache.put(cache_key, response, mode=cache_mode)
+
+        return response
+
+    def generate_response(self, system_instruction: str, user_instruction:str, response_format:BaseModel, temperature:float = 0.2, max_retries: Optional[int] = None, cache_mode: Optional[str] = None) -> dict:
+        """
+        Generates a structured response for a system and user instruction.
+
+        Args:
+            system_instruction (str): The system prompt.
+            user_instruction (str): The user message.
+            response_format (BaseModel): The pydantic model the response is parsed into. Defaults to the JSON mode format when empty.
+            temperature (float, optional): The sampling temperature. Defaults to 0.2.
+            max_retries (Optional[int], optional): Maximum number of attempts. Defaults to the retry policy's.
+            cache_mode (Optional[str], optional): Response cache mode for this call ("use", "refresh" or "bypass").
+                                           Defaults to the cache's configured mode.
+
+        Returns:
+            dict: The parsed response.
+        """
+        messages, response_format, prompt_tokens, cache_key, cached_response = self.prepare_request(
+            system_instruction, user_instruction, response_format, temperature, cache_mode
+        )
+        if cached_response is not None:
+            return cached_response
+
+        def attempt(timeout: float) -> dict:
+            reserved_tokens = self.reserve_tokens(prompt_tokens)
+            with self.concurrency_controller.slot() if self.concurrency_controller else nullcontext():
                 structured_response = self.client.beta.chat.completions.parse(
-                    model="wesel-4o",
-                    messages=self.messages,
-                    response_format=self.response_format,
-                    timeout=60,
+                    model=self.deployment,
+                    messages=messages,
+                    response_format=response_format,
+                    timeout=timeout,
                     user_id='wesel-4o-parser'
                 )
+            return self.complete_response(structured_response, cache_key, cache_mode, reserved_tokens)
+
+        return self.retry_policy.call(attempt, max_attempts=max_retries)
+
+    async def agenerate_response(self, system_instruction: str, user_instruction:str, response_format:BaseModel, temperature:float = 0.2, max_retries: Optional[int] = None, cache_mode: Optional[str] = None, hedge: bool = False) -> dict:
+        """
+        Async variant of `generate_response`, using the async Azure OpenAI client. Must run on the shared
+        event loop (`Models.client_registry.run_coroutine`).
+
+        Args:
+            system_instruction (str): The system prompt.
+            user_instruction (str): The user message.
+            response_format (BaseModel): The pydantic model the response is parsed into. Defaults to the JSON mode format when empty.
+            temperature (float, optional): The sampling temperature. Defaults to 0.2.
+            max_retries (Optional[int], optional): Maximum number of attempts. Defaults to the retry policy's.
+            cache_mode (Optional[str], optional): Response cache mode for this call ("use", "refresh" or "bypass").
+                                           Defaults to the cache's configured mode.
+            hedge (bool, optional): Whether to send a duplicate request when this one is slower than recent
+                                           requests (see `Models.hedging.RequestHedger`). Defaults to False.
+
+        Returns:
+            dict: The parsed response.
+        """
+        messages, response_format, prompt_tokens, cache_key, cached_response = self.prepare_request(
+            system_instruction, user_instruction, response_format, temperature, cache_mode
+        )
+        if cached_response is not None:
+            return cached_response
+
+        async def attempt(timeout: float, hedged: bool = False) -> dict:
+            reserved_tokens = self.try_reserve_tokens(prompt_tokens) if hedged else await self.areserve_tokens(prompt_tokens)
+            try:
+                async with self.concurrency_controller.aslot() if self.concurrency_controller else nullcontext():
+                    structured_response = await self.async_client.beta.chat.completions.parse(
+                        model=self.deployment,
+                        messages=messages,
+                        response_format=response_format,
+                        timeout=timeout,
+                        user_id='wesel-4o-parser'
+                    )
+            except asyncio.CancelledError:
+                self.release_tokens(reserved_tokens, prompt_tokens)
+                raise
+            return self.complete_response(structured_response, cache_key, cache_mode, reserved_tokens)
+
+        if hedge:
+            hedger = get_request_hedger()
+            return await self.retry_policy.acall(
+                lambda timeout: hedger.run(lambda: attempt(timeout), lambda: attempt(timeout, hedged=True)),
+                max_attempts=max_retries
+            )
+
+        return await self.retry_policy.acall(attempt, max_attempts=max_retries)
+
+
+def get_gpt_model() -> GPTModel:
+    """
+    Returns the process-wide GPTModel shared by the parser and finalizer of every item.
 
-                                # Capture token usage
-                token_usage = dict(structured_response.usage)
-                self.token_usage = {
-                    'completion_tokens': self.token_usage['completion_tokens'] + token_usage['completion_tokens'],
-                    'prompt_tokens': self.token_usage['prompt_tokens'] + token_usage['prompt_tokens'],
-                    'total_tokens': self.token_usage['total_tokens'] + token_usage['total_tokens']
-                }
-
-                return dict(structured_response.choices[0].message.parsed)
-            except TimeoutError:
-                retries += 1
-                time.sleep(2 ** retries)  # Exponential backoff
-                print(f"Retrying... Attempt {retries}")
-            except Exception as e:
-                raise e
-        raise Exception("Request timed out after multiple retries.")
-    
+    Returns:
+        GPTModel: The shared model.
+    """
+    return get_or_create("gpt_model", lambda: GPTModel())
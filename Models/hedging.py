@@ -0,0 +1,177 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+from Models.client_registry import get_or_create
+from Models.llm_metrics import get_llm_metrics
+
+
+T = TypeVar("T")
+
+
+class HedgeRejected(Exception):
+    """
+    Raised by a hedge request that could not be admitted right away (e.g. the rate limiter is saturated).
+    """
+
+
+class LatencyTracker:
+    """
+    A thread-safe rolling window of recent request latencies.
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Args:
+            window (int): Number of recent latencies kept. Defaults to 200.
+        """
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        """
+        Args:
+            latency (float): Latency of a completed (or cancelled) request in seconds.
+        """
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Args:
+            percentile (float): Percentile in [0, 100].
+            min_samples (int): Samples required for an estimate. Defaults to 1.
+
+        Returns:
+            Optional[float]: The latency percentile, or None with too few samples.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies or len(latencies) < min_samples:
+            return None
+        index = min(len(latencies) - 1, max(0, math.ceil(percentile / 100 * len(latencies)) - 1))
+        return latencies[index]
+
+
+class RequestHedger:
+    """
+    Hedged requests for the async LLM path.
+
+    If a request hasn't returned by the `percentile` of recent latencies, a duplicate (hedge) is sent and the
+    first valid response wins; the other request is cancelled. Hedges go through the same rate limiter as
+    every request and are skipped (HedgeRejected) when it can't admit them right away, so hedging only
+    spends spare quota. Reports hedge_requests, hedges, hedge_wins and hedges_rejected to LLMMetrics.
+    """
+
+    def __init__(
+            self,
+            percentile: float = 95,
+            window: int = 200,
+            min_samples: int = 20,
+            min_delay_seconds: float = 1.0
+        ):
+        """
+        Initializes the hedger.
+
+        Args:
+            percentile (float): Latency percentile after which a hedge is sent. Defaults to 95.
+            window (int): Number of recent latencies considered. Defaults to 200.
+            min_samples (int): Latencies needed before hedging starts. Defaults to 20.
+            min_delay_seconds (float): Shortest wait before hedging. Defaults to 1.
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay_seconds = min_delay_seconds
+        self.latencies = LatencyTracker(window)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: Seconds to wait before hedging, or None while there are too few latencies.
+        """
+        delay = self.latencies.percentile(self.percentile, self.min_samples)
+        return None if delay is None else max(self.min_delay_seconds, delay)
+
+    async def _timed(self, request: Callable[[], Awaitable[T]]) -> T:
+        started_at = time.monotonic()
+        try:
+            result = await request()
+        except asyncio.CancelledError:
+            # A losing request is cancelled: its elapsed time is a lower bound of its latency, recorded so the
+            # window doesn't only see fast winners (which would keep lowering the hedge delay)
+            self.latencies.record(time.monotonic() - started_at)
+            raise
+        self.latencies.record(time.monotonic() - started_at)
+        return result
+
+    async def run(
+            self,
+            request: Callable[[], Awaitable[T]],
+            hedge_request: Optional[Callable[[], Awaitable[T]]] = None,
+            is_valid: Callable[[T], bool] = lambda result: result is not None
+        ) -> T:
+        """
+        Runs a request, hedging it if it is slow.
+
+        Args:
+            request (Callable[[], Awaitable[T]]): Sends the primary request.
+            hedge_request (Optional[Callable[[], Awaitable[T]]]): Sends the hedge. Defaults to `request`.
+            is_valid (Callable[[T], bool]): Whether a response can win. Defaults to not None.
+
+        Returns:
+            T: The first valid response.
+        """
+        metrics = get_llm_metrics()
+        metrics.increment("hedge_requests")
+
+        primary = asyncio.ensure_future(self._timed(request))
+        delay = self.hedge_delay()
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        metrics.increment("hedges")
+        hedge = asyncio.ensure_future(self._timed(hedge_request or request))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and is_valid(task.result()):
+                        if task is hedge:
+                            metrics.increment("hedge_wins")
+                        return task.result()
+                    if task is hedge and isinstance(task.exception(), HedgeRejected):
+                        metrics.increment("hedges_rejected")
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Neither request produced a valid response
+        if primary.exception() is not None:
+            raise primary.exception()
+        return primary.result()
+
+
+def get_request_hedger() -> RequestHedger:
+    """
+    Returns the process-wide request hedger, configured from the environment:
+        LLM_HEDGE_PERCENTILE: latency percentile after which a hedge is sent (default 95).
+        LLM_HEDGE_MIN_DELAY_SECONDS: shortest wait before hedging (default 1).
+
+    Returns:
+        RequestHedger: The shared hedger.
+    """
+    return get_or_create(
+        "request_hedger",
+        lambda: RequestHedger(
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", 95)),
+            min_delay_seconds=float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", 1))
+        )
+    )
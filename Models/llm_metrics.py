@@ -0,0 +1,98 @@
+import threading
+from typing import Dict, Optional
+
+
+def get_cached_tokens(usage: Optional[dict]) -> int:
+    """
+    Reads the prompt tokens served from the provider's prompt cache out of a completion usage.
+
+    Args:
+        usage (Optional[dict]): The completion usage, as returned by the SDK or a Batch API output line.
+
+    Returns:
+        int: The cached prompt tokens (0 when not reported).
+    """
+    details = (usage or {}).get("prompt_tokens_details")
+    if details is None:
+        return 0
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
+
+
+class LLMMetrics:
+    """
+    Thread-safe, run-level LLM counters (token usage, requests, cache hits, ...) shared by every model call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): Counter name.
+            value (float): Amount to add. Defaults to 1.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Sets a gauge to its current value.
+
+        Args:
+            name (str): Gauge name.
+            value (float): Current value.
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def record_usage(self, usage: Optional[dict]) -> None:
+        """
+        Adds the token usage of one completion to the counters.
+
+        Args:
+            usage (Optional[dict]): The completion usage (completion_tokens, prompt_tokens, total_tokens, prompt_tokens_details).
+        """
+        usage = usage or {}
+        cached_tokens = get_cached_tokens(usage)
+        with self._lock:
+            for key in ("completion_tokens", "prompt_tokens", "total_tokens"):
+                self._counters[key] = self._counters.get(key, 0) + (usage.get(key) or 0)
+            self._counters["cached_prompt_tokens"] = self._counters.get("cached_prompt_tokens", 0) + cached_tokens
+            self._counters["requests"] = self._counters.get("requests", 0) + 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: A copy of every counter and gauge, plus the prompt cache hit rate (cached / prompt tokens).
+        """
+        with self._lock:
+            snapshot = {**self._counters, **self._gauges}
+        if snapshot.get("prompt_tokens"):
+            snapshot["prompt_cache_hit_rate"] = snapshot.get("cached_prompt_tokens", 0) / snapshot["prompt_tokens"]
+        return snapshot
+
+    def reset(self) -> None:
+        """
+        Clears every counter and gauge.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+_metrics = LLMMetrics()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """
+    Returns:
+        LLMMetrics: The process-wide LLM metrics.
+    """
+    return _metrics
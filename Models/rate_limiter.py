@@ -0,0 +1,153 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Optional
+from Models.client_registry import get_or_create
+
+
+class TokenBucketRateLimiter:
+    """
+    A requests-per-minute and tokens-per-minute token bucket shared by every LLM call of the process.
+
+    Each call reserves one request slot and its estimated prompt + completion tokens before it is sent, and
+    is reconciled with the real `usage` afterwards (unused tokens are refunded, overruns are charged). Both
+    buckets refill continuously, so throughput stays at the quota instead of bursting into 429s.
+    The core (`try_acquire`) never blocks and returns how long to wait, so it serves sync and async callers alike.
+    """
+
+    def __init__(
+            self,
+            requests_per_minute: float,
+            tokens_per_minute: float,
+            completion_tokens_estimate: float = 500,
+            clock: Callable[[], float] = time.monotonic
+        ):
+        """
+        Initializes full buckets.
+
+        Args:
+            requests_per_minute (float): Request quota of the deployment.
+            tokens_per_minute (float): Token quota of the deployment.
+            completion_tokens_estimate (float): Initial completion size estimate, refined from real usage. Defaults to 500.
+            clock (Callable[[], float]): Monotonic clock in seconds. Defaults to time.monotonic.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.completion_tokens_estimate = completion_tokens_estimate
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def estimate_tokens(self, prompt_tokens: int) -> int:
+        """
+        Args:
+            prompt_tokens (int): Prompt size of the request.
+
+        Returns:
+            int: Estimated prompt + completion tokens of the request.
+        """
+        return int(prompt_tokens + self.completion_tokens_estimate)
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Reserves a request slot and `tokens` if both are available.
+
+        Args:
+            tokens (int): Estimated tokens of the request (capped at the per-minute quota).
+
+        Returns:
+            float: 0 if the reservation was made, otherwise the seconds to wait before trying again.
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        with self._lock:
+            self._refill()
+            if self._requests >= 1 and self._tokens >= tokens:
+                self._requests -= 1
+                self._tokens -= tokens
+                return 0.0
+
+            request_wait = max(0.0, 1 - self._requests) * 60 / self.requests_per_minute
+            token_wait = max(0.0, tokens - self._tokens) * 60 / self.tokens_per_minute
+            return max(request_wait, token_wait, 0.001)
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Blocks the calling thread until the request is reserved.
+
+        Args:
+            tokens (int): Estimated tokens of the request.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while (wait := self.try_acquire(tokens)) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    async def aacquire(self, tokens: int) -> float:
+        """
+        Async variant of `acquire`, yielding to the event loop while waiting.
+
+        Args:
+            tokens (int): Estimated tokens of the request.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while (wait := self.try_acquire(tokens)) > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+    def reconcile(self, reserved_tokens: int, usage: Optional[dict]) -> None:
+        """
+        Settles a reservation against the real usage of the completed request, and refines the completion estimate.
+
+        Args:
+            reserved_tokens (int): Tokens reserved for the request.
+            usage (Optional[dict]): The completion usage (completion_tokens, total_tokens).
+        """
+        usage = usage or {}
+        if not usage.get("total_tokens"):
+            return
+
+        reserved_tokens = min(reserved_tokens, self.tokens_per_minute)
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.tokens_per_minute, self._tokens + reserved_tokens - usage["total_tokens"])
+            if usage.get("completion_tokens") is not None:
+                self.completion_tokens_estimate = 0.9 * self.completion_tokens_estimate + 0.1 * usage["completion_tokens"]
+
+
+def get_rate_limiter() -> Optional[TokenBucketRateLimiter]:
+    """
+    Returns the process-wide rate limiter of the Azure OpenAI deployment, configured from the environment:
+        LLM_RATE_LIMIT_RPM: requests per minute (default 2700, empty to disable limiting).
+        LLM_RATE_LIMIT_TPM: tokens per minute (default 450000, empty to disable limiting).
+
+    Returns:
+        Optional[TokenBucketRateLimiter]: The shared limiter, or None if limiting is disabled.
+    """
+    requests_per_minute = os.getenv("LLM_RATE_LIMIT_RPM", "2700")
+    tokens_per_minute = os.getenv("LLM_RATE_LIMIT_TPM", "450000")
+    if not requests_per_minute or not tokens_per_minute:
+        return None
+
+    return get_or_create(
+        "rate_limiter",
+        lambda: TokenBucketRateLimiter(float(requests_per_minute), float(tokens_per_minute))
+    )
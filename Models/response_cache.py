@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Union
+from pydantic import BaseModel
+
+
+CACHE_MODES = ("use", "bypass", "refresh")
+
+
+class ResponseCache:
+    """
+    An on-disk (SQLite) cache of structured LLM responses.
+
+    Entries are keyed by a hash of the model deployment, the exact messages, the response schema and the
+    temperature, so re-running a task with unchanged prompts and pages costs no tokens. Eviction keeps at most
+    `max_entries` entries (least recently used first) and drops entries older than `max_age_seconds`.
+
+    Hits and inserts stay cheap: hits only refresh `last_used` when it is older than `touch_interval_seconds`,
+    and those touches are written with the next insert (or on close). LRU eviction runs once the cache holds
+    `evict_slack` entries more than `max_entries`, and expired entries are swept at most once per touch interval.
+
+    Modes:
+        - "use": read cached responses and store new ones.
+        - "refresh": ignore cached responses but store the new ones (re-generates stale answers).
+        - "bypass": neither read nor store.
+    """
+
+    def __init__(
+            self,
+            db_path: str,
+            mode: str = "use",
+            max_entries: Optional[int] = 200000,
+            max_age_seconds: Optional[float] = None,
+            touch_interval_seconds: float = 300,
+            evict_slack: Optional[int] = None
+        ):
+        """
+        Opens (and creates if needed) the cache.
+
+        Args:
+            db_path (str): Path to the SQLite file.
+            mode (str): Cache mode, one of "use", "refresh" or "bypass". Defaults to "use".
+            max_entries (Optional[int]): Maximum number of cached responses. Defaults to 200000.
+            max_age_seconds (Optional[float]): Maximum age of a cached response. Defaults to None (no expiry).
+            touch_interval_seconds (float): Minimum age of `last_used` before a hit refreshes it. Defaults to 300.
+            evict_slack (Optional[int]): Entries over `max_entries` tolerated before evicting. Defaults to 1% of `max_entries`.
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported response cache mode: {mode}")
+
+        self.db_path = db_path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.touch_interval_seconds = touch_interval_seconds
+        self.evict_slack = evict_slack if evict_slack is not None else (max_entries or 0) // 100
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+        # Hits whose last_used refresh hasn't been written yet, the row count, and the last expiry sweep
+        self._pending_touches: Dict[str, float] = {}
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self._swept_at = 0.0
+
+    @staticmethod
+    def make_key(deployment: str, messages: list, response_format: Union[type, dict, None], temperature: float) -> str:
+        """
+        Builds the cache key of a request.
+
+        Args:
+            deployment (str): The model deployment name.
+            messages (list): The chat messages sent to the model.
+            response_format (Union[type, dict, None]): The pydantic response model or response format dictionary.
+            temperature (float): The sampling temperature.
+
+        Returns:
+            str: The hex cache key.
+        """
+        if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+            schema = {"name": response_format.__name__, "schema": response_format.model_json_schema()}
+        else:
+            schema = response_format
+
+        payload = json.dumps(
+            {"deployment": deployment, "messages": messages, "schema": schema, "temperature": temperature},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, mode: Optional[str] = None) -> Optional[dict]:
+        """
+        Returns a cached response.
+
+        Args:
+            key (str): The cache key.
+            mode (Optional[str]): Per-call mode override. Defaults to the cache mode.
+
+        Returns:
+            Optional[dict]: The cached response, or None on a miss (always None outside "use" mode).
+        """
+        if (mode or self.mode) != "use":
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at, last_used FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, created_at, last_used = row
+            if self.max_age_seconds is not None and now - created_at > self.max_age_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                self._pending_touches.pop(key, None)
+                return None
+            if now - last_used > self.touch_interval_seconds:
+                self._pending_touches[key] = now
+
+        return json.loads(response)
+
+    def put(self, key: str, response: dict, mode: Optional[str] = None) -> None:
+        """
+        Stores a response, then evicts expired and least recently used entries.
+
+        Args:
+            key (str): The cache key.
+            response (dict): The structured response.
+            mode (Optional[str]): Per-call mode override. Defaults to the cache mode.
+        """
+        if (mode or self.mode) == "bypass":
+            return
+
+        now = time.time()
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False, default=str), now, now)
+            )
+            self._pending_touches.pop(key, None)
+            if not exists:
+                self._count += 1
+            self._write_touches()
+
+            if self.max_age_seconds is not None and now - self._swept_at > self.touch_interval_seconds:
+                self._swept_at = now
+                self._count -= self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age_seconds,)).rowcount
+            if self.max_entries is not None and self._count > self.max_entries + self.evict_slack:
+                self._count -= self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+
+    def _write_touches(self) -> None:
+        # Caller holds the lock and commits
+        if self._pending_touches:
+            self._conn.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._pending_touches.items()]
+            )
+            self._pending_touches.clear()
+
+    def close(self) -> None:
+        """
+        Writes pending `last_used` refreshes and closes the SQLite connection.
+        """
+        with self._lock:
+            with self._conn:
+                self._write_touches()
+            self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the process-wide response cache, configured from the environment on first use:
+        LLM_CACHE_PATH: SQLite path (default "./cache/llm_responses.sqlite", empty to disable caching).
+        LLM_CACHE_MODE: "use", "refresh" or "bypass" (default "use").
+        LLM_CACHE_MAX_ENTRIES: maximum number of cached responses (default 200000).
+        LLM_CACHE_MAX_AGE_SECONDS: maximum age of a cached response (default no expiry).
+
+    Returns:
+        Optional[ResponseCache]: The shared cache, or None if caching is disabled.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            db_path = os.getenv("LLM_CACHE_PATH", "./cache/llm_responses.sqlite")
+            if not db_path:
+                return None
+            max_age = os.getenv("LLM_CACHE_MAX_AGE_SECONDS")
+            _cache = ResponseCache(
+                db_path,
+                mode=os.getenv("LLM_CACHE_MODE", "use"),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 200000)),
+                max_age_seconds=float(max_age) if max_age else None
+            )
+        return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    Replaces the process-wide response cache (None re-reads the environment on next use).
+
+    Args:
+        cache (Optional[ResponseCache]): The cache to use.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
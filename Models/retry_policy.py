@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from logging import Logger
+from typing import Awaitable, Callable, Optional, TypeVar
+import httpx # type: ignore
+import openai # type: ignore
+from Models.llm_metrics import get_llm_metrics
+
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = (408, 409, 429)
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parses a rate limit reset duration ("20ms", "1s", "6m0s", "1.5") into seconds.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        Optional[float]: Seconds, or None if the value can't be parsed.
+    """
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = DURATION_PATTERN.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+class RetryPolicy:
+    """
+    Retries LLM requests on transient errors, within a total time budget per call.
+
+    Errors are classified as rate limits (429), transient (timeouts, connection errors, 408/409, 5xx) or
+    fatal (other 4xx, content filter, schema errors), and only the first two are retried. The delay before
+    the next attempt is the server's `Retry-After` / `retry-after-ms` / `x-ratelimit-reset-*` hint when
+    present, otherwise full-jitter exponential backoff. Sync callers only block their own worker thread,
+    async callers yield to the event loop.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = 5,
+            base_delay_seconds: float = 1.0,
+            max_delay_seconds: float = 60.0,
+            total_budget_seconds: float = 300.0,
+            request_timeout_seconds: float = 60.0,
+            clock: Callable[[], float] = time.monotonic,
+            rng: Callable[[], float] = random.random,
+            logger: Logger = logging.getLogger(__name__)
+        ):
+        """
+        Initializes the policy.
+
+        Args:
+            max_attempts (int): Maximum number of attempts per call. Defaults to 5.
+            base_delay_seconds (float): Backoff base. Defaults to 1.
+            max_delay_seconds (float): Longest single delay. Defaults to 60.
+            total_budget_seconds (float): Time budget of a call, attempts and delays included. Defaults to 300.
+            request_timeout_seconds (float): Timeout of a single attempt (capped by the remaining budget). Defaults to 60.
+            clock (Callable[[], float]): Monotonic clock in seconds. Defaults to time.monotonic.
+            rng (Callable[[], float]): Uniform [0, 1) random source for jitter. Defaults to random.random.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.total_budget_seconds = total_budget_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self._clock = clock
+        self._rng = rng
+        self.logger = logger
+
+    @staticmethod
+    def classify(error: BaseException) -> str:
+        """
+        Classifies a request error.
+
+        Args:
+            error (BaseException): The error raised by a request.
+
+        Returns:
+            str: "rate_limit", "transient" or "fatal".
+        """
+        status_code = getattr(error, "status_code", None)
+        if status_code == 429:
+            return "rate_limit"
+        if status_code is not None:
+            return "transient" if status_code in RETRYABLE_STATUS_CODES or status_code >= 500 else "fatal"
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError, httpx.TransportError)):
+            return "transient"
+        return "fatal"
+
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """
+        Reads the server's retry hint from the error's response headers.
+
+        Args:
+            error (BaseException): The error raised by a request.
+
+        Returns:
+            Optional[float]: Seconds to wait, or None without a usable hint.
+        """
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+
+        if headers.get("retry-after-ms"):
+            delay = parse_duration(headers["retry-after-ms"])
+            if delay is not None:
+                return delay / 1000
+
+        if headers.get("retry-after"):
+            delay = parse_duration(headers["retry-after"])
+            if delay is None:
+                try:
+                    delay = parsedate_to_datetime(headers["retry-after"]).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return max(0.0, delay)
+
+        resets = [
+            parse_duration(headers[name])
+            for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+            if headers.get(name)
+        ]
+        resets = [reset for reset in resets if reset is not None]
+        return max(resets) if resets else None
+
+    def next_delay(self, attempt: int, error: BaseException) -> float:
+        """
+        Args:
+            attempt (int): The number of failed attempts so far (1 after the first failure).
+            error (BaseException): The last error.
+
+        Returns:
+            float: Seconds to wait before the next attempt.
+        """
+        hint = self.retry_after(error)
+        if hint is not None:
+            # Small jitter so workers told the same reset time don't retry in lockstep
+            return min(self.max_delay_seconds, hint) + self._rng() * self.base_delay_seconds
+
+        # Full jitter exponential backoff
+        return self._rng() * min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt)
+
+    def _plan_retry(self, attempt: int, error: BaseException, deadline: float, max_attempts: int) -> Optional[float]:
+        """
+        Returns the delay before the next attempt, or None if the error must be raised.
+        """
+        error_class = self.classify(error)
+        if error_class == "fatal" or attempt >= max_attempts:
+            return None
+
+        delay = self.next_delay(attempt, error)
+        if self._clock() + delay >= deadline:
+            return None
+
+        metrics = get_llm_metrics()
+        metrics.increment("retries")
+        metrics.increment(f"retries_{error_class}")
+        metrics.increment("retry_wait_seconds", delay)
+        self.logger.warning(f"Retrying LLM request in {delay:.1f}s (attempt {attempt + 1}/{max_attempts}) after {error_class} error: {error}")
+        return delay
+
+    def _timeout(self, deadline: float) -> float:
+        return max(0.001, min(self.request_timeout_seconds, deadline - self._clock()))
+
+    def call(self, request: Callable[[float], T], max_attempts: Optional[int] = None) -> T:
+        """
+        Runs a request, retrying it until it succeeds, fails fatally or the budget runs out.
+
+        Args:
+            request (Callable[[float], T]): Sends one attempt, given its timeout in seconds.
+            max_attempts (Optional[int]): Per-call attempt limit. Defaults to the policy's.
+
+        Returns:
+            T: The request result.
+        """
+        max_attempts = max_attempts or self.max_attempts
+        deadline = self._clock() + self.total_budget_seconds
+        attempt = 0
+        while True:
+            try:
+                return request(self._timeout(deadline))
+            except Exception as e:
+                attempt += 1
+                delay = self._plan_retry(attempt, e, deadline, max_attempts)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def acall(self, request: Callable[[float], Awaitable[T]], max_attempts: Optional[int] = None) -> T:
+        """
+        Async variant of `call`.
+
+        Args:
+            request (Callable[[float], Awaitable[T]]): Sends one attempt, given its timeout in seconds.
+            max_attempts (Optional[int]): Per-call attempt limit. Defaults to the policy's.
+
+        Returns:
+            T: The request result.
+        """
+        max_attempts = max_attempts or self.max_attempts
+        deadline = self._clock() + self.total_budget_seconds
+        attempt = 0
+        while True:
+            try:
+                return await request(self._timeout(deadline))
+            except Exception as e:
+                attempt += 1
+                delay = self._plan_retry(attempt, e, deadline, max_attempts)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
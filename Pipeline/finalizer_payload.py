@@ -0,0 +1,80 @@
+import json
+from typing import Callable, Dict, List, Tuple
+from Pipeline.finalizer_rules import to_native
+
+
+def build_finalizer_payload(rows: List[dict]) -> Tuple[dict, List[dict]]:
+    """
+    Compacts an item's parser rows for the finalizer.
+
+    Non-matching rows are dropped (unless no row matches), null fields are dropped from every row, and fields
+    with the same value on every row (id, Product Name, is_match, ...) are factored out into one shared object.
+
+    Args:
+        rows (List[dict]): The item's parser rows (or partial finalizer records).
+
+    Returns:
+        Tuple[dict, List[dict]]: The shared fields and the remaining fields of each page.
+    """
+    rows = [{key: to_native(value) for key, value in row.items()} for row in rows]
+    matches = [row for row in rows if row.get("is_match") is True]
+    rows = [
+        {key: value for key, value in row.items() if value is not None}
+        for row in (matches or rows)
+    ]
+    if len(rows) < 2:
+        return {}, rows
+
+    shared = {
+        key: value for key, value in rows[0].items()
+        if all(key in row and row[key] == value for row in rows[1:])
+    }
+    pages = [{key: value for key, value in row.items() if key not in shared} for row in rows]
+    return shared, pages
+
+
+def serialize_finalizer_payload(shared: dict, pages: List[dict]) -> str:
+    """
+    Serializes a finalizer payload as minified JSON.
+
+    Args:
+        shared (dict): Fields shared by every page.
+        pages (List[dict]): The remaining fields of each page.
+
+    Returns:
+        str: The finalizer user message.
+    """
+    payload: Dict[str, object] = {"shared": shared, "pages": pages} if shared else {"pages": pages}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def split_finalizer_payload(shared: dict, pages: List[dict], token_budget: int, count_tokens: Callable[[str], int]) -> List[List[dict]]:
+    """
+    Splits the pages of a payload into chunks whose serialized payload stays within `token_budget`.
+
+    Every chunk but the last holds at least two pages, so finalizing each chunk always leaves fewer records
+    than pages (a single page over budget is sent as is and truncated by the model's prompt guard).
+
+    Args:
+        shared (dict): Fields shared by every page.
+        pages (List[dict]): The remaining fields of each page.
+        token_budget (int): Maximum tokens of a serialized chunk.
+        count_tokens (Callable[[str], int]): Token counter.
+
+    Returns:
+        List[List[dict]]: The pages of each chunk, in order.
+    """
+    base_tokens = count_tokens(serialize_finalizer_payload(shared, []))
+    chunks: List[List[dict]] = []
+    chunk: List[dict] = []
+    chunk_tokens = base_tokens
+    for page in pages:
+        tokens = count_tokens(json.dumps(page, ensure_ascii=False, separators=(",", ":"), default=str)) + 1
+        if len(chunk) >= 2 and chunk_tokens + tokens > token_budget:
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], base_tokens
+        chunk.append(page)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
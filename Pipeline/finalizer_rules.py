@@ -0,0 +1,153 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, get_args
+import pandas as pd # type: ignore
+from pydantic import BaseModel, ValidationError
+
+
+VOTE_MODES = ("unanimous", "majority")
+
+PRIMARY_URL_PATTERN = re.compile(r"^Primary_\w+_URL$")
+SECONDARY_URLS_PATTERN = re.compile(r"^Secondary_\w+_URLs$")
+CONFIDENCE_SCORE_PATTERN = re.compile(r"^Confidence_Score_\w+$")
+CONFIDENCE_EXPLANATION_PATTERN = re.compile(r"^Confidence_Explanation_\w+$")
+SOURCE_PATTERNS = (PRIMARY_URL_PATTERN, SECONDARY_URLS_PATTERN, CONFIDENCE_SCORE_PATTERN, CONFIDENCE_EXPLANATION_PATTERN)
+
+
+def to_native(value: object) -> object:
+    """
+    Converts a parser output cell to a plain Python value (numpy scalars unwrapped, NaN/NA to None).
+
+    Args:
+        value (object): The cell value.
+
+    Returns:
+        object: The plain value.
+    """
+    if isinstance(value, (list, dict)):
+        return value
+    if value is None or pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def is_bool_field(annotation: object) -> bool:
+    """
+    Args:
+        annotation (object): A pydantic field annotation.
+
+    Returns:
+        bool: Whether the field is a (optional) boolean.
+    """
+    return annotation is bool or bool in get_args(annotation)
+
+
+def vote_key(value: object) -> object:
+    """
+    Key under which two values count as the same vote ("Angus " and "angus" agree).
+    """
+    return value.strip().casefold() if isinstance(value, str) else value
+
+
+def vote(values: List[object], mode: str = "unanimous") -> Tuple[bool, object, float]:
+    """
+    Consolidates the values the matching pages give an attribute.
+
+    Args:
+        values (List[object]): The non-null values, in page order.
+        mode (str): "unanimous" (every page must agree) or "majority" (more than half must agree). Defaults to "unanimous".
+
+    Returns:
+        Tuple[bool, object, float]: Whether the values could be consolidated, the winning value (first spelling
+            seen) and the share of pages that agree with it.
+    """
+    if not values:
+        return True, None, 1.0
+
+    counts = Counter(vote_key(value) for value in values)
+    winner, count = counts.most_common(1)[0]
+    agreement = count / len(values)
+    if agreement < 1.0 and (mode == "unanimous" or agreement <= 0.5):
+        return False, None, agreement
+    return True, next(value for value in values if vote_key(value) == winner), agreement
+
+
+def consolidate_parser_outputs(
+        url_parsed_df: pd.DataFrame,
+        AttributesFinalizer: BaseModel,
+        mode: str = "unanimous"
+    ) -> Optional[dict]:
+    """
+    Builds the finalizer record of an item directly from its matching (`is_match` True) parser rows.
+
+    Attributes take the value the matching pages agree on (by unanimity or majority), boolean attributes are
+    True if any matching page says so (as the finalizer prompt asks), the primary URL is the most populated
+    matching page and the remaining matching pages are the secondary URLs. The source and confidence fields
+    are found by name (Primary_*_URL, Secondary_*_URLs, Confidence_Score_*, Confidence_Explanation_*).
+
+    Args:
+        url_parsed_df (pd.DataFrame): The item's parser output.
+        AttributesFinalizer (BaseModel): The finalizer structured output.
+        mode (str): Vote mode, "unanimous" or "majority". Defaults to "unanimous".
+
+    Returns:
+        Optional[dict]: The finalizer record, or None if the item needs the LLM finalizer (no matching page,
+            conflicting attributes, or a record that doesn't validate).
+    """
+    if mode not in VOTE_MODES:
+        raise ValueError(f"Invalid vote mode {mode!r}, expected one of {VOTE_MODES}")
+    if url_parsed_df.empty or "is_match" not in url_parsed_df.columns or "url" not in url_parsed_df.columns:
+        return None
+
+    rows = [
+        {key: to_native(value) for key, value in row.items()}
+        for row in url_parsed_df.to_dict(orient='records')
+    ]
+    matches = [row for row in rows if row.get("is_match") is True]
+    if not matches:
+        return None
+
+    fields = AttributesFinalizer.model_fields
+    attribute_names = [
+        name for name in fields
+        if name != "is_match" and not any(pattern.match(name) for pattern in SOURCE_PATTERNS)
+    ]
+
+    record: Dict[str, object] = {"is_match": True}
+    agreements: List[float] = []
+    for name in attribute_names:
+        values = [row.get(name) for row in matches if row.get(name) is not None]
+        if is_bool_field(fields[name].annotation):
+            record[name] = any(values) if values else None
+            continue
+
+        consolidated, value, agreement = vote(values, mode)
+        if not consolidated:
+            return None
+        record[name] = value
+        if values:
+            agreements.append(agreement)
+
+    # The most populated matching page is the primary source
+    populated = [sum(row.get(name) is not None for name in attribute_names) for row in matches]
+    primary = matches[populated.index(max(populated))]
+    confidence = sum(agreements) / len(agreements) if agreements else 1.0
+    explanation = (
+        f"Consolidated without LLM from {len(matches)} matching page(s) by {mode} vote; "
+        f"{sum(agreement == 1.0 for agreement in agreements)}/{len(agreements)} populated attributes unanimous."
+    )
+
+    for name in fields:
+        if PRIMARY_URL_PATTERN.match(name):
+            record[name] = primary["url"]
+        elif SECONDARY_URLS_PATTERN.match(name):
+            record[name] = [row["url"] for row in matches if row is not primary]
+        elif CONFIDENCE_SCORE_PATTERN.match(name):
+            record[name] = round(confidence, 3)
+        elif CONFIDENCE_EXPLANATION_PATTERN.match(name):
+            record[name] = explanation
+
+    try:
+        return AttributesFinalizer.model_validate(record).model_dump()
+    except ValidationError:
+        return None
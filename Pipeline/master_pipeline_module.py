@@ -1,42 +1,62 @@
 from Workflow.google_storage_workflow import read_csv_from_gcs
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Callable, Optional
 from google.cloud import storage
 from google.cloud.storage.blob import Blob
-from Tools.tools import clean_html, count_tokens
-from Workflow.structured_outputs import BeefAttributes, BeefAttributesFinalizer, ShrimpAttributes, ShrimpAttributesFinalizer
-from Models.gpt_models import GPTModel
+from Tools.tools import count_tokens
+from Tools.html_cleaning import clean_page, get_cleaning_settings
+from Retrieval.bucket_manifest import BucketManifest, get_bucket_manifest
+from Retrieval.blob_downloader import get_blob_downloader
+from Retrieval.sitemap_store import SitemapStore, get_sitemap_store
+from Workflow.run_journal import RunJournal
+from Workflow.structured_outputs import BeefAttributes, BeefAttributesFinalizer, ShrimpAttributes, ShrimpAttributesFinalizer, create_packed_model
+from Models.gpt_models import GPTModel, get_gpt_model
+from Models.client_registry import get_llm_semaphore, run_coroutine
+from Models.batch_client import BatchRunner, build_batch_request, parse_batch_result
+from Pipeline.relevance_filter import RelevanceFilter, build_non_match_output, get_relevance_filter
+from Pipeline.finalizer_rules import consolidate_parser_outputs
+from Pipeline.finalizer_payload import build_finalizer_payload, serialize_finalizer_payload, split_finalizer_payload
+from Models.llm_metrics import get_llm_metrics
 from pydantic import BaseModel
 from utils import store_secret
 import pprint
 import logging
+import threading
+import asyncio
+import hashlib
+import json
+import os
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging import Logger
 
 
-def set_configurations(item_id:str, high_level_task:str, logger:Logger = logging.getLogger(__name__)) -> Tuple[pd.DataFrame, str, pd.DataFrame]:
+def set_configurations(item_id:str, high_level_task:str, logger:Logger = logging.getLogger(__name__), sitemap_store: Optional[SitemapStore] = None) -> Tuple[pd.DataFrame, str, pd.DataFrame]:
     """ 
         Set configurations for pipeline. 
 
     Args:
         item_id (str): Item ID.
         high_level_task (str): High level task.
+        sitemap_store (Optional[SitemapStore]): The run's sitemap store. Defaults to the process-wide store for the task.
     Returns:
-        Tuple[pd.DataFrame, str]: Tuple containing the sitemap dataframe and the high level task.
+        Tuple[pd.DataFrame, str, pd.DataFrame]: Tuple containing the item's sitemap rows, the item ID and the shared sitemap dataframe.
     """
 
     # 0. Extract and store secrets 
     store_secret(secret_name="des-wesel",project_id="cd-ds-384118")
 
-    # Get Sitemap 
-    sitemap_df = pd.DataFrame(read_csv_from_gcs(f"rcc-attribution/sitemap/{high_level_task}_sitemap.csv"))
+    # Get Sitemap (downloaded once per run and shared by all items)
+    if sitemap_store is None:
+        sitemap_store = get_sitemap_store(high_level_task)
 
     # Filter Sitemap
-    filtered_sitemap = sitemap_df[sitemap_df['Mfr Item Code'] == item_id].copy().reset_index(drop=True)
+    filtered_sitemap = sitemap_store.lookup(item_id)
 
     # Add high level task to sitemap
     filtered_sitemap.loc[0,'high_level_task'] = high_level_task
 
-    return filtered_sitemap, item_id, sitemap_df
+    return filtered_sitemap, item_id, sitemap_store.sitemap_df
 
 
 def gcp_retrieval(
@@ -45,38 +65,47 @@ def gcp_retrieval(
         metadata_key: str, 
         metadata_value: str,
         filtered_sitemap: str,
-        logger:Logger = logging.getLogger(__name__)
+        logger:Logger = logging.getLogger(__name__),
+        manifest: Optional[BucketManifest] = None,
+        max_downloads: int = 8
     ) -> Dict:
     """
-    Fetches all blobs from a specified GCS bucket folder and filters them based on metadata.
+    Fetches the blobs for a single item from a GCS bucket folder, using the run's bucket manifest.
 
     Parameters:
         bucket_name (str): The name of the GCS bucket.
         folder_path (str): The folder path within the bucket (e.g., "data/subfolder/").
         metadata_key (str): The metadata key to check.
         metadata_value (str): The expected value for the metadata key.
+        manifest (Optional[BucketManifest]): The bucket manifest. Defaults to the process-wide manifest for the folder.
+        max_downloads (int): Maximum number of the item's blobs downloaded at once. Defaults to 8.
 
     Returns:
         List[Blob]: A list of blob objects that match the given metadata condition.
     """
 
-    # Initialize GCS client
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-
-    # List all blobs in the given folder
-    blobs = bucket.list_blobs(prefix=folder_path)
+    # Look up the item's blobs in the manifest instead of listing the whole folder
+    if manifest is None:
+        manifest = get_bucket_manifest(bucket_name, folder_path, metadata_key)
 
     # Filter blobs based on metadata
+    html_entries = [entry for entry in manifest.get_entries(metadata_value) if entry["name"].endswith(".html")]
+
+    # Download the item's HTML files concurrently, in manifest order
+    html_contents = get_blob_downloader().download(
+        [manifest.get_blob(entry) for entry in html_entries],
+        max_in_flight=max_downloads
+    )
+
     results_dict = {}
-    for blob in blobs:
-        metadata = blob.metadata or {}
-        if metadata.get(metadata_key) == metadata_value:
-            if blob.name.endswith(".html"):
-                # Read and store HTML file content
-                html_data = clean_html(blob.download_as_text())
-                results_dict[blob.metadata['url']] = {"file_name": blob.name, "html": html_data, "metadata": blob.metadata}
-                logger.info(f"URL retrieved for item {blob.metadata['id']}: {blob.metadata['url']}...")
+    metrics = get_llm_metrics()
+    for entry, html_content in zip(html_entries, html_contents):
+        # Read and store HTML file content (page text only, boilerplate stripped)
+        html_data, cleaning_stats = clean_page(html_content)
+        metrics.increment("html_tokens_before", cleaning_stats["tokens_before"])
+        metrics.increment("html_tokens_after", cleaning_stats["tokens_after"])
+        results_dict[entry["url"]] = {"file_name": entry["name"], "html": html_data, "metadata": entry["metadata"]}
+        logger.info(f"URL retrieved for item {entry['metadata']['id']}: {entry['url']} ({cleaning_stats['tokens_saved_ratio']:.0%} of page tokens stripped)...")
 
     # Construct DataFrame from results_dict with improved readability
     scrape_df = pd.DataFrame([
@@ -97,79 +126,389 @@ def gcp_retrieval(
 
 
 
-def execute_parser(scrape_df:pd.DataFrame, Attributes:BaseModel, logger:Logger = logging.getLogger(__name__)) -> pd.DataFrame:
-    """ 
-    Execute the parser on the scraped data and return structured outputs.
+@lru_cache(maxsize=None)
+def load_prompt(path: str) -> str:
+    """
+    Read a prompt file once per process, so every request of a stage sends the same system prompt.
 
     Args:
-        scrape_df (pd.DataFrame): The scraped data.
+        path (str): The prompt path (e.g. "Prompts/beef_parser.txt").
     Returns:
-        pd.DataFrame: The structured outputs.
+        str: The prompt.
     """
-    model = GPTModel()
+    with open(path, "r") as file:
+        return file.read()
 
-    # Get high level task
-    high_level_task = str(scrape_df['high_level_task'].values[0])
 
-    # Read parser prompt
-    with open(f"Prompts/{high_level_task}_parser.txt", "r") as file:
-        sys_inst = file.read()
+def get_run_fingerprint(high_level_task: str, Attributes: BaseModel, AttributesFinalizer: BaseModel) -> str:
+    """
+    Fingerprint of everything a checkpointed stage output depends on besides the item: the HTML cleaning
+    settings, the parser and finalizer prompts and structured output schemas. Keying the run journal on it
+    keeps a run from resuming records produced under other settings or an edited prompt or schema.
 
-    structured_outputs = []
-    for idx, row in scrape_df.iterrows():
+    Args:
+        high_level_task (str): High level task.
+        Attributes (BaseModel): The parser structured output.
+        AttributesFinalizer (BaseModel): The finalizer structured output.
+    Returns:
+        str: A short hex digest.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        json.dumps(get_cleaning_settings(), sort_keys=True),
+        load_prompt(f"Prompts/{high_level_task}_parser.txt"),
+        load_prompt("Prompts/beef_finalizer.txt"),
+        json.dumps(Attributes.model_json_schema(), sort_keys=True),
+        json.dumps(AttributesFinalizer.model_json_schema(), sort_keys=True)
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def build_product_header(row: dict) -> str:
+    """
+    Build the product header that opens every parser user message.
+
+    The header only depends on the item, so the system prompt, schema and header form a byte-identical
+    prefix across the item's requests, which the provider's prompt cache can reuse. Page content must
+    always come after it.
 
-        user_inst = f'''
+    Args:
+        row (dict): A scraped page of the item (description, manufacturer).
+    Returns:
+        str: The product header.
+    """
+    return f'''
         <Product>
             Product: {row['description']}
             Manufacturer: {row['manufacturer']}
         </Product>
-        
+        '''
+
+
+def build_parser_message(row: dict) -> str:
+    """
+    Build the parser user message of a scraped page: the product header, then the page body.
+
+    Args:
+        row (dict): The scraped page (description, manufacturer, html).
+    Returns:
+        str: The user message.
+    """
+    return build_product_header(row) + f'''
         <HTML>
             {row['html']}
         </HTML>
         '''
-        
-        url = row['url']
 
-        try:
-            output = model.generate_response(sys_inst, user_inst, Attributes)
 
-            output = {
-                "url": url,
-                "id": row['id'],
-                "Product Name": row['description'],
-                **output  # Append the remaining original dictionary contents
-            }
+def build_packed_parser_message(rows: List[dict], page_ids: List[str]) -> str:
+    """
+    Build the user message of a packed request: the product header once, then each page tagged with its page id.
 
-            structured_outputs.append(output)
-        except Exception as e:
-            print(f"Error LLM parsing URL {url}: {e}")
-            logger.error(f"Error LLM parsing URL {url}: {e}")
+    Args:
+        rows (List[dict]): The scraped pages of one item.
+        page_ids (List[str]): The id of each page.
+    Returns:
+        str: The user message.
+    """
+    pages = "".join(
+        f'''
+        <Page id="{page_id}">
+            URL: {row['url']}
+            <HTML>
+                {row['html']}
+            </HTML>
+        </Page>
+        '''
+        for page_id, row in zip(page_ids, rows)
+    )
+    return build_product_header(rows[0]) + f'''
+        <Pages>{pages}</Pages>
+
+        Parse every <Page> independently, as if it were the only HTML given, and return exactly one entry in `pages` per page id.
+        '''
+
+
+def pack_pages(rows: List[dict], token_budget: int, max_pages: int = 8) -> List[List[int]]:
+    """
+    Group an item's pages into packed requests, in order, each up to `token_budget` page tokens.
+
+    Args:
+        rows (List[dict]): The scraped pages.
+        token_budget (int): Maximum page tokens per packed request. Larger pages get a request of their own.
+        max_pages (int): Maximum pages per packed request. Defaults to 8.
+    Returns:
+        List[List[int]]: The page indices of each request.
+    """
+    groups: List[List[int]] = []
+    group: List[int] = []
+    group_tokens = 0
+    for idx, row in enumerate(rows):
+        tokens = count_tokens(str(row['html']))
+        if group and (group_tokens + tokens > token_budget or len(group) >= max_pages):
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(idx)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+def build_parser_requests(rows: List[dict], Attributes: BaseModel, pack_token_budget: Optional[int] = None) -> List[Tuple[List[int], str, BaseModel]]:
+    """
+    Build the parser requests of an item: one per page, or packed pages when a token budget is given.
+
+    Args:
+        rows (List[dict]): The scraped pages.
+        Attributes (BaseModel): The parser structured output.
+        pack_token_budget (Optional[int]): Page token budget of packed requests. Defaults to None (one request per page).
+    Returns:
+        List[Tuple[List[int], str, BaseModel]]: The page indices, user message and response format of each request.
+    """
+    if not pack_token_budget:
+        return [([idx], build_parser_message(row), Attributes) for idx, row in enumerate(rows)]
+
+    requests = []
+    for group in pack_pages(rows, pack_token_budget):
+        if len(group) == 1:
+            requests.append((group, build_parser_message(rows[group[0]]), Attributes))
+        else:
+            page_ids = [f"p{idx}" for idx in group]
+            requests.append((group, build_packed_parser_message([rows[idx] for idx in group], page_ids), create_packed_model(Attributes)))
+    return requests
+
+
+def unpack_parser_output(group: List[int], output: object) -> List[object]:
+    """
+    Split the output of a parser request back into per-page outputs.
+
+    Args:
+        group (List[int]): The page indices of the request.
+        output (object): The structured output, or the raised exception, of the request.
+    Returns:
+        List[object]: The structured output, or an exception, of each page.
+    """
+    if isinstance(output, BaseException):
+        return [output] * len(group)
+    if len(group) == 1 and "pages" not in output:
+        return [output]
+
+    entries = {entry.pop("page_id"): entry for entry in output.get("pages", [])}
+    return [
+        entries.get(f"p{idx}", RuntimeError(f"Packed response has no entry for page p{idx}"))
+        for idx in group
+    ]
+
+
+async def aexecute_parser_requests(model: GPTModel, sys_inst: str, requests: List[Tuple[str, BaseModel]], hedge: bool = False) -> List[object]:
+    """
+    Send the parser requests of an item concurrently, bounded by the shared LLM semaphore.
+
+    Args:
+        model (GPTModel): The model.
+        sys_inst (str): The parser prompt.
+        requests (List[Tuple[str, BaseModel]]): The user message and response format of each request.
+        hedge (bool): Whether to hedge slow requests. Defaults to False.
+    Returns:
+        List[object]: The structured output, or the raised exception, of each request in order.
+    """
+    semaphore = get_llm_semaphore()
+
+    async def parse(user_inst: str, response_format: BaseModel) -> dict:
+        async with semaphore:
+            return await model.agenerate_response(sys_inst, user_inst, response_format, hedge=hedge)
+
+    return await asyncio.gather(*(parse(user_inst, response_format) for user_inst, response_format in requests), return_exceptions=True)
+
+
+def execute_parser(
+        scrape_df:pd.DataFrame,
+        Attributes:BaseModel,
+        logger:Logger = logging.getLogger(__name__),
+        use_async: bool = True,
+        hedge: Optional[bool] = None,
+        pack_token_budget: Optional[int] = None,
+        prefilter: Optional[RelevanceFilter] = None
+    ) -> pd.DataFrame:
+    """ 
+    Execute the parser on the scraped data and return structured outputs.
+
+    Args:
+        scrape_df (pd.DataFrame): The scraped data.
+        use_async (bool): Whether to send all requests concurrently on the shared event loop. Defaults to True.
+        hedge (Optional[bool]): Whether to hedge slow requests on the async path. Defaults to LLM_HEDGING == "1".
+        pack_token_budget (Optional[int]): Pack small pages into shared requests of up to this many page tokens.
+            Defaults to LLM_PACK_TOKEN_BUDGET (unset: one request per page).
+        prefilter (Optional[RelevanceFilter]): Cheap relevance check; pages it drops skip extraction and are
+            reported as `is_match` False. Defaults to `get_relevance_filter()` (PARSER_PREFILTER).
+    Returns:
+        pd.DataFrame: The structured outputs, one row per page (pages that failed are logged, left out and
+            counted in `attrs["failed_pages"]`).
+    """
+    model = get_gpt_model()
+
+    # Get high level task
+    high_level_task = str(scrape_df['high_level_task'].values[0])
+
+    # Read parser prompt
+    sys_inst = load_prompt(f"Prompts/{high_level_task}_parser.txt")
+
+    rows = scrape_df.to_dict(orient='records')
+    outputs: List[object] = [None] * len(rows)
+
+    # Pages that clearly don't describe the product skip full extraction
+    kept = list(range(len(rows)))
+    if prefilter is None:
+        prefilter = get_relevance_filter()
+    if prefilter is not None:
+        kept, dropped = prefilter.split(rows)
+        for idx in dropped:
+            outputs[idx] = build_non_match_output(Attributes)
+
+    # Small pages can share one request (and one copy of the prompt and product header)
+    if pack_token_budget is None and os.getenv("LLM_PACK_TOKEN_BUDGET"):
+        pack_token_budget = int(os.getenv("LLM_PACK_TOKEN_BUDGET"))
+    requests = build_parser_requests([rows[idx] for idx in kept], Attributes, pack_token_budget)
+
+    if use_async:
+        # Item latency is the slowest request rather than the sum of all requests
+        if hedge is None:
+            hedge = os.getenv("LLM_HEDGING", "0") == "1"
+        request_outputs = run_coroutine(aexecute_parser_requests(
+            model, sys_inst, [(user_inst, response_format) for _, user_inst, response_format in requests], hedge
+        ))
+    else:
+        request_outputs = []
+        for _, user_inst, response_format in requests:
+            try:
+                request_outputs.append(model.generate_response(sys_inst, user_inst, response_format))
+            except Exception as e:
+                request_outputs.append(e)
+
+    # Unpack request outputs into per-page outputs
+    for (group, _, _), request_output in zip(requests, request_outputs):
+        for idx, output in zip(group, unpack_parser_output(group, request_output)):
+            outputs[kept[idx]] = output
+
+    return build_parsed_df(rows, outputs, logger)
+
+
+def build_parsed_df(rows: List[dict], outputs: List[object], logger:Logger = logging.getLogger(__name__)) -> pd.DataFrame:
+    """
+    Build the parser output of an item from the structured output of each page.
+
+    Args:
+        rows (List[dict]): The scraped pages.
+        outputs (List[object]): The structured output, or the raised exception, of each page.
+    Returns:
+        pd.DataFrame: The structured outputs (pages that failed are logged, left out and counted in `attrs["failed_pages"]`).
+    """
+    structured_outputs = []
+    failed_pages = 0
+    for row, output in zip(rows, outputs):
+        url = row['url']
+
+        if output is None or isinstance(output, BaseException):
+            print(f"Error LLM parsing URL {url}: {output}")
+            logger.error(f"Error LLM parsing URL {url}: {output}")
+            failed_pages += 1
+            continue
+
+        structured_outputs.append({
+            "url": url,
+            "id": row['id'],
+            "Product Name": row['description'],
+            **output  # Append the remaining original dictionary contents
+        })
 
     url_parsed_df = pd.DataFrame(structured_outputs)
+    url_parsed_df.attrs["failed_pages"] = failed_pages
 
     return url_parsed_df
 
 
-def execute_finalizer(url_parsed_df:pd.DataFrame, AttributesFinalizer:BaseModel, logger:Logger = logging.getLogger(__name__)) -> pd.DataFrame:
+def is_parse_complete(url_parsed_df: pd.DataFrame) -> bool:
+    """
+    Whether a parser output covers every page of the item, i.e. is worth checkpointing.
+
+    Args:
+        url_parsed_df (pd.DataFrame): The parser output (`build_parsed_df`).
+    Returns:
+        bool: True if no page failed and at least one page was parsed.
+    """
+    return not url_parsed_df.empty and url_parsed_df.attrs.get("failed_pages", 0) == 0
+
+
+def finalize_records(model: GPTModel, sys_inst: str, rows: List[dict], AttributesFinalizer: BaseModel, token_budget: int, logger:Logger = logging.getLogger(__name__)) -> dict:
+    """
+    Run the LLM finalizer on a compact payload of parser rows, map-reduce style when it exceeds the token budget.
+
+    Args:
+        model (GPTModel): The model.
+        sys_inst (str): The finalizer prompt.
+        rows (List[dict]): The parser rows (or partial finalizer records).
+        AttributesFinalizer (BaseModel): The finalizer structured output.
+        token_budget (int): Maximum tokens of one finalizer user message.
+    Returns:
+        dict: The finalizer output.
+    """
+    shared, pages = build_finalizer_payload(rows)
+    user_inst = serialize_finalizer_payload(shared, pages)
+
+    # A token is at least one byte, so small payloads skip tokenization
+    if len(user_inst.encode("utf-8")) <= token_budget or count_tokens(user_inst) <= token_budget:
+        return model.generate_response(sys_inst, user_inst, AttributesFinalizer)
+
+    chunks = split_finalizer_payload(shared, pages, token_budget, count_tokens)
+    if len(chunks) == 1:
+        return model.generate_response(sys_inst, user_inst, AttributesFinalizer)
+
+    # Map: finalize each chunk of pages, reduce: finalize the partial records
+    logger.info(f"Finalizer payload over {token_budget} tokens, finalizing {len(pages)} pages in {len(chunks)} chunks...")
+    partials = [
+        model.generate_response(sys_inst, serialize_finalizer_payload(shared, chunk), AttributesFinalizer)
+        for chunk in chunks
+    ]
+    return finalize_records(model, sys_inst, partials, AttributesFinalizer, token_budget, logger)
+
+
+def execute_finalizer(url_parsed_df:pd.DataFrame, AttributesFinalizer:BaseModel, logger:Logger = logging.getLogger(__name__), fast_path: Optional[bool] = None) -> pd.DataFrame:
     """ 
     Execute the finalizer on the parsed data
 
     Args:
         url_parsed_df (pd.DataFrame): The parsed data
+        fast_path (Optional[bool]): Build the record without the LLM when the matching pages agree
+            (see `Pipeline.finalizer_rules`). Defaults to FINALIZER_FAST_PATH != "0", with the vote mode
+            from FINALIZER_FAST_PATH_VOTE ("unanimous" or "majority", default "unanimous").
+            Other items are sent as compact JSON, split into partial finalizations over FINALIZER_TOKEN_BUDGET
+            tokens (default 30000).
     Returns:
         pd.DataFrame: The finalizer output
     """
-    model = GPTModel()
+    # Items whose matching pages agree don't need the LLM
+    if fast_path is None:
+        fast_path = os.getenv("FINALIZER_FAST_PATH", "1") != "0"
+    if fast_path:
+        output = consolidate_parser_outputs(url_parsed_df, AttributesFinalizer, os.getenv("FINALIZER_FAST_PATH_VOTE", "unanimous"))
+        if output is not None:
+            get_llm_metrics().increment("finalizer_fast_path")
+            logger.info(f"Finalized item {url_parsed_df['id'].values[0]} without LLM...")
+            return pd.DataFrame([{"id": url_parsed_df['id'].values[0], **output}])
+    get_llm_metrics().increment("finalizer_llm")
+
+    model = get_gpt_model()
     
     # Read finalizer Prompt
-    with open("Prompts/beef_finalizer.txt", "r") as file:
-        sys_inst = file.read()
+    sys_inst = load_prompt("Prompts/beef_finalizer.txt")
 
-    finalizer_user_input = str(url_parsed_df.to_dict(orient='records')) 
+    token_budget = int(os.getenv("FINALIZER_TOKEN_BUDGET", 30000))
     try:
         # Execute finalizer
-        output = model.generate_response(sys_inst, finalizer_user_input, AttributesFinalizer)
+        output = finalize_records(model, sys_inst, url_parsed_df.to_dict(orient='records'), AttributesFinalizer, token_budget, logger)
 
         # Append the id to the output
         output = {
@@ -187,12 +526,49 @@ def execute_finalizer(url_parsed_df:pd.DataFrame, AttributesFinalizer:BaseModel,
         return pd.DataFrame([{"id": url_parsed_df['id'].values[0]}])
 
 
+def run_stage(
+        stage: str,
+        item_id: str,
+        stage_fn: Callable[[], pd.DataFrame],
+        run_journal: Optional[RunJournal] = None,
+        logger:Logger = logging.getLogger(__name__),
+        is_complete: Optional[Callable[[pd.DataFrame], bool]] = None
+    ) -> pd.DataFrame:
+    """
+    Run a pipeline stage for an item, or resume its output from the run journal.
+
+    Args:
+        stage (str): Stage name ("parser" or "finalizer").
+        item_id (str): Item ID.
+        stage_fn (Callable[[], pd.DataFrame]): Runs the stage and returns its output.
+        run_journal (Optional[RunJournal]): Journal of completed stages. Defaults to None (always run).
+        is_complete (Optional[Callable[[pd.DataFrame], bool]]): Whether an output is worth checkpointing (and
+            resuming). Defaults to always.
+    Returns:
+        pd.DataFrame: The stage output.
+    """
+    if run_journal is not None:
+        checkpoint = run_journal.get(item_id, stage)
+        if checkpoint is not None and (is_complete is None or is_complete(pd.DataFrame(checkpoint))):
+            logger.info(f"Resumed {stage} for item {item_id} from run journal...")
+            return pd.DataFrame(checkpoint)
+
+    output_df = stage_fn()
+
+    if run_journal is not None and (is_complete is None or is_complete(output_df)):
+        run_journal.record(item_id, stage, output_df.to_dict(orient='records'))
+
+    return output_df
+
+
 def execute_pipeline(**kwargs) -> dict:
     """
     Execute the entire pipeline.
 
     Args:
-        **kwargs: Arbitrary keyword arguments.
+        **kwargs: Arbitrary keyword arguments. An optional `run_journal` (RunJournal) checkpoints each
+            completed stage and resumes the item from its last completed stage. An optional `url_parsed_df`
+            (pd.DataFrame), e.g. from a batch run, skips retrieval and parsing.
     Returns:
         pd.DataFrame: The final output.
     """
@@ -206,22 +582,50 @@ def execute_pipeline(**kwargs) -> dict:
     metadata_value = kwargs.get("metadata_value")
     structured_output_parser = kwargs.get("structured_output_parser")
     structured_output_finalizer = kwargs.get("structured_output_finalizer")
+    run_journal = kwargs.get("run_journal")
+    url_parsed_df = kwargs.get("url_parsed_df")
     logger = logging.getLogger(__name__)
 
     # Set configurations
     filtered_sitemap, item_id, sitemap_df = set_configurations(item_id, high_level_task)
     logger.info(f"Configurations set for item {item_id}...")
 
-    # Retrieve data from GCS
-    scrape_df = gcp_retrieval(bucket_name, folder_path, metadata_key, metadata_value, filtered_sitemap)
-    logger.info(f"Data retrieved from GCS for item {item_id}...")
-    
-    # Execute parser
-    url_parsed_df = execute_parser(scrape_df, structured_output_parser)
-    logger.info(f"Parsing completed for item {item_id}...")
+    # Skip straight to the output of items finalized by an earlier run
+    if run_journal is not None and run_journal.last_stage(item_id) == "finalizer":
+        output_df = run_stage("finalizer", item_id, None, run_journal, logger)
+        return {
+            "output_df": output_df,
+            "sitemap_df": sitemap_df
+        }
 
-    # Execute finalizer
-    output_df = execute_finalizer(url_parsed_df, structured_output_finalizer)
+    if url_parsed_df is None:
+        # Retrieve data from GCS and execute parser (items with a checkpointed parse skip both). Pages that
+        # failed are retried on the next run, so partial outputs aren't checkpointed
+        def retrieve_and_parse() -> pd.DataFrame:
+            scrape_df = gcp_retrieval(bucket_name, folder_path, metadata_key, metadata_value, filtered_sitemap)
+            logger.info(f"Data retrieved from GCS for item {item_id}...")
+            return execute_parser(scrape_df, structured_output_parser)
+
+        url_parsed_df = run_stage("parser", item_id, retrieve_and_parse, run_journal, logger, is_complete=is_parse_complete)
+        logger.info(f"Parsing completed for item {item_id}...")
+
+    # Items without any parsed page are left for the next run (the finalizer needs at least one page)
+    if url_parsed_df.empty:
+        logger.error(f"No page parsed for item {item_id}, skipping finalizer...")
+        return {
+            "output_df": pd.DataFrame([{"id": item_id}]),
+            "sitemap_df": sitemap_df
+        }
+
+    # Execute finalizer (a failed finalizer only returns the id, and is retried on the next run, as is
+    # the finalizer of a partial parse)
+    parse_complete = is_parse_complete(url_parsed_df)
+    output_df = run_stage(
+        "finalizer", item_id,
+        lambda: execute_finalizer(url_parsed_df, structured_output_finalizer),
+        run_journal, logger,
+        is_complete=lambda df: parse_complete and len(df.columns) > 1
+    )
     logger.info(f"Finalization completed for item {item_id}...")
 
     output_dict = {
@@ -237,7 +641,7 @@ def get_all_ids(
         logger:Logger = logging.getLogger(__name__)
     ) -> Dict:
     """
-    Fetches all blobs from a specified GCS bucket folder and filters them based on metadata.
+    Fetches all item ids from a specified GCS bucket folder, using the run's bucket manifest.
 
     Parameters:
         bucket_name (str): The name of the GCS bucket.
@@ -247,17 +651,171 @@ def get_all_ids(
         Set: A set of all ids.
     """
 
-    # Initialize GCS client
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
+    # The manifest lists the folder once and is reused by gcp_retrieval for every item
+    manifest = get_bucket_manifest(bucket_name, folder_path, "id", logger)
 
-    # List all blobs in the given folder
-    blobs = bucket.list_blobs(prefix=folder_path)
+    return manifest.get_ids()
 
-    # Filter blobs based on metadata
-    results_dict = set()
-    for blob in blobs:
-        if blob.metadata is not None:
-            results_dict.add(blob.metadata.get('id'))
-    
-    return results_dict
\ No newline at end of file
+
+def execute_pipelines_concurrently(
+        input_dicts: List[dict],
+        max_workers: int = 8,
+        on_result: Optional[Callable[[dict], None]] = None,
+        logger:Logger = logging.getLogger(__name__)
+    ) -> List[dict]:
+    """
+    Execute the pipeline for many items at once on a bounded worker pool.
+
+    Each input dictionary is passed to `execute_pipeline` on its own worker thread, with at most
+    `max_workers` items in flight. Finalized records are collected under a lock so `on_result`
+    callbacks never run concurrently. Failed items are logged and skipped.
+
+    Args:
+        input_dicts (List[dict]): One `execute_pipeline` keyword dictionary per item.
+        max_workers (int): Maximum number of items processed concurrently. Defaults to 8.
+        on_result (Optional[Callable[[dict], None]]): Called with each finalized record as it completes.
+    Returns:
+        List[dict]: Finalized output records, in the same order as `input_dicts`.
+    """
+    results: Dict[int, dict] = {}
+    results_lock = threading.Lock()
+
+    def run_item(idx: int, input_dict: dict) -> None:
+        item_id = input_dict.get("item_id")
+        logger.info(f"Processing item {item_id}, index {idx}...")
+
+        output_dict = execute_pipeline(**input_dict)
+        record = output_dict.get("output_df").to_dict(orient='records')[0]
+
+        with results_lock:
+            results[idx] = record
+            if on_result is not None:
+                on_result(record)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="item-worker") as executor:
+        futures = {executor.submit(run_item, idx, input_dict): idx for idx, input_dict in enumerate(input_dicts)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error processing item {input_dicts[idx].get('item_id')} at index {idx}: {e}")
+
+    return [results[idx] for idx in sorted(results)]
+
+
+def execute_batch_run(
+        input_dicts: List[dict],
+        batch_runner: Optional[BatchRunner] = None,
+        max_workers: int = 8,
+        on_result: Optional[Callable[[dict], None]] = None,
+        logger:Logger = logging.getLogger(__name__)
+    ) -> List[dict]:
+    """
+    Execute the pipeline for many items with every parser request of the run sent through the Batch API.
+
+    Retrieval runs for all items first. Every page not already answered (response cache, run journal) or dropped
+    by the parser prefilter (PARSER_PREFILTER) becomes one line of the run's batch files, keyed by
+    "{item_id}:{page index}". Once the batches complete, results are mapped back to per-item parser outputs
+    (same shape as `execute_parser`), checkpointed when every page was parsed, and the items are finalized
+    concurrently.
+
+    Args:
+        input_dicts (List[dict]): One `execute_pipeline` keyword dictionary per item.
+        batch_runner (Optional[BatchRunner]): Batch API runner. Defaults to one on the shared Azure OpenAI client.
+        max_workers (int): Maximum number of items retrieved or finalized concurrently. Defaults to 8.
+        on_result (Optional[Callable[[dict], None]]): Called with each finalized record as it completes.
+    Returns:
+        List[dict]: Finalized output records, in the same order as `input_dicts`.
+    """
+    # Load the model credentials before the shared client is built
+    store_secret(secret_name="des-wesel",project_id="cd-ds-384118")
+
+    model = get_gpt_model()
+    if batch_runner is None:
+        batch_runner = BatchRunner(model.client, logger=logger)
+    deployment = os.getenv("LLM_BATCH_DEPLOYMENT", model.deployment)
+    prefilter = get_relevance_filter()
+
+    def retrieve(input_dict: dict) -> Optional[pd.DataFrame]:
+        item_id = input_dict.get("item_id")
+        run_journal = input_dict.get("run_journal")
+        if run_journal is not None and run_journal.last_stage(item_id) in ("parser", "finalizer"):
+            return None
+        try:
+            filtered_sitemap, item_id, _ = set_configurations(item_id, input_dict.get("high_level_task"))
+            return gcp_retrieval(input_dict.get("bucket_name"), input_dict.get("folder_path"), input_dict.get("metadata_key"), input_dict.get("metadata_value"), filtered_sitemap)
+        except Exception as e:
+            logger.error(f"Error retrieving item {item_id}: {e}")
+            return None
+
+    # 1. Retrieve every item
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="item-worker") as executor:
+        scrape_dfs = list(executor.map(retrieve, input_dicts))
+
+    # 2. Collect the run's parser requests
+    pages: Dict[str, Tuple[List[dict], List[object]]] = {}
+    pending: Dict[str, Tuple[str, int, Optional[str], object]] = {}
+    requests = []
+    for input_dict, scrape_df in zip(input_dicts, scrape_dfs):
+        if scrape_df is None or scrape_df.empty:
+            continue
+
+        item_id = input_dict.get("item_id")
+        Attributes = input_dict.get("structured_output_parser")
+        high_level_task = str(scrape_df['high_level_task'].values[0])
+        sys_inst = load_prompt(f"Prompts/{high_level_task}_parser.txt")
+
+        rows = scrape_df.to_dict(orient='records')
+        outputs: List[object] = [None] * len(rows)
+        pages[item_id] = (rows, outputs)
+        kept = range(len(rows))
+        if prefilter is not None:
+            kept, dropped = prefilter.split(rows)
+            for row_idx in dropped:
+                outputs[row_idx] = build_non_match_output(Attributes)
+
+        for row_idx in kept:
+            row = rows[row_idx]
+            messages, response_format, _, cache_key, cached_response = model.prepare_request(
+                sys_inst, build_parser_message(row), Attributes
+            )
+            if cached_response is not None:
+                outputs[row_idx] = cached_response
+                continue
+
+            custom_id = f"{item_id}:{row_idx}"
+            requests.append(build_batch_request(custom_id, deployment, messages, response_format))
+            pending[custom_id] = (item_id, row_idx, cache_key, response_format)
+
+    # 3. Submit, poll and map the results back by custom id
+    logger.info(f"Submitting {len(requests)} parser requests for {len(pages)} items to the Batch API...")
+    results = batch_runner.run(requests, run_name=f"{input_dicts[0].get('high_level_task')}_parser" if input_dicts else None)
+    for custom_id, (item_id, row_idx, cache_key, response_format) in pending.items():
+        try:
+            line = results.get(custom_id)
+            if line is None:
+                raise RuntimeError(f"Batch request {custom_id} missing from batch output")
+            output = parse_batch_result(line, response_format)
+            model.record_usage(line["response"]["body"].get("usage"))
+            if cache_key is not None:
+                model.response_cache.put(cache_key, output)
+            pages[item_id][1][row_idx] = output
+        except Exception as e:
+            pages[item_id][1][row_idx] = e
+
+    # 4. Finalize every item, from its batch parser output or its journaled stages
+    finalize_dicts = []
+    for input_dict, scrape_df in zip(input_dicts, scrape_dfs):
+        item_id = input_dict.get("item_id")
+        run_journal = input_dict.get("run_journal")
+        if item_id in pages:
+            url_parsed_df = build_parsed_df(*pages[item_id], logger)
+            # Items with failed or missing batch lines are parsed again on the next run
+            if run_journal is not None and is_parse_complete(url_parsed_df):
+                run_journal.record(item_id, "parser", url_parsed_df.to_dict(orient='records'))
+            finalize_dicts.append({**input_dict, "url_parsed_df": url_parsed_df})
+        elif run_journal is not None and run_journal.last_stage(item_id) in ("parser", "finalizer"):
+            finalize_dicts.append(input_dict)
+
+    return execute_pipelines_concurrently(finalize_dicts, max_workers=max_workers, on_result=on_result, logger=logger)
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Any, List, Dict, Set
 from google.cloud import storage # type: ignore
+from Retrieval.storage_client import get_storage_client, get_bucket_handle
 import logging
 import pandas as pd # type: ignore
 from logger import Logger 
@@ -45,8 +46,8 @@ class Pipeline(ABC):
 
          # GCP-related attributes
         self.bucket_name: str = "data-extraction-services"
-        self.client: storage.Client = storage.Client()  # GCP Storage Client
-        self.bucket: storage.Bucket = self.client.get_bucket(self.bucket_name)  # GCP Storage Bucket
+        self.client: storage.Client = get_storage_client()  # Shared GCP Storage Client
+        self.bucket: storage.Bucket = get_bucket_handle(self.bucket_name)  # Lazy GCP Storage Bucket handle
 
         # Product-related attributes
         self.product: dict = {}
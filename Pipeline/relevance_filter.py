@@ -0,0 +1,146 @@
+import logging
+import os
+import re
+from logging import Logger
+from typing import List, Optional, Set, Tuple
+from pydantic import BaseModel
+from Models.llm_metrics import get_llm_metrics
+
+
+TOKEN_PATTERN = re.compile(r"[a-z]+|\d+")
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    """
+    Splits text into lowercase word and number tokens ("4OZ Beef-Patty" -> {"4", "oz", "beef", "patty"}).
+
+    Args:
+        text (Optional[str]): The text.
+
+    Returns:
+        Set[str]: The distinct tokens.
+    """
+    return set(TOKEN_PATTERN.findall(str(text or "").lower()))
+
+
+def token_overlap(query: Set[str], document: Set[str]) -> float:
+    """
+    The share of query tokens found in a document.
+
+    Args:
+        query (Set[str]): Tokens of the query (e.g. the sitemap description).
+        document (Set[str]): Tokens of the document (e.g. the page text).
+
+    Returns:
+        float: Overlap in [0, 1], 1 for an empty query.
+    """
+    if not query:
+        return 1.0
+    return len(query & document) / len(query)
+
+
+def build_non_match_output(Attributes: BaseModel) -> dict:
+    """
+    Builds the parser output of a page dropped by the prefilter: every attribute empty and `is_match` False.
+
+    Args:
+        Attributes (BaseModel): The parser structured output.
+
+    Returns:
+        dict: The non-match output.
+    """
+    return {**{name: None for name in Attributes.model_fields}, "is_match": False}
+
+
+class RelevanceFilter:
+    """
+    A cheap, local relevance check run before full attribute extraction.
+
+    A page is kept when enough of the sitemap description's tokens, and of the manufacturer's tokens, appear
+    in its text. Pages that fail never reach the LLM and are reported as `is_match` False, so thresholds
+    should stay conservative: a dropped match is lost, a kept non-match only costs tokens.
+    """
+
+    def __init__(
+            self,
+            min_description_overlap: float = 0.5,
+            min_manufacturer_overlap: float = 0.0,
+            logger: Logger = logging.getLogger(__name__)
+        ):
+        """
+        Initializes the filter.
+
+        Args:
+            min_description_overlap (float): Share of description tokens a page must contain. Defaults to 0.5.
+            min_manufacturer_overlap (float): Share of manufacturer tokens a page must contain. Defaults to 0 (not checked).
+        """
+        self.min_description_overlap = min_description_overlap
+        self.min_manufacturer_overlap = min_manufacturer_overlap
+        self.logger = logger
+
+    def score(self, row: dict) -> Tuple[float, float]:
+        """
+        Args:
+            row (dict): The scraped page (description, manufacturer, html).
+
+        Returns:
+            Tuple[float, float]: The description and manufacturer token overlap of the page.
+        """
+        page_tokens = tokenize(row.get('html'))
+        return (
+            token_overlap(tokenize(row.get('description')), page_tokens),
+            token_overlap(tokenize(row.get('manufacturer')), page_tokens)
+        )
+
+    def is_relevant(self, row: dict) -> bool:
+        """
+        Args:
+            row (dict): The scraped page (description, manufacturer, html).
+
+        Returns:
+            bool: Whether the page should go through full extraction.
+        """
+        description_overlap, manufacturer_overlap = self.score(row)
+        return description_overlap >= self.min_description_overlap and manufacturer_overlap >= self.min_manufacturer_overlap
+
+    def split(self, rows: List[dict]) -> Tuple[List[int], List[int]]:
+        """
+        Splits an item's pages into those kept for extraction and those dropped, and logs the drop count.
+
+        Args:
+            rows (List[dict]): The scraped pages of one item.
+
+        Returns:
+            Tuple[List[int], List[int]]: The kept and the dropped page indices.
+        """
+        kept: List[int] = []
+        dropped: List[int] = []
+        for idx, row in enumerate(rows):
+            (kept if self.is_relevant(row) else dropped).append(idx)
+
+        metrics = get_llm_metrics()
+        metrics.increment("prefilter_pages", len(rows))
+        metrics.increment("prefilter_pages_dropped", len(dropped))
+        if rows:
+            self.logger.info(f"Prefilter dropped {len(dropped)}/{len(rows)} pages for item {rows[0].get('id')}...")
+
+        return kept, dropped
+
+
+def get_relevance_filter() -> Optional[RelevanceFilter]:
+    """
+    Returns the parser prefilter configured from the environment:
+        PARSER_PREFILTER: "1" enables the prefilter (default "0").
+        PARSER_PREFILTER_MIN_DESCRIPTION_OVERLAP: share of description tokens a page must contain (default 0.5).
+        PARSER_PREFILTER_MIN_MANUFACTURER_OVERLAP: share of manufacturer tokens a page must contain (default 0).
+
+    Returns:
+        Optional[RelevanceFilter]: The prefilter, or None if disabled.
+    """
+    if os.getenv("PARSER_PREFILTER", "0") != "1":
+        return None
+
+    return RelevanceFilter(
+        min_description_overlap=float(os.getenv("PARSER_PREFILTER_MIN_DESCRIPTION_OVERLAP", 0.5)),
+        min_manufacturer_overlap=float(os.getenv("PARSER_PREFILTER_MIN_MANUFACTURER_OVERLAP", 0))
+    )
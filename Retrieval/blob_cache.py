@@ -0,0 +1,225 @@
+from google.cloud.storage.blob import Blob # type: ignore
+from collections import OrderedDict
+from typing import Optional, Union
+import hashlib
+import os
+import tempfile
+import threading
+
+
+class BlobCache:
+    """
+    A content-addressed local cache for GCS blob contents, bounded by a disk quota with LRU eviction.
+
+    Entries are keyed by bucket, object name and generation (or md5 hash when no generation is known), so a
+    re-scraped object gets a new key and stale content is never served. Blobs without either stamp bypass
+    the cache.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 5 * 1024 ** 3):
+        """
+        Initializes the cache and indexes any entries already on disk.
+
+        Args:
+            cache_dir (str): Directory holding cached blob contents.
+            max_bytes (int): Disk quota for cached contents. Defaults to 5 GiB.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # LRU index of key -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        existing = []
+        for shard in os.listdir(cache_dir):
+            shard_dir = os.path.join(cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for key in os.listdir(shard_dir):
+                if key.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(shard_dir, key))
+                existing.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def make_key(bucket_name: str, blob_name: str, generation: Optional[int] = None, md5_hash: Optional[str] = None) -> Optional[str]:
+        """
+        Builds the cache key of a blob version.
+
+        Args:
+            bucket_name (str): The name of the GCS bucket.
+            blob_name (str): The object name.
+            generation (Optional[int]): The object generation.
+            md5_hash (Optional[str]): The object md5 hash, used when no generation is known.
+
+        Returns:
+            Optional[str]: The hex cache key, or None if the blob version can't be identified.
+        """
+        if generation is not None:
+            version = f"generation:{generation}"
+        elif md5_hash:
+            version = f"md5:{md5_hash}"
+        else:
+            return None
+        return hashlib.sha256(f"{bucket_name}/{blob_name}#{version}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Reads a cached entry and marks it most recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[bytes]: The cached content, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            with self._lock:
+                if key in self._entries:
+                    self._total_bytes -= self._entries.pop(key)
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                # Evicted by a concurrent put after the read: the data is still valid, but the file is (being) removed
+                return data
+            self._entries.move_to_end(key)
+            # Touched under the lock, so eviction can't remove the file in between
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Writes an entry atomically, then evicts least recently used entries until under quota.
+
+        Args:
+            key (str): The cache key.
+            data (bytes): The content to cache.
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def download(self, blob: Blob, as_text: bool = True) -> Union[str, bytes]:
+        """
+        Returns a blob's content from the cache, downloading and caching it on a miss.
+
+        Blobs created by name (no generation or md5 yet) are reloaded first, which is a metadata request
+        rather than a full download.
+
+        Args:
+            blob (Blob): The blob to read.
+            as_text (bool): Whether to decode the content as text. Defaults to True.
+
+        Returns:
+            Union[str, bytes]: The blob content.
+        """
+        generation = getattr(blob, "generation", None)
+        md5_hash = getattr(blob, "md5_hash", None)
+        bucket = getattr(blob, "bucket", None)
+        if generation is None and not md5_hash and bucket is not None and hasattr(blob, "reload"):
+            blob.reload()
+            generation, md5_hash = blob.generation, blob.md5_hash
+
+        key = self.make_key(bucket.name, blob.name, generation, md5_hash) if bucket is not None else None
+        if key is None:
+            return blob.download_as_text() if as_text else blob.download_as_bytes()
+
+        data = self.get(key)
+        if data is None:
+            data = blob.download_as_bytes()
+            self.put(key, data)
+
+        return data.decode(self._charset(blob)) if as_text else data
+
+    @staticmethod
+    def _charset(blob: Blob) -> str:
+        """
+        Returns:
+            str: The charset declared in the blob content type, utf-8 by default (as `download_as_text` does).
+        """
+        content_type = getattr(blob, "content_type", None) or ""
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+
+_cache: Optional[BlobCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_blob_cache() -> Optional[BlobCache]:
+    """
+    Returns the process-wide blob cache, configured from the environment on first use:
+        BLOB_CACHE_DIR: cache directory (default "./cache/blobs", empty to disable caching).
+        BLOB_CACHE_MAX_BYTES: disk quota in bytes (default 5 GiB).
+
+    Returns:
+        Optional[BlobCache]: The shared cache, or None if caching is disabled.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = os.getenv("BLOB_CACHE_DIR", "./cache/blobs")
+            if not cache_dir:
+                return None
+            _cache = BlobCache(cache_dir, int(os.getenv("BLOB_CACHE_MAX_BYTES", 5 * 1024 ** 3)))
+        return _cache
+
+
+def download_blob(blob: Blob, as_text: bool = True) -> Union[str, bytes]:
+    """
+    Downloads a blob through the process-wide cache when caching is enabled.
+
+    Args:
+        blob (Blob): The blob to read.
+        as_text (bool): Whether to decode the content as text. Defaults to True.
+
+    Returns:
+        Union[str, bytes]: The blob content.
+    """
+    cache = get_blob_cache()
+    if cache is None:
+        return blob.download_as_text() if as_text else blob.download_as_bytes()
+    return cache.download(blob, as_text)
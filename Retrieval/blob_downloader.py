@@ -0,0 +1,100 @@
+from google.cloud.storage.blob import Blob # type: ignore
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Optional, Union
+import threading
+from Retrieval.blob_cache import download_blob
+
+
+class BlobDownloader:
+    """
+    A batched GCS download engine backed by one bounded, process-wide thread pool.
+
+    Blobs handed to the downloader come from the shared storage client, so every download reuses that
+    client's HTTP session and connection pool. Each call caps its own number of downloads in flight, so a
+    single item with many files can't starve the other workers sharing the pool.
+    """
+
+    def __init__(self, max_workers: int = 32):
+        """
+        Initializes the downloader.
+
+        Args:
+            max_workers (int): Size of the shared download thread pool. Defaults to 32.
+        """
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blob-download")
+
+    def _download_one(self, blob: Blob, as_text: bool) -> Union[str, bytes]:
+        """
+        Downloads a single blob, through the local blob cache when it is enabled.
+
+        Args:
+            blob (Blob): The blob to download.
+            as_text (bool): Whether to decode the content as text.
+
+        Returns:
+            Union[str, bytes]: The blob content.
+        """
+        return download_blob(blob, as_text)
+
+    def download(
+            self,
+            blobs: List[Blob],
+            as_text: Optional[List[bool]] = None,
+            max_in_flight: int = 8
+        ) -> List[Union[str, bytes]]:
+        """
+        Downloads a batch of blobs concurrently and returns their contents in input order.
+
+        Args:
+            blobs (List[Blob]): The blobs to download.
+            as_text (Optional[List[bool]]): Per-blob flag to decode as text (True) or return bytes (False). Defaults to all text.
+            max_in_flight (int): Maximum number of this batch's downloads running at once. Defaults to 8.
+
+        Returns:
+            List[Union[str, bytes]]: The blob contents, in the same order as `blobs`.
+
+        Raises:
+            Exception: The first download error, after the rest of the batch has settled.
+        """
+        if as_text is None:
+            as_text = [True] * len(blobs)
+        if len(as_text) != len(blobs):
+            raise ValueError("as_text must have one flag per blob.")
+
+        # Run small batches inline; the pool only pays off with more than one download
+        if len(blobs) <= 1 or max_in_flight <= 1:
+            return [self._download_one(blob, text) for blob, text in zip(blobs, as_text)]
+
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        futures: List[Future] = []
+        for blob, text in zip(blobs, as_text):
+            in_flight.acquire()
+            future = self.executor.submit(self._download_one, blob, text)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
+        return [future.result() for future in futures]
+
+
+_downloader: Optional[BlobDownloader] = None
+_downloader_lock = threading.Lock()
+
+
+def get_blob_downloader() -> BlobDownloader:
+    """
+    Returns the process-wide blob downloader, creating it on first use.
+
+    Returns:
+        BlobDownloader: The shared downloader.
+    """
+    global _downloader
+    with _downloader_lock:
+        if _downloader is None:
+            _downloader = BlobDownloader()
+        return _downloader
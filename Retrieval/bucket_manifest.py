@@ -0,0 +1,328 @@
+from google.cloud import storage # type: ignore
+from google.cloud.storage.blob import Blob # type: ignore
+from typing import Dict, List, Optional, Set, Tuple
+import threading
+import time
+import logging
+from logging import Logger
+from Retrieval.manifest_store import ManifestStore
+from Retrieval.storage_client import get_bucket_handle
+
+
+class BucketManifest:
+    """
+    An in-memory index of the scraped blobs under a GCS folder, keyed by a metadata value (the item id).
+
+    The folder is listed once and every blob carrying the metadata key is recorded as a manifest entry:
+        {"name", "url", "brand", "generation", "size", "updated", "md5_hash", "metadata"}
+
+    Item retrieval then only needs to download the blobs listed for that item, instead of re-listing
+    the whole folder for every item. With a ManifestStore, the listing is persisted locally and later
+    runs only fetch metadata for blobs whose generation changed.
+    """
+
+    def __init__(
+            self,
+            bucket_name: str,
+            folder_path: str,
+            metadata_key: str = "id",
+            logger: Logger = logging.getLogger(__name__)
+        ):
+        """
+        Initializes an empty manifest for a bucket folder.
+
+        Args:
+            bucket_name (str): The name of the GCS bucket.
+            folder_path (str): The folder path within the bucket (e.g., "data/subfolder/").
+            metadata_key (str): The metadata key used to index blobs. Defaults to "id".
+        """
+        self.bucket_name = bucket_name
+        self.folder_path = folder_path
+        self.metadata_key = metadata_key
+        self.logger = logger
+
+        self.bucket = None
+        self.entries_by_id: Dict[str, List[dict]] = {}
+
+        # Blob handles from the listing, reused for downloads so no extra metadata lookup is needed
+        self._blobs: Dict[str, Blob] = {}
+
+    def build(
+            self,
+            store: Optional[ManifestStore] = None,
+            refresh: str = "diff",
+            max_age_seconds: Optional[float] = None,
+            full_relist_threshold: int = 1000
+        ) -> "BucketManifest":
+        """
+        Populates the manifest, from a fresh listing or from a local snapshot refreshed by generation.
+
+        With a store, the refresh mode decides how the stored snapshot is reused:
+            - "full": always re-list the folder with metadata and replace the snapshot.
+            - "diff": list only names and generations, then fetch metadata for new or changed blobs.
+            - "never": trust the snapshot as-is.
+        A snapshot younger than `max_age_seconds` is trusted without listing in any mode but "full".
+
+        Args:
+            store (Optional[ManifestStore]): Local snapshot store. Defaults to None (always list).
+            refresh (str): Refresh mode, one of "full", "diff" or "never". Defaults to "diff".
+            max_age_seconds (Optional[float]): Age under which the snapshot is used without listing. Defaults to None.
+            full_relist_threshold (int): Changed blob count above which a diff falls back to a full listing. Defaults to 1000.
+
+        Returns:
+            BucketManifest: The populated manifest (self).
+        """
+        if refresh not in ("full", "diff", "never"):
+            raise ValueError(f"Unsupported manifest refresh mode: {refresh}")
+
+        self.bucket = get_bucket_handle(self.bucket_name)
+
+        refreshed_at = store.get_refreshed_at(self.bucket_name, self.folder_path) if store is not None else None
+        if store is None:
+            records = self._list_records()
+        elif refresh == "full" or refreshed_at is None:
+            records = self._list_records()
+            store.save(self.bucket_name, self.folder_path, records.values(), replace=True)
+        elif refresh == "never" or (max_age_seconds is not None and time.time() - refreshed_at < max_age_seconds):
+            records = store.load(self.bucket_name, self.folder_path)
+            self.logger.info(f"Manifest loaded from snapshot for gs://{self.bucket_name}/{self.folder_path}...")
+        else:
+            records = self._refresh_records(store, full_relist_threshold)
+
+        self._index(records)
+        self.logger.info(f"Manifest built for gs://{self.bucket_name}/{self.folder_path}: {len(records)} blobs, {len(self.entries_by_id)} ids...")
+
+        return self
+
+    def _list_records(self) -> Dict[str, dict]:
+        """
+        Lists the folder with full metadata.
+
+        Returns:
+            Dict[str, dict]: Blob records keyed by blob name.
+        """
+        records: Dict[str, dict] = {}
+        for blob in self.bucket.list_blobs(prefix=self.folder_path):
+            records[blob.name] = self.record_from_blob(blob)
+            self._blobs[blob.name] = blob
+        return records
+
+    def _refresh_records(self, store: ManifestStore, full_relist_threshold: int) -> Dict[str, dict]:
+        """
+        Diffs a lean name/generation listing against the stored snapshot and only fetches metadata for
+        new or changed blobs.
+
+        Args:
+            store (ManifestStore): Local snapshot store.
+            full_relist_threshold (int): Changed blob count above which a full listing is cheaper.
+
+        Returns:
+            Dict[str, dict]: Blob records keyed by blob name.
+        """
+        stored = store.load(self.bucket_name, self.folder_path)
+        listed = {
+            blob.name: blob.generation
+            for blob in self.bucket.list_blobs(prefix=self.folder_path, fields="items(name,generation),nextPageToken")
+        }
+
+        changed = [name for name, generation in listed.items() if name not in stored or stored[name]["generation"] != generation]
+        removed = [name for name in stored if name not in listed]
+
+        if len(changed) > full_relist_threshold:
+            records = self._list_records()
+            store.save(self.bucket_name, self.folder_path, records.values(), replace=True)
+            return records
+
+        upserts = []
+        for name in changed:
+            blob = self.bucket.get_blob(name)
+            if blob is None:
+                # Deleted between the listing and the metadata fetch
+                removed.append(name)
+                continue
+            upserts.append(self.record_from_blob(blob))
+            self._blobs[name] = blob
+
+        removed_names = set(removed)
+        records = {name: record for name, record in stored.items() if name not in removed_names}
+        records.update({record["name"]: record for record in upserts})
+        store.save(self.bucket_name, self.folder_path, upserts, deletes=removed)
+        self.logger.info(f"Manifest snapshot refreshed for gs://{self.bucket_name}/{self.folder_path}: {len(upserts)} changed, {len(removed)} removed...")
+
+        return records
+
+    def _index(self, records: Dict[str, dict]) -> None:
+        """
+        Rebuilds the id index from blob records.
+
+        Args:
+            records (Dict[str, dict]): Blob records keyed by blob name.
+        """
+        entries_by_id: Dict[str, List[dict]] = {}
+        for record in records.values():
+            entry = self.entry_from_record(record)
+            if entry is None:
+                continue
+            entries_by_id.setdefault(entry["metadata"][self.metadata_key], []).append(entry)
+        self.entries_by_id = entries_by_id
+
+    @staticmethod
+    def record_from_blob(blob: Blob) -> dict:
+        """
+        Converts a listed blob into a storable blob record.
+
+        Args:
+            blob (Blob): A blob returned by a bucket listing.
+
+        Returns:
+            dict: The blob record.
+        """
+        updated = getattr(blob, "updated", None)
+        return {
+            "name": blob.name,
+            "generation": getattr(blob, "generation", None),
+            "updated": updated.isoformat() if updated is not None else None,
+            "size": getattr(blob, "size", None),
+            "md5_hash": getattr(blob, "md5_hash", None),
+            "metadata": blob.metadata,
+        }
+
+    def entry_from_record(self, record: dict) -> Optional[dict]:
+        """
+        Converts a blob record into a manifest entry.
+
+        Args:
+            record (dict): A blob record.
+
+        Returns:
+            Optional[dict]: The manifest entry, or None if the blob has no value for the metadata key.
+        """
+        metadata = record.get("metadata") or {}
+        if metadata.get(self.metadata_key) is None:
+            return None
+
+        return {
+            **record,
+            "url": metadata.get("url"),
+            "brand": metadata.get("brand"),
+            "metadata": metadata,
+        }
+
+    def get_ids(self) -> Set[str]:
+        """
+        Returns:
+            Set[str]: Every metadata value (item id) present in the manifest.
+        """
+        return set(self.entries_by_id.keys())
+
+    def get_entries(self, metadata_value: str) -> List[dict]:
+        """
+        Returns the manifest entries for a single item.
+
+        Args:
+            metadata_value (str): The metadata value (item id) to look up.
+
+        Returns:
+            List[dict]: The manifest entries for the item, empty if the item is unknown.
+        """
+        return self.entries_by_id.get(metadata_value, [])
+
+    def get_blob(self, entry: dict) -> Blob:
+        """
+        Returns a downloadable blob handle for a manifest entry, pinned to the indexed generation.
+
+        Args:
+            entry (dict): A manifest entry.
+
+        Returns:
+            Blob: The blob handle.
+        """
+        blob = self._blobs.get(entry["name"])
+        if blob is not None:
+            return blob
+
+        if self.bucket is None:
+            self.bucket = get_bucket_handle(self.bucket_name)
+        return self.bucket.blob(entry["name"], generation=entry.get("generation"))
+
+
+# Run-scoped manifests, shared by every item and worker in the process
+_manifests: Dict[Tuple[str, str, str], BucketManifest] = {}
+_manifests_lock = threading.Lock()
+
+# One lock per bucket folder, so a listing only blocks the callers waiting for that manifest
+_build_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+# Local snapshot settings used when building manifests (persistence is off until configured)
+_store_settings: dict = {"store": None, "refresh": "diff", "max_age_seconds": None}
+
+
+def configure_manifest_store(
+        db_path: Optional[str],
+        refresh: str = "diff",
+        max_age_seconds: Optional[float] = None
+    ) -> Optional[ManifestStore]:
+    """
+    Configures the local snapshot used by every manifest built afterwards in this process.
+
+    Args:
+        db_path (Optional[str]): Path to the SQLite snapshot, or None to disable persistence.
+        refresh (str): Refresh mode, one of "full", "diff" or "never". Defaults to "diff".
+        max_age_seconds (Optional[float]): Age under which the snapshot is used without listing. Defaults to None.
+
+    Returns:
+        Optional[ManifestStore]: The configured store.
+    """
+    with _manifests_lock:
+        _store_settings["store"] = ManifestStore(db_path) if db_path else None
+        _store_settings["refresh"] = refresh
+        _store_settings["max_age_seconds"] = max_age_seconds
+        return _store_settings["store"]
+
+
+def get_bucket_manifest(
+        bucket_name: str,
+        folder_path: str,
+        metadata_key: str = "id",
+        logger: Logger = logging.getLogger(__name__)
+    ) -> BucketManifest:
+    """
+    Returns the process-wide manifest for a bucket folder, building it on first use.
+
+    Args:
+        bucket_name (str): The name of the GCS bucket.
+        folder_path (str): The folder path within the bucket (e.g., "data/subfolder/").
+        metadata_key (str): The metadata key used to index blobs. Defaults to "id".
+
+    Returns:
+        BucketManifest: The built manifest.
+    """
+    key = (bucket_name, folder_path, metadata_key)
+    with _manifests_lock:
+        if key in _manifests:
+            return _manifests[key]
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+        store_settings = dict(_store_settings)
+
+    with build_lock:
+        with _manifests_lock:
+            manifest = _manifests.get(key)
+        if manifest is None:
+            # A failed listing raises here, and the next caller retries it
+            manifest = BucketManifest(bucket_name, folder_path, metadata_key, logger).build(
+                store=store_settings["store"],
+                refresh=store_settings["refresh"],
+                max_age_seconds=store_settings["max_age_seconds"]
+            )
+            with _manifests_lock:
+                _manifests[key] = manifest
+        return manifest
+
+
+def clear_bucket_manifests() -> None:
+    """
+    Drops every cached manifest so the next lookup re-lists the bucket.
+    """
+    with _manifests_lock:
+        _manifests.clear()
+        _build_locks.clear()
@@ -6,6 +6,9 @@ from io import StringIO
 import csv
 from abc import ABC, abstractmethod
 from Pipeline.pipeline import Pipeline
+from Retrieval.blob_downloader import get_blob_downloader
+from Retrieval.blob_cache import download_blob
+from Retrieval.storage_client import get_storage_client, get_bucket_handle
 
 class GCPRetrieval(Pipeline):
     """
@@ -23,9 +26,9 @@ class GCPRetrieval(Pipeline):
         """
         self.bucket_name = input_object['bucket_name']
 
-        # Initialize clients for GCP services
-        self.client = storage.Client()
-        self.bucket = self.client.get_bucket(self.bucket_name)
+        # Use the shared GCP storage client and a lazy bucket handle
+        self.client = get_storage_client()
+        self.bucket = get_bucket_handle(self.bucket_name)
 
         if not isinstance(input_object, dict):
             raise ValueError("input_object must be a dictionary.")
@@ -86,13 +89,15 @@ class GCPRetrieval(Pipeline):
     
     def get_blob_data(
             self,
-            folder_path: str
+            folder_path: str,
+            max_downloads: int = 8
         ) -> dict:
             """
             Accepts a folder path as input, and returns the data within files in the folder (html, png, txt) in a dictionary of dictionaries.
 
             Args:
                 folder_path (str): The folder path to search for data.
+                max_downloads (int): Maximum number of files downloaded at once. Defaults to 8.
 
             Returns:
                 output_dict (dict): A dictionary of dictionaries with keys as file names and values as a dictionary of extracted data. 
@@ -100,6 +105,9 @@ class GCPRetrieval(Pipeline):
             """
             output_dict: dict = {}
             blobs = self.get_blobs_from_folder(folder_path)
+
+            # Collect the files to download, then fetch them as one concurrent batch
+            downloads = []
             for blob in blobs:
                 
                 file_name = blob.name
@@ -108,33 +116,42 @@ class GCPRetrieval(Pipeline):
                 
                 if blob.metadata is None:
                      continue
-                else:
-                    blob_metadata = blob.metadata
-                    blob_url = blob_metadata['url']
 
-                if blob_url not in output_dict.keys():
-                     output_dict[blob_url] = {}
+                # Register URLs in listing order, whatever file type they carry
+                output_dict.setdefault(blob.metadata['url'], {})
+
+                if file_name.endswith(".html") or file_name.endswith(".txt"):
+                    downloads.append((blob, True))
+                elif file_name.endswith(".png"):
+                    downloads.append((blob, False))
+
+            contents = get_blob_downloader().download(
+                [blob for blob, _ in downloads],
+                as_text=[as_text for _, as_text in downloads],
+                max_in_flight=max_downloads
+            )
+
+            for (blob, _), content in zip(downloads, contents):
+                file_name = blob.name
+                blob_metadata = blob.metadata
+                blob_url = blob_metadata['url']
 
                 if file_name.endswith(".html"):
-                    # Read and store HTML file content
-                    html_data = blob.download_as_text()
-                    output_dict[blob_url].update({"file_name": file_name, "html": html_data, "metadata": blob_metadata})
+                    # Store HTML file content
+                    output_dict[blob_url].update({"file_name": file_name, "html": content, "metadata": blob_metadata})
 
                 elif file_name.endswith("product_image.png"):
-                    # Read and convert PNG file content to a Pillow Image object                    
-                    image_data = blob.download_as_bytes()  # Download image data as bytes
-                    byte_image = io.BytesIO(image_data)
+                    # Convert PNG file content to a byte stream for Pillow
+                    byte_image = io.BytesIO(content)
                     output_dict[blob_url].update({"file_name": file_name, "product_image": byte_image, "metadata": blob_metadata})
 
                 elif file_name.endswith(".png") and "product_image" not in file_name:
-                    # Read and convert PNG file content to a Pillow Image object
-                    image_data = blob.download_as_bytes()  # Download image data as bytes
-                    byte_image = io.BytesIO(image_data)
+                    # Convert PNG file content to a byte stream for Pillow
+                    byte_image = io.BytesIO(content)
                     output_dict[blob_url].update({"file_name": file_name, "image": byte_image, "metadata": blob_metadata})
 
                 elif file_name.endswith(".txt"):
-                    txt_data = blob.download_as_text()
-                    output_dict[blob_url].update({"file_name": file_name, "txt": txt_data, "metadata": blob_metadata})
+                    output_dict[blob_url].update({"file_name": file_name, "txt": content, "metadata": blob_metadata})
 
             return output_dict
     
@@ -153,14 +170,11 @@ class GCPRetrieval(Pipeline):
         bucket_name = self.bucket_name
         destination_blob_path = folder
         
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        
-        bucket = client.get_bucket(bucket_name)
+        bucket = get_bucket_handle(bucket_name)
         blob = bucket.blob(destination_blob_path)
 
-        # Download the file as bytes and decode it into a string
-        content = blob.download_as_text()
+        # Download the file (through the local blob cache) and decode it into a string
+        content = download_blob(blob, as_text=True)
 
         # Use io.StringIO to read the CSV data
         csv_reader = csv.DictReader(StringIO(content))
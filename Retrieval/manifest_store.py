@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class ManifestStore:
+    """
+    A local SQLite snapshot of bucket manifests, so a run can start from the last listing instead of
+    re-listing the whole bucket folder.
+
+    Every listed blob is stored with its generation and updated stamp (blobs without the indexed metadata
+    key are stored too, so they are not treated as new on the next refresh).
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Opens (and creates if needed) the SQLite snapshot.
+
+        Args:
+            db_path (str): Path to the SQLite file.
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                bucket TEXT NOT NULL,
+                folder TEXT NOT NULL,
+                name TEXT NOT NULL,
+                generation INTEGER,
+                updated TEXT,
+                size INTEGER,
+                md5_hash TEXT,
+                metadata TEXT,
+                PRIMARY KEY (bucket, folder, name)
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                bucket TEXT NOT NULL,
+                folder TEXT NOT NULL,
+                refreshed_at REAL NOT NULL,
+                PRIMARY KEY (bucket, folder)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def get_refreshed_at(self, bucket_name: str, folder_path: str) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: The epoch time of the last saved snapshot for the folder, or None if there is none.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed_at FROM snapshots WHERE bucket = ? AND folder = ?",
+                (bucket_name, folder_path)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, bucket_name: str, folder_path: str) -> Dict[str, dict]:
+        """
+        Loads the stored blob records of a folder.
+
+        Args:
+            bucket_name (str): The name of the GCS bucket.
+            folder_path (str): The folder path within the bucket.
+
+        Returns:
+            Dict[str, dict]: Blob records keyed by blob name.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, generation, updated, size, md5_hash, metadata FROM blobs WHERE bucket = ? AND folder = ?",
+                (bucket_name, folder_path)
+            ).fetchall()
+
+        return {
+            name: {
+                "name": name,
+                "generation": generation,
+                "updated": updated,
+                "size": size,
+                "md5_hash": md5_hash,
+                "metadata": json.loads(metadata) if metadata else None,
+            }
+            for name, generation, updated, size, md5_hash, metadata in rows
+        }
+
+    def save(
+            self,
+            bucket_name: str,
+            folder_path: str,
+            upserts: Iterable[dict],
+            deletes: Iterable[str] = (),
+            replace: bool = False
+        ) -> None:
+        """
+        Writes blob records for a folder and stamps the snapshot time.
+
+        Args:
+            bucket_name (str): The name of the GCS bucket.
+            folder_path (str): The folder path within the bucket.
+            upserts (Iterable[dict]): Blob records to insert or update.
+            deletes (Iterable[str]): Blob names to remove.
+            replace (bool): Whether to drop every stored record of the folder first. Defaults to False.
+        """
+        rows = [
+            (
+                bucket_name, folder_path, record["name"], record.get("generation"), record.get("updated"),
+                record.get("size"), record.get("md5_hash"),
+                json.dumps(record["metadata"]) if record.get("metadata") is not None else None
+            )
+            for record in upserts
+        ]
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM blobs WHERE bucket = ? AND folder = ?", (bucket_name, folder_path))
+            self._conn.executemany(
+                "DELETE FROM blobs WHERE bucket = ? AND folder = ? AND name = ?",
+                [(bucket_name, folder_path, name) for name in deletes]
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                (bucket_name, folder_path, time.time())
+            )
+
+    def close(self) -> None:
+        """
+        Closes the SQLite connection.
+        """
+        with self._lock:
+            self._conn.close()
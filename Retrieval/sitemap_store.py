@@ -0,0 +1,111 @@
+from Workflow import google_storage_workflow
+from typing import Dict, List, Optional
+import pandas as pd # type: ignore
+import threading
+import logging
+from logging import Logger
+
+
+class SitemapStore:
+    """
+    A run-scoped copy of a task sitemap, downloaded once and indexed by 'Mfr Item Code'.
+
+    Every item and worker in the run looks up its sitemap rows here instead of downloading and parsing
+    the sitemap CSV and mask-filtering it per item.
+    """
+
+    def __init__(
+            self,
+            high_level_task: str,
+            sitemap_path: Optional[str] = None,
+            key_column: str = "Mfr Item Code",
+            logger: Logger = logging.getLogger(__name__)
+        ):
+        """
+        Initializes an empty store for a task sitemap.
+
+        Args:
+            high_level_task (str): High level task.
+            sitemap_path (Optional[str]): Sitemap CSV path in the bucket. Defaults to "rcc-attribution/sitemap/{task}_sitemap.csv".
+            key_column (str): Column used for item lookups. Defaults to "Mfr Item Code".
+        """
+        self.high_level_task = high_level_task
+        self.sitemap_path = sitemap_path or f"rcc-attribution/sitemap/{high_level_task}_sitemap.csv"
+        self.key_column = key_column
+        self.logger = logger
+
+        self.sitemap_df: pd.DataFrame = pd.DataFrame()
+        self._positions: Dict[str, List[int]] = {}
+
+    def load(self) -> "SitemapStore":
+        """
+        Downloads the sitemap CSV once, keeps every column as a pandas string column and indexes the key column.
+
+        Returns:
+            SitemapStore: The loaded store (self).
+        """
+        sitemap_df = pd.DataFrame(google_storage_workflow.read_csv_from_gcs(self.sitemap_path))
+        self.sitemap_df = sitemap_df.astype("string")
+
+        positions: Dict[str, List[int]] = {}
+        for position, key in enumerate(self.sitemap_df[self.key_column].tolist()):
+            positions.setdefault(key, []).append(position)
+        self._positions = positions
+
+        self.logger.info(f"Sitemap loaded for task {self.high_level_task}: {len(self.sitemap_df)} rows, {len(positions)} item codes...")
+        return self
+
+    def lookup(self, item_id: str) -> pd.DataFrame:
+        """
+        Returns the sitemap rows of an item.
+
+        Args:
+            item_id (str): Item ID ('Mfr Item Code').
+
+        Returns:
+            pd.DataFrame: A copy of the item's sitemap rows with a fresh index, empty if the item is unknown.
+        """
+        positions = self._positions.get(item_id, [])
+        return self.sitemap_df.iloc[positions].copy().reset_index(drop=True)
+
+
+_stores: Dict[str, SitemapStore] = {}
+_stores_lock = threading.Lock()
+
+# One lock per task sitemap, so a download only blocks the callers waiting for that sitemap
+_load_locks: Dict[str, threading.Lock] = {}
+
+
+def get_sitemap_store(high_level_task: str, logger: Logger = logging.getLogger(__name__)) -> SitemapStore:
+    """
+    Returns the process-wide sitemap store of a task, loading it on first use.
+
+    Args:
+        high_level_task (str): High level task.
+
+    Returns:
+        SitemapStore: The loaded store.
+    """
+    with _stores_lock:
+        if high_level_task in _stores:
+            return _stores[high_level_task]
+        load_lock = _load_locks.setdefault(high_level_task, threading.Lock())
+
+    with load_lock:
+        with _stores_lock:
+            store = _stores.get(high_level_task)
+        if store is None:
+            # A failed download raises here, and the next caller retries it
+            store = SitemapStore(high_level_task, logger=logger).load()
+            with _stores_lock:
+                _stores[high_level_task] = store
+        return store
+
+
+def clear_sitemap_stores() -> None:
+    """
+    Drops every loaded sitemap so the next lookup downloads it again.
+    """
+    with _stores_lock:
+        _stores.clear()
+        _load_locks.clear()
@@ -0,0 +1,67 @@
+from google.cloud import storage # type: ignore
+from requests.adapters import HTTPAdapter # type: ignore
+from typing import Dict, Optional
+import os
+import threading
+
+
+_client: Optional[storage.Client] = None
+_buckets: Dict[str, storage.Bucket] = {}
+_client_lock = threading.Lock()
+
+
+def get_storage_client() -> storage.Client:
+    """
+    Returns the process-wide Google Cloud Storage client, creating it on first use.
+
+    Credential discovery and TLS handshakes happen once per process. The client's HTTP session gets a
+    connection pool sized for concurrent workers (GCS_HTTP_POOL_SIZE, default 64), so parallel downloads
+    reuse keep-alive connections instead of opening and discarding them.
+
+    Returns:
+        storage.Client: The shared storage client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = storage.Client()
+
+            # Resize the authorized session's connection pool in place, keeping the adapter google-auth
+            # configured (retries, mTLS)
+            session = getattr(client, "_http", None)
+            adapter = session.get_adapter("https://") if session is not None and hasattr(session, "get_adapter") else None
+            if isinstance(adapter, HTTPAdapter):
+                pool_size = int(os.getenv("GCS_HTTP_POOL_SIZE", 64))
+                adapter.poolmanager.clear()
+                adapter.init_poolmanager(pool_size, pool_size, block=adapter._pool_block)
+
+            _client = client
+        return _client
+
+
+def get_bucket_handle(bucket_name: str) -> storage.Bucket:
+    """
+    Returns a lazy handle to a bucket on the shared client. Unlike `client.get_bucket`, no request is made
+    until the handle is used.
+
+    Args:
+        bucket_name (str): The name of the GCS bucket.
+
+    Returns:
+        storage.Bucket: The bucket handle.
+    """
+    client = get_storage_client()
+    with _client_lock:
+        if bucket_name not in _buckets:
+            _buckets[bucket_name] = client.bucket(bucket_name)
+        return _buckets[bucket_name]
+
+
+def reset_storage_client() -> None:
+    """
+    Drops the shared client and bucket handles so the next call builds new ones.
+    """
+    global _client
+    with _client_lock:
+        _client = None
+        _buckets.clear()
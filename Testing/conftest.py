@@ -0,0 +1,31 @@
+import pytest
+from Retrieval.storage_client import reset_storage_client
+from Retrieval.bucket_manifest import clear_bucket_manifests
+from Retrieval.sitemap_store import clear_sitemap_stores
+from Models.response_cache import set_response_cache
+from Models.client_registry import reset_client_registry
+from Models.llm_metrics import get_llm_metrics
+from Pipeline.master_pipeline_module import load_prompt
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """
+    Drops process-wide clients and run-scoped caches around every test, so fakes patched by one test
+    never leak into the next.
+    """
+    reset_storage_client()
+    clear_bucket_manifests()
+    clear_sitemap_stores()
+    set_response_cache(None)
+    reset_client_registry()
+    get_llm_metrics().reset()
+    load_prompt.cache_clear()
+    yield
+    reset_storage_client()
+    clear_bucket_manifests()
+    clear_sitemap_stores()
+    set_response_cache(None)
+    reset_client_registry()
+    get_llm_metrics().reset()
+    load_prompt.cache_clear()
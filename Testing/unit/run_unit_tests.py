@@ -6,3 +6,26 @@ os.system("pytest Testing/unit/test_unit_get_all_ids.py")
 os.system("pytest Testing/unit/test_unit_gcp_retrieval.py")
 os.system("pytest Testing/unit/test_unit_execute_parser.py")
 os.system("pytest Testing/unit/test_unit_execute_finalizer.py")
+os.system("pytest Testing/unit/test_unit_execute_pipelines_concurrently.py")
+os.system("pytest Testing/unit/test_unit_bucket_manifest.py")
+os.system("pytest Testing/unit/test_unit_blob_downloader.py")
+os.system("pytest Testing/unit/test_unit_blob_cache.py")
+os.system("pytest Testing/unit/test_unit_sitemap_store.py")
+os.system("pytest Testing/unit/test_unit_store_secret.py")
+os.system("pytest Testing/unit/test_unit_storage_client.py")
+os.system("pytest Testing/unit/test_unit_output_sink.py")
+os.system("pytest Testing/unit/test_unit_execute_pipeline_resume.py")
+os.system("pytest Testing/unit/test_unit_response_cache.py")
+os.system("pytest Testing/unit/test_unit_client_registry.py")
+os.system("pytest Testing/unit/test_unit_execute_parser_async.py")
+os.system("pytest Testing/unit/test_unit_rate_limiter.py")
+os.system("pytest Testing/unit/test_unit_concurrency_controller.py")
+os.system("pytest Testing/unit/test_unit_retry_policy.py")
+os.system("pytest Testing/unit/test_unit_hedging.py")
+os.system("pytest Testing/unit/test_unit_execute_batch_run.py")
+os.system("pytest Testing/unit/test_unit_execute_parser_packed.py")
+os.system("pytest Testing/unit/test_unit_prompt_prefix.py")
+os.system("pytest Testing/unit/test_unit_relevance_filter.py")
+os.system("pytest Testing/unit/test_unit_finalizer_rules.py")
+os.system("pytest Testing/unit/test_unit_finalizer_payload.py")
+os.system("pytest Testing/unit/test_unit_html_cleaning.py")
@@ -0,0 +1,80 @@
+import io
+import os
+import pytest
+from Retrieval.blob_cache import BlobCache
+
+#############################
+# Test for BlobCache
+#############################
+
+def test_blob_cache(tmp_path):
+    # Fake bucket and blob classes counting downloads
+    downloads = []
+    class FakeBucket:
+        name = "fake_bucket"
+    class FakeBlob:
+        def __init__(self, name, generation, content):
+            self.name = name
+            self.generation = generation
+            self.md5_hash = None
+            self.bucket = FakeBucket()
+            self.content_type = "text/html; charset=utf-8"
+            self._content = content
+        def download_as_bytes(self):
+            downloads.append((self.name, self.generation))
+            return self._content
+
+    cache = BlobCache(str(tmp_path), max_bytes=10)
+
+    # Second read of the same generation is served from disk
+    assert cache.download(FakeBlob("a.html", 1, b"abcd")) == "abcd"
+    assert cache.download(FakeBlob("a.html", 1, b"abcd")) == "abcd"
+    assert downloads == [("a.html", 1)]
+
+    # A new generation is a new key
+    assert cache.download(FakeBlob("a.html", 2, b"efgh"), as_text=False) == b"efgh"
+    assert len(downloads) == 2
+
+    # Touch generation 1 so generation 2 is the least recently used, then go over quota
+    cache.download(FakeBlob("a.html", 1, b"abcd"))
+    cache.download(FakeBlob("b.html", 1, b"ijkl"))
+    assert cache._total_bytes <= 10
+    assert cache.get(BlobCache.make_key("fake_bucket", "a.html", 2)) is None
+    assert cache.get(BlobCache.make_key("fake_bucket", "a.html", 1)) == b"abcd"
+
+    # Entries on disk are picked up by a new cache instance
+    assert BlobCache(str(tmp_path), max_bytes=10)._total_bytes == cache._total_bytes
+
+
+def test_blob_cache_bypass(tmp_path):
+    # Blobs with no generation, md5 or bucket are downloaded directly
+    class FakeBlob:
+        name = "c.html"
+        def download_as_text(self):
+            return "direct"
+
+    cache = BlobCache(str(tmp_path))
+    assert cache.download(FakeBlob()) == "direct"
+
+
+def test_blob_cache_get_survives_concurrent_eviction(tmp_path, monkeypatch):
+    cache = BlobCache(str(tmp_path), max_bytes=10)
+    cache.put("aa" * 32, b"12345")
+
+    # A concurrent put evicts the entry between the unlocked read and the LRU update
+    def racing_open(path, mode="r"):
+        with io.open(path, mode) as file:
+            data = file.read()
+        cache.put("bb" * 32, b"1234567")
+        return io.BytesIO(data)
+    monkeypatch.setattr("Retrieval.blob_cache.open", racing_open, raising=False)
+
+    assert cache.get("aa" * 32) == b"12345"
+    assert "aa" * 32 not in cache._entries
+
+    # The index matches the disk: no phantom entry for the evicted file
+    on_disk = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(tmp_path) for name in names if not name.endswith(".tmp")
+    )
+    assert cache._total_bytes == on_disk == 7
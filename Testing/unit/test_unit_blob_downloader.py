@@ -0,0 +1,51 @@
+import threading
+import time
+import pytest
+from Retrieval.blob_downloader import BlobDownloader
+
+#############################
+# Test for BlobDownloader
+#############################
+
+def test_blob_downloader():
+    # Fake blobs with uneven latency, tracking peak concurrency
+    in_flight = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    class FakeBlob:
+        def __init__(self, name, delay):
+            self.name = name
+            self.delay = delay
+        def _download(self):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(self.delay)
+            with lock:
+                in_flight["now"] -= 1
+            return self.name
+        def download_as_text(self):
+            return self._download()
+        def download_as_bytes(self):
+            return self._download().encode()
+
+    blobs = [FakeBlob(f"blob{i}", 0.05 if i % 2 else 0.01) for i in range(10)]
+    downloader = BlobDownloader(max_workers=8)
+
+    contents = downloader.download(blobs, as_text=[i % 3 != 0 for i in range(10)], max_in_flight=3)
+
+    # Results keep input order and honour the per-call limit
+    assert contents == [f"blob{i}".encode() if i % 3 == 0 else f"blob{i}" for i in range(10)]
+    assert 1 < in_flight["peak"] <= 3
+
+
+def test_blob_downloader_raises():
+    class FailingBlob:
+        def download_as_text(self):
+            raise RuntimeError("download failed")
+    class FakeBlob:
+        def download_as_text(self):
+            return "ok"
+
+    downloader = BlobDownloader(max_workers=2)
+    with pytest.raises(RuntimeError):
+        downloader.download([FakeBlob(), FailingBlob(), FakeBlob()])
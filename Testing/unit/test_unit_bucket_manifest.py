@@ -0,0 +1,138 @@
+import io
+import threading
+import logging
+import pandas as pd
+import pytest
+from Retrieval.bucket_manifest import BucketManifest, get_bucket_manifest, clear_bucket_manifests
+from Retrieval.manifest_store import ManifestStore
+
+#############################
+# Test for BucketManifest
+#############################
+
+def test_bucket_manifest(monkeypatch):
+    # Create a fake Blob class
+    class FakeBlob:
+        def __init__(self, name, metadata, generation):
+            self.name = name
+            self.metadata = metadata
+            self.generation = generation
+            self.size = 10
+        def download_as_text(self):
+            return "<html></html>"
+
+    fake_blobs = [
+        FakeBlob("a/1.html", {"url": "http://example.com/1", "id": "1", "brand": "B"}, 11),
+        FakeBlob("a/1.png", {"url": "http://example.com/1", "id": "1", "brand": "B"}, 12),
+        FakeBlob("a/2.html", {"url": "http://example.com/2", "id": "2", "brand": "B"}, 13),
+        FakeBlob("a/", None, 14),  # Should be ignored
+    ]
+
+    # Count listing calls to make sure the folder is only listed once
+    list_calls = []
+    class FakeBucket:
+        def list_blobs(self, prefix):
+            list_calls.append(prefix)
+            return fake_blobs
+    class FakeClient:
+        def bucket(self, bucket_name):
+            return FakeBucket()
+    monkeypatch.setattr("google.cloud.storage.Client", lambda: FakeClient())
+
+    clear_bucket_manifests()
+    manifest = get_bucket_manifest("manifest_bucket", "a/")
+    assert get_bucket_manifest("manifest_bucket", "a/") is manifest
+    assert len(list_calls) == 1
+
+    assert manifest.get_ids() == {"1", "2"}
+    entries = manifest.get_entries("1")
+    assert [entry["name"] for entry in entries] == ["a/1.html", "a/1.png"]
+    assert entries[0]["generation"] == 11
+    assert entries[0]["url"] == "http://example.com/1"
+    assert manifest.get_entries("missing") == []
+
+    # Listed blobs are reused for downloads
+    assert manifest.get_blob(entries[0]) is fake_blobs[0]
+    clear_bucket_manifests()
+
+
+def test_bucket_manifest_incremental_refresh(monkeypatch, tmp_path):
+    # Create a fake Blob class
+    class FakeBlob:
+        def __init__(self, name, metadata, generation):
+            self.name = name
+            self.metadata = metadata
+            self.generation = generation
+
+    state = {
+        "a/1.html": FakeBlob("a/1.html", {"url": "http://example.com/1", "id": "1"}, 1),
+        "a/2.html": FakeBlob("a/2.html", {"url": "http://example.com/2", "id": "2"}, 1),
+    }
+
+    # Track full listings and per-blob metadata fetches
+    calls = {"full": 0, "lean": 0, "get_blob": []}
+    class FakeBucket:
+        def list_blobs(self, prefix, fields=None):
+            calls["lean" if fields else "full"] += 1
+            return list(state.values())
+        def get_blob(self, name):
+            calls["get_blob"].append(name)
+            return state.get(name)
+    class FakeClient:
+        def bucket(self, bucket_name):
+            return FakeBucket()
+    monkeypatch.setattr("google.cloud.storage.Client", lambda: FakeClient())
+
+    store = ManifestStore(str(tmp_path / "manifest.sqlite"))
+
+    # First build lists everything and saves the snapshot
+    manifest = BucketManifest("bucket", "a/").build(store=store)
+    assert manifest.get_ids() == {"1", "2"}
+    assert calls["full"] == 1
+
+    # Change one blob, add one and delete one
+    state["a/2.html"] = FakeBlob("a/2.html", {"url": "http://example.com/2b", "id": "2"}, 2)
+    state["a/3.html"] = FakeBlob("a/3.html", {"url": "http://example.com/3", "id": "3"}, 1)
+    del state["a/1.html"]
+
+    manifest = BucketManifest("bucket", "a/").build(store=store, refresh="diff")
+    assert calls["full"] == 1
+    assert calls["lean"] == 1
+    assert sorted(calls["get_blob"]) == ["a/2.html", "a/3.html"]
+    assert manifest.get_ids() == {"2", "3"}
+    assert manifest.get_entries("2")[0]["url"] == "http://example.com/2b"
+
+    # A fresh snapshot is trusted without listing
+    manifest = BucketManifest("bucket", "a/").build(store=store, max_age_seconds=3600)
+    assert calls["lean"] == 1
+    assert manifest.get_ids() == {"2", "3"}
+    store.close()
+
+
+def test_bucket_manifest_builds_do_not_block_other_folders(monkeypatch):
+    # Listing folder "a/" hangs until released; folder "b/" must not wait behind it
+    started, release = threading.Event(), threading.Event()
+    class FakeBucket:
+        def list_blobs(self, prefix):
+            if prefix == "a/":
+                started.set()
+                assert release.wait(5)
+            return []
+    class FakeClient:
+        def bucket(self, bucket_name):
+            return FakeBucket()
+    monkeypatch.setattr("google.cloud.storage.Client", lambda: FakeClient())
+
+    clear_bucket_manifests()
+    manifests = []
+    thread = threading.Thread(target=lambda: manifests.append(get_bucket_manifest("manifest_bucket", "a/")))
+    thread.start()
+    assert started.wait(5)
+
+    assert get_bucket_manifest("manifest_bucket", "b/").get_ids() == set()
+    assert not manifests
+
+    release.set()
+    thread.join(5)
+    assert get_bucket_manifest("manifest_bucket", "a/") is manifests[0]
+    clear_bucket_manifests()
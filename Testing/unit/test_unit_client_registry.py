@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from Models.client_registry import configure_client_pool, get_azure_openai_client, reset_client_registry
+from Models.gpt_models import GPTModel, get_gpt_model
+from Models.llm_metrics import get_llm_metrics
+
+#############################
+# Test for the model client registry
+#############################
+
+def test_shared_model_and_client(monkeypatch):
+    monkeypatch.setenv("GPT_KEY", "test-key")
+    configure_client_pool(16)
+
+    # Every worker gets the same model and client
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: get_gpt_model(), range(32)))
+    assert all(model is models[0] for model in models)
+    assert models[0].client is get_azure_openai_client()
+    assert models[0].client._client._transport._pool._max_connections == 16
+
+    reset_client_registry()
+    assert get_gpt_model() is not models[0]
+
+
+def test_token_usage_aggregates_across_threads(monkeypatch):
+    monkeypatch.setenv("GPT_KEY", "test-key")
+    metrics = get_llm_metrics()
+    model = GPTModel(client=object())
+
+    usage = {"completion_tokens": 1, "prompt_tokens": 2, "total_tokens": 3}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: model.record_usage(usage), range(400)))
+
+    assert model.token_usage == {"completion_tokens": 400, "prompt_tokens": 800, "total_tokens": 1200, "cached_prompt_tokens": 0}
+    snapshot = metrics.snapshot()
+    assert snapshot["total_tokens"] == 1200
+    assert snapshot["requests"] == 400
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import pytest
+from Models.concurrency_controller import AdaptiveConcurrencyController, is_overload_error
+from Models.llm_metrics import get_llm_metrics
+
+#############################
+# Test for AdaptiveConcurrencyController
+#############################
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_is_overload_error():
+    assert is_overload_error(FakeStatusError(429))
+    assert is_overload_error(FakeStatusError(503))
+    assert is_overload_error(TimeoutError())
+    assert not is_overload_error(FakeStatusError(400))
+    assert not is_overload_error(ValueError("bad schema"))
+
+
+def test_aimd_limit():
+    clock = FakeClock()
+    controller = AdaptiveConcurrencyController(initial_limit=4, max_limit=8, latency_target_seconds=10, clock=clock)
+
+    # Four healthy requests raise the limit by one
+    for _ in range(4):
+        controller.acquire()
+        controller.release(clock.now)
+    assert controller.limit == 4
+    controller.acquire()
+    controller.release(clock.now)
+    assert controller.limit == 5
+    assert get_llm_metrics().snapshot()["concurrency_limit"] == 5
+
+    # Slow successes and non-overload errors hold the limit
+    controller.acquire()
+    clock.now = 20.0
+    controller.release(0.0)
+    controller.acquire()
+    controller.release(clock.now, FakeStatusError(400))
+    assert controller.limit == 5
+
+    # A burst of 429s from requests in flight together cuts the limit once
+    started_at = clock.now
+    for _ in range(3):
+        controller.acquire()
+    clock.now = 21.0
+    for _ in range(3):
+        controller.release(started_at, FakeStatusError(429))
+    assert controller.limit == 2
+    assert controller.in_flight == 0
+
+    # A later 429 cuts again, down to the floor
+    controller.acquire()
+    controller.release(clock.now, TimeoutError())
+    controller.acquire()
+    controller.release(clock.now + 1, FakeStatusError(500))
+    assert controller.limit == 1
+
+
+def test_limit_bounds_sync_and_async_requests():
+    controller = AdaptiveConcurrencyController(initial_limit=3, max_limit=3)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def enter():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+
+    def leave():
+        with lock:
+            active[0] -= 1
+
+    def sync_request():
+        with controller.slot():
+            enter()
+            time.sleep(0.05)
+            leave()
+
+    async def async_request():
+        async with controller.aslot():
+            enter()
+            await asyncio.sleep(0.05)
+            leave()
+
+    async def async_requests():
+        await asyncio.gather(*(async_request() for _ in range(6)))
+
+    threads = [threading.Thread(target=sync_request) for _ in range(6)]
+    threads.append(threading.Thread(target=asyncio.run, args=(async_requests(),)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 3
+    assert controller.in_flight == 0
@@ -0,0 +1,117 @@
+import json
+import os
+import pandas as pd
+import pytest
+from Workflow.structured_outputs import BeefAttributes, BeefAttributesFinalizer
+from Models.batch_client import BatchRunner, LocalBatchEndpoint, build_batch_request, build_json_schema_response_format, parse_batch_result
+from Models.llm_metrics import get_llm_metrics
+from Workflow.run_journal import RunJournal
+from utils import CachedSecretProvider, FileSecretProvider, set_secret_provider
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for execute_batch_run
+#############################
+
+def responder(body):
+    # Echo the page text back as the scraped product name; "broken" pages fail
+    page = body["messages"][-1]["content"].split("<HTML>")[1].split("</HTML>")[0].strip()
+    if page == "broken":
+        raise ValueError("content filter")
+    assert body["response_format"]["type"] == "json_schema"
+    content = json.dumps({"is_match": True, "product_name_scraped": page})
+    return {
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "usage": {"completion_tokens": 5, "prompt_tokens": 20, "total_tokens": 25}
+    }
+
+
+def test_batch_request_round_trip():
+    request = build_batch_request("123:0", "wesel-4o-batch", [{"role": "user", "content": "hi"}], BeefAttributes)
+    assert request["url"] == "/chat/completions"
+    assert request["body"]["response_format"]["json_schema"]["name"] == "BeefAttributes"
+
+    line = {"custom_id": "123:0", "response": {"status_code": 200, "body": responder({**request["body"], "messages": [{"role": "user", "content": "<HTML>Ribeye</HTML>"}]})}}
+    assert parse_batch_result(line, BeefAttributes)["product_name_scraped"] == "Ribeye"
+    with pytest.raises(RuntimeError):
+        parse_batch_result({"custom_id": "123:0", "error": {"message": "expired"}}, BeefAttributes)
+
+
+def test_json_schema_response_format_is_strict():
+    response_format = build_json_schema_response_format(BeefAttributes)
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["name"] == "BeefAttributes"
+    assert response_format["json_schema"]["strict"] is True
+
+    # Strict mode: every property required, no additional properties
+    schema = response_format["json_schema"]["schema"]
+    assert schema["additionalProperties"] is False
+    assert sorted(schema["required"]) == sorted(schema["properties"]) == sorted(BeefAttributes.model_fields)
+
+
+def test_execute_batch_run(monkeypatch, tmp_path):
+    # The model key comes from the secret store, loaded before the batch run builds its client
+    secrets_file = tmp_path / "secrets.json"
+    secrets_file.write_text(json.dumps({"des-wesel": {"GPT_KEY": "test-key"}}))
+    set_secret_provider(CachedSecretProvider(FileSecretProvider(str(secrets_file))))
+    monkeypatch.delenv("GPT_KEY", raising=False)
+    try:
+        run_batch(monkeypatch, tmp_path)
+    finally:
+        set_secret_provider(None)
+        os.environ.pop("GPT_KEY", None)
+
+
+def run_batch(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_responses.sqlite"))
+    monkeypatch.setattr("Models.gpt_models.count_tokens", lambda text: len(text) // 4)
+
+    def fake_set_configurations(item_id, high_level_task):
+        return pd.DataFrame([{"Description": "Test"}]), item_id, pd.DataFrame()
+    def fake_gcp_retrieval(bucket_name, folder_path, metadata_key, metadata_value, filtered_sitemap):
+        return pd.DataFrame([
+            {"url": f"http://example.com/{metadata_value}/{i}", "id": metadata_value, "html": html, "description": "Ribeye", "manufacturer": "Test", "high_level_task": "beef"}
+            for i, html in enumerate([f"page {metadata_value}", "broken" if metadata_value == "2" else f"more {metadata_value}"])
+        ])
+    finalized = []
+    def fake_execute_finalizer(url_parsed_df, AttributesFinalizer):
+        finalized.append(url_parsed_df)
+        return pd.DataFrame([{"id": url_parsed_df["id"].values[0], "pages": len(url_parsed_df)}])
+    monkeypatch.setattr("Pipeline.master_pipeline_module.set_configurations", fake_set_configurations)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.gcp_retrieval", fake_gcp_retrieval)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.execute_finalizer", fake_execute_finalizer)
+
+    journal = RunJournal(str(tmp_path / "beef_run_journal.jsonl"))
+    endpoint = LocalBatchEndpoint(responder)
+    runner = BatchRunner(endpoint, batch_dir=str(tmp_path / "batches"), poll_interval_seconds=0.01, max_requests_per_file=3)
+    input_dicts = [
+        {"item_id": item_id, "high_level_task": "beef", "metadata_value": item_id,
+         "structured_output_parser": BeefAttributes, "structured_output_finalizer": BeefAttributesFinalizer,
+         "run_journal": journal}
+        for item_id in ["1", "2"]
+    ]
+
+    records = execute_batch_run(input_dicts, batch_runner=runner)
+
+    # Four requests split into two batch files; the failed page is dropped like in execute_parser
+    assert sorted(path.name for path in (tmp_path / "batches").iterdir()) == ["beef_parser_000.jsonl", "beef_parser_001.jsonl"]
+    assert records == [{"id": "1", "pages": 2}, {"id": "2", "pages": 1}]
+    parsed = {df["id"].values[0]: df for df in finalized}
+    assert list(parsed["1"].columns[:4]) == ["url", "id", "Product Name", "is_match"]
+    assert list(parsed["1"]["product_name_scraped"]) == ["page 1", "more 1"]
+    assert get_llm_metrics().snapshot()["total_tokens"] == 75
+
+    # Only the fully parsed item is checkpointed; the item with a failed page is retried on the next run
+    assert journal.last_stage("1") == "finalizer"
+    assert journal.last_stage("2") is None
+
+    # A rerun skips the finalized item and answers item 2's successful page from the response cache;
+    # only the failed page is resubmitted
+    submitted = []
+    monkeypatch.setattr(runner, "submit", lambda paths: submitted.extend(paths) or BatchRunner.submit(runner, paths))
+    execute_batch_run(input_dicts, batch_runner=runner)
+    assert len(submitted) == 1
+    assert len(open(submitted[0]).readlines()) == 1
+    journal.close()
@@ -21,6 +21,9 @@ def test_execute_parser(monkeypatch):
     class FakeGPTModel:
         def generate_response(self, sys_inst, user_inst, Attributes):
             return {"hello": "value"}
+
+        async def agenerate_response(self, sys_inst, user_inst, Attributes, hedge=False):
+            return {"hello": "value"}
     monkeypatch.setattr("Models.gpt_models.GPTModel", lambda: FakeGPTModel())
     
     # Prepare a fake scrape_df DataFrame with necessary columns
@@ -0,0 +1,43 @@
+import asyncio
+import time
+import pandas as pd
+import pytest
+from Workflow.structured_outputs import BeefAttributes
+from Pipeline.master_pipeline_module import execute_parser
+
+#############################
+# Test for the async execute_parser path
+#############################
+
+def test_execute_parser_async_fan_out(monkeypatch):
+
+    # Each page takes 0.2s; one page fails
+    class FakeGPTModel:
+        async def agenerate_response(self, sys_inst, user_inst, Attributes, hedge=False):
+            await asyncio.sleep(0.2)
+            if "http://example.com/3" in user_inst:
+                raise ValueError("content filter")
+            return {"is_match": True, "page": user_inst.split("Page ")[1].split()[0]}
+    monkeypatch.setattr("Models.gpt_models.GPTModel", lambda: FakeGPTModel())
+
+    scrape_df = pd.DataFrame([
+        {
+            "high_level_task": "beef",
+            "description": "Ribeye",
+            "manufacturer": "Test Manufacturer",
+            "html": f"Page {i} http://example.com/{i}",
+            "url": f"http://example.com/{i}",
+            "id": "123"
+        }
+        for i in range(10)
+    ])
+
+    start = time.monotonic()
+    result_df = execute_parser(scrape_df, BeefAttributes)
+    elapsed = time.monotonic() - start
+
+    # Pages run concurrently: about one page latency, not ten
+    assert elapsed < 1.0
+    assert list(result_df.columns) == ["url", "id", "Product Name", "is_match", "page"]
+    assert list(result_df["url"]) == [f"http://example.com/{i}" for i in range(10) if i != 3]
+    assert list(result_df["page"]) == [str(i) for i in range(10) if i != 3]
@@ -0,0 +1,60 @@
+import re
+import pandas as pd
+import pytest
+from Workflow.structured_outputs import BeefAttributes, create_packed_model
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for packed multi-page parsing
+#############################
+
+def test_create_packed_model():
+    Packed = create_packed_model(BeefAttributes)
+    assert create_packed_model(BeefAttributes) is Packed
+    packed = Packed.model_validate({"pages": [{"page_id": "p0", "is_match": True, "product_name_scraped": "Ribeye"}]})
+    assert packed.model_dump()["pages"][0]["page_id"] == "p0"
+    assert packed.pages[0].is_match
+
+
+def test_pack_pages(monkeypatch):
+    monkeypatch.setattr("Pipeline.master_pipeline_module.count_tokens", lambda text: len(text))
+    rows = [{"html": "x" * size} for size in [300, 300, 500, 2000, 100, 100]]
+    assert pack_pages(rows, token_budget=1000) == [[0, 1], [2], [3], [4, 5]]
+    assert pack_pages(rows, token_budget=1000, max_pages=1) == [[0], [1], [2], [3], [4], [5]]
+
+
+def test_execute_parser_packed(monkeypatch):
+    monkeypatch.setattr("Pipeline.master_pipeline_module.count_tokens", lambda text: len(text))
+    requests = []
+
+    # The fake model answers packed requests per page id, but "forgets" page p2
+    class FakeGPTModel:
+        async def agenerate_response(self, sys_inst, user_inst, Attributes, hedge=False):
+            requests.append((user_inst, Attributes))
+            if "pages" in Attributes.model_fields:
+                page_ids = re.findall(r'<Page id="(p\d+)">', user_inst)
+                return {"pages": [{"page_id": page_id, "is_match": True, "product_name_scraped": page_id} for page_id in page_ids if page_id != "p2"]}
+            return {"is_match": False, "product_name_scraped": "single"}
+    monkeypatch.setattr("Models.gpt_models.GPTModel", lambda: FakeGPTModel())
+
+    scrape_df = pd.DataFrame([
+        {"high_level_task": "beef", "description": "Ribeye", "manufacturer": "Test Manufacturer",
+         "html": "x" * size, "url": f"http://example.com/{i}", "id": "123"}
+        for i, size in enumerate([100, 100, 100, 5000])
+    ])
+
+    result_df = execute_parser(scrape_df, BeefAttributes, pack_token_budget=1000)
+
+    # Three small pages share one request; the large page goes alone
+    assert len(requests) == 2
+    assert requests[0][0].count("Product: Ribeye") == 1
+    assert requests[0][1].__name__ == "PackedBeefAttributes"
+    assert requests[1][1] is BeefAttributes
+
+    # Results are unpacked into per-URL rows; the missing page is dropped like a failed page
+    assert list(result_df.columns[:3]) == ["url", "id", "Product Name"]
+    assert "page_id" not in result_df.columns
+    assert list(result_df["url"]) == ["http://example.com/0", "http://example.com/1", "http://example.com/3"]
+    assert list(result_df["product_name_scraped"]) == ["p0", "p1", "single"]
@@ -0,0 +1,136 @@
+import io
+import logging
+import pandas as pd
+import pytest
+from pydantic import BaseModel
+from Workflow.structured_outputs import BeefAttributes, BeefAttributesFinalizer
+from Workflow.run_journal import RunJournal
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for execute_pipeline resume from the run journal
+#############################
+
+def test_execute_pipeline_resume(monkeypatch, tmp_path):
+    # Fake stages counting calls; the finalizer fails on its first call
+    calls = {"retrieval": 0, "parser": 0, "finalizer": 0}
+    def fake_set_configurations(item_id, high_level_task):
+        return pd.DataFrame([{"Description": "Test"}]), item_id, pd.DataFrame()
+    def fake_gcp_retrieval(*args):
+        calls["retrieval"] += 1
+        return pd.DataFrame([{"url": "http://example.com", "id": "123", "html": "text"}])
+    def fake_execute_parser(scrape_df, Attributes):
+        calls["parser"] += 1
+        return pd.DataFrame([{"url": "http://example.com", "id": "123", "is_match": True}])
+    def fake_execute_finalizer(url_parsed_df, AttributesFinalizer):
+        calls["finalizer"] += 1
+        if calls["finalizer"] == 1:
+            return pd.DataFrame([{"id": "123"}])
+        return pd.DataFrame([{"id": "123", "is_match": True}])
+    monkeypatch.setattr("Pipeline.master_pipeline_module.set_configurations", fake_set_configurations)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.gcp_retrieval", fake_gcp_retrieval)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.execute_parser", fake_execute_parser)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.execute_finalizer", fake_execute_finalizer)
+
+    journal_path = str(tmp_path / "beef_run_journal.jsonl")
+    input_dict = {"item_id": "123", "high_level_task": "beef"}
+
+    # First run: the failed finalizer is not checkpointed
+    journal = RunJournal(journal_path)
+    execute_pipeline(**input_dict, run_journal=journal)
+    journal.close()
+    assert journal.last_stage("123") == "parser"
+
+    # Second run resumes from the parser checkpoint
+    journal = RunJournal(journal_path)
+    output_dict = execute_pipeline(**input_dict, run_journal=journal)
+    journal.close()
+    assert calls == {"retrieval": 1, "parser": 1, "finalizer": 2}
+    assert output_dict["output_df"].iloc[0]["is_match"]
+
+    # Third run skips the finalized item entirely
+    journal = RunJournal(journal_path)
+    output_dict = execute_pipeline(**input_dict, run_journal=journal)
+    journal.close()
+    assert calls == {"retrieval": 1, "parser": 1, "finalizer": 2}
+    assert output_dict["output_df"].iloc[0]["id"] == "123"
+
+
+def test_execute_pipeline_resume_failed_parser(monkeypatch, tmp_path):
+    # Fake stages counting calls; every page fails to parse on the first run
+    calls = {"retrieval": 0, "parser": 0, "finalizer": 0}
+    def fake_set_configurations(item_id, high_level_task):
+        return pd.DataFrame([{"Description": "Test"}]), item_id, pd.DataFrame()
+    def fake_gcp_retrieval(*args):
+        calls["retrieval"] += 1
+        return pd.DataFrame([{"url": "http://example.com", "id": "123", "description": "Test", "html": "text"}])
+    def fake_execute_parser(scrape_df, Attributes):
+        calls["parser"] += 1
+        rows = scrape_df.to_dict(orient='records')
+        if calls["parser"] == 1:
+            return build_parsed_df(rows, [RuntimeError("LLM error")])
+        return build_parsed_df(rows, [{"is_match": True}])
+    def fake_execute_finalizer(url_parsed_df, AttributesFinalizer):
+        calls["finalizer"] += 1
+        return pd.DataFrame([{"id": url_parsed_df['id'].values[0], "is_match": True}])
+    monkeypatch.setattr("Pipeline.master_pipeline_module.set_configurations", fake_set_configurations)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.gcp_retrieval", fake_gcp_retrieval)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.execute_parser", fake_execute_parser)
+    monkeypatch.setattr("Pipeline.master_pipeline_module.execute_finalizer", fake_execute_finalizer)
+
+    journal_path = str(tmp_path / "beef_run_journal.jsonl")
+    input_dict = {"item_id": "123", "high_level_task": "beef"}
+
+    # First run: the failed parse is neither checkpointed nor finalized, the item only reports its id
+    journal = RunJournal(journal_path)
+    output_dict = execute_pipeline(**input_dict, run_journal=journal)
+    journal.close()
+    assert output_dict["output_df"].to_dict(orient='records') == [{"id": "123"}]
+    assert journal.last_stage("123") is None
+
+    # Second run retrieves and parses again
+    journal = RunJournal(journal_path)
+    output_dict = execute_pipeline(**input_dict, run_journal=journal)
+    journal.close()
+    assert calls == {"retrieval": 2, "parser": 2, "finalizer": 1}
+    assert output_dict["output_df"].iloc[0]["is_match"]
+    assert journal.last_stage("123") == "finalizer"
+
+
+def test_is_parse_complete():
+    rows = [{"url": f"http://example.com/{idx}", "id": "123", "description": "Test"} for idx in range(2)]
+    assert is_parse_complete(build_parsed_df(rows, [{"is_match": True}, {"is_match": False}]))
+    assert not is_parse_complete(build_parsed_df(rows, [{"is_match": True}, RuntimeError("LLM error")]))
+    assert not is_parse_complete(build_parsed_df(rows, [RuntimeError("LLM error"), None]))
+
+    # Checkpointed outputs (no attrs) are complete unless empty
+    assert is_parse_complete(pd.DataFrame([{"url": "http://example.com", "id": "123"}]))
+    assert not is_parse_complete(pd.DataFrame([]))
+
+
+def test_get_run_fingerprint(monkeypatch):
+    fingerprint = get_run_fingerprint("beef", BeefAttributes, BeefAttributesFinalizer)
+    assert fingerprint == get_run_fingerprint("beef", BeefAttributes, BeefAttributesFinalizer)
+    assert fingerprint != get_run_fingerprint("shrimp", BeefAttributes, BeefAttributesFinalizer)
+    assert fingerprint != get_run_fingerprint("beef", BeefAttributesFinalizer, BeefAttributesFinalizer)
+
+    # Parser outputs depend on the cleaned page text
+    monkeypatch.setenv("HTML_CLEANING_ENGINE", "reference")
+    assert fingerprint != get_run_fingerprint("beef", BeefAttributes, BeefAttributesFinalizer)
+
+
+def test_run_journal_skips_retrieval_records(tmp_path):
+    # Journals of earlier versions also checkpointed the retrieved pages
+    journal_path = tmp_path / "beef_run_journal.jsonl"
+    journal_path.write_text(
+        '{"item_id": "123", "stage": "retrieval", "records": [{"html": "text"}]}\n'
+        '{"item_id": "123", "stage": "parser", "records": [{"id": "123"}]}\n'
+    )
+    journal = RunJournal(str(journal_path))
+    assert journal.get("123", "retrieval") is None
+    assert journal.last_stage("123") == "parser"
+    with pytest.raises(ValueError):
+        journal.record("123", "retrieval", [])
+    journal.close()
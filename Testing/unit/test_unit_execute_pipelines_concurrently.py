@@ -0,0 +1,40 @@
+import io
+import logging
+import threading
+import pandas as pd
+import pytest
+from pydantic import BaseModel
+from Workflow.structured_outputs import BeefAttributes, BeefAttributesFinalizer
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for execute_pipelines_concurrently
+#############################
+
+def test_execute_pipelines_concurrently(monkeypatch):
+    # Fake execute_pipeline that fails for one item and tracks peak concurrency
+    in_flight = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    def fake_execute_pipeline(**kwargs):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            if kwargs["item_id"] == "bad":
+                raise RuntimeError("boom")
+            return {"output_df": pd.DataFrame([{"id": kwargs["item_id"]}])}
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+    monkeypatch.setattr("Pipeline.master_pipeline_module.execute_pipeline", fake_execute_pipeline)
+
+    input_dicts = [{"item_id": item_id} for item_id in ["1", "bad", "2", "3", "4"]]
+    seen = []
+    records = execute_pipelines_concurrently(input_dicts, max_workers=2, on_result=seen.append)
+
+    # Failed items are skipped and the rest keep input order
+    assert [record["id"] for record in records] == ["1", "2", "3", "4"]
+    assert sorted(record["id"] for record in seen) == ["1", "2", "3", "4"]
+    assert in_flight["peak"] <= 2
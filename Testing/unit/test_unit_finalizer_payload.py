@@ -0,0 +1,68 @@
+import json
+import pandas as pd
+import pytest
+from pydantic import BaseModel
+from Pipeline.finalizer_payload import build_finalizer_payload, serialize_finalizer_payload, split_finalizer_payload
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for the compact finalizer payload
+#############################
+
+ROWS = [
+    {"url": "http://a.com", "id": "123", "Product Name": "Angus Patty", "is_match": True, "breed": "Angus", "size": None},
+    {"url": "http://b.com", "id": "123", "Product Name": "Angus Patty", "is_match": True, "breed": "Wagyu", "size": "10 lbs"},
+    {"url": "http://c.com", "id": "123", "Product Name": "Angus Patty", "is_match": False, "breed": "Kobe", "size": None},
+]
+
+
+def test_build_finalizer_payload_drops_nulls_and_non_matches():
+    shared, pages = build_finalizer_payload(ROWS)
+
+    assert shared == {"id": "123", "Product Name": "Angus Patty", "is_match": True}
+    assert pages == [{"url": "http://a.com", "breed": "Angus"}, {"url": "http://b.com", "breed": "Wagyu", "size": "10 lbs"}]
+    assert serialize_finalizer_payload(shared, pages) == json.dumps({"shared": shared, "pages": pages}, separators=(",", ":"))
+
+    # Without any match every row is kept
+    _, pages = build_finalizer_payload([ROWS[2]])
+    assert pages == [{"url": "http://c.com", "id": "123", "Product Name": "Angus Patty", "is_match": False, "breed": "Kobe"}]
+
+
+def test_split_finalizer_payload_keeps_two_pages_per_chunk():
+    pages = [{"url": f"http://{i}.com", "html": "x" * size} for i, size in enumerate([40, 40, 40, 500, 40])]
+
+    chunks = split_finalizer_payload({}, pages, token_budget=150, count_tokens=len)
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert sum(chunks, []) == pages
+
+
+def test_execute_finalizer_map_reduce(monkeypatch):
+    monkeypatch.setattr("Pipeline.master_pipeline_module.count_tokens", lambda text: len(text))
+    monkeypatch.setenv("FINALIZER_TOKEN_BUDGET", "400")
+    monkeypatch.setattr("Pipeline.master_pipeline_module.load_prompt", lambda path: "finalizer prompt")
+    calls = []
+
+    class FakeGPTModel:
+        def generate_response(self, sys_inst, user_inst, AttributesFinalizer):
+            calls.append(user_inst)
+            return {"final_attr": f"call{len(calls)}"}
+    monkeypatch.setattr("Models.gpt_models.GPTModel", lambda: FakeGPTModel())
+
+    class DummyAttributesFinalizer(BaseModel):
+        final_attr: str
+
+    url_parsed_df = pd.DataFrame([
+        {"url": f"http://example.com/{i}", "id": "123", "Product Name": "Angus Patty", "is_match": True, "opl": f"{i}" * 100}
+        for i in range(6)
+    ])
+    result_df = execute_finalizer(url_parsed_df, DummyAttributesFinalizer, fast_path=False)
+
+    # Three partial finalizations, then one over their outputs
+    assert len(calls) == 4
+    assert all(len(call) <= 400 for call in calls[:3])
+    assert json.loads(calls[3])["pages"] == [{"final_attr": "call1"}, {"final_attr": "call2"}, {"final_attr": "call3"}]
+    assert result_df.iloc[0]["final_attr"] == "call4"
+    assert result_df.iloc[0]["id"] == "123"
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Workflow.structured_outputs import BeefAttributesFinalizer, ShrimpAttributesFinalizer
+from Models.llm_metrics import get_llm_metrics
+from Pipeline.finalizer_rules import consolidate_parser_outputs, vote
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for the deterministic finalizer
+#############################
+
+def parsed_df(rows):
+    return pd.DataFrame([{"id": "123", "Product Name": "Angus Patty", **row} for row in rows])
+
+
+def test_vote_modes():
+    assert vote(["Angus", "angus "]) == (True, "Angus", 1.0)
+    assert vote(["Angus", "Angus", "Wagyu"])[0] is False
+    assert vote(["Angus", "Angus", "Wagyu"], mode="majority")[:2] == (True, "Angus")
+    assert vote(["Angus", "Wagyu"], mode="majority")[0] is False
+    assert vote([]) == (True, None, 1.0)
+
+
+def test_consolidate_agreeing_pages():
+    url_parsed_df = parsed_df([
+        {"url": "http://a.com", "is_match": True, "product_name_scraped": "Angus Patty", "breed": "Angus", "is_kosher": False, "size": None},
+        {"url": "http://b.com", "is_match": True, "product_name_scraped": "Angus Patty", "breed": None, "is_kosher": True, "size": "10 lbs"},
+        {"url": "http://c.com", "is_match": False, "product_name_scraped": "Wagyu Patty", "breed": "Wagyu", "is_kosher": None, "size": None},
+    ])
+
+    output = consolidate_parser_outputs(url_parsed_df, BeefAttributesFinalizer)
+
+    assert output["breed"] == "Angus"
+    assert output["size"] == "10 lbs"
+    assert output["is_kosher"] is True
+    assert output["is_halal"] is None
+    assert output["Primary_Beef_URL"] == "http://a.com"
+    assert output["Secondary_Beef_URLs"] == ["http://b.com"]
+    assert output["Confidence_Score_Beef"] == 1.0
+
+
+def test_consolidate_returns_none_on_conflict_or_no_match():
+    conflict_df = parsed_df([
+        {"url": "http://a.com", "is_match": True, "product_name_scraped": "Shrimp", "type": "White"},
+        {"url": "http://b.com", "is_match": True, "product_name_scraped": "Shrimp", "type": "Pink"},
+    ])
+    assert consolidate_parser_outputs(conflict_df, ShrimpAttributesFinalizer) is None
+    assert consolidate_parser_outputs(conflict_df, ShrimpAttributesFinalizer, mode="majority") is None
+
+    no_match_df = parsed_df([{"url": "http://a.com", "is_match": False, "product_name_scraped": None}])
+    assert consolidate_parser_outputs(no_match_df, ShrimpAttributesFinalizer) is None
+
+    # Journaled parser output comes back with numpy booleans and NaN
+    journaled_df = parsed_df([{"url": "http://a.com", "is_match": np.bool_(True), "product_name_scraped": "Shrimp", "type": np.nan}])
+    assert consolidate_parser_outputs(journaled_df, ShrimpAttributesFinalizer)["type"] is None
+
+
+def test_execute_finalizer_fast_path_and_conflicts(monkeypatch):
+    calls = []
+
+    class FakeGPTModel:
+        def generate_response(self, sys_inst, user_inst, AttributesFinalizer):
+            calls.append(user_inst)
+            return {"is_match": True, "product_name_scraped": "Shrimp", "Primary_Shrimp_URL": "http://a.com",
+                    "Secondary_Shrimp_URLs": [], "Confidence_Score_Shrimp": 0.5, "Confidence_Explanation_Shrimp": "llm"}
+    monkeypatch.setattr("Models.gpt_models.GPTModel", lambda: FakeGPTModel())
+    monkeypatch.setattr("Pipeline.master_pipeline_module.load_prompt", lambda path: "finalizer prompt")
+
+    single_df = parsed_df([{"url": "http://a.com", "is_match": True, "product_name_scraped": "Shrimp", "type": "White"}])
+    result_df = execute_finalizer(single_df, ShrimpAttributesFinalizer)
+    assert calls == []
+    assert result_df.iloc[0]["id"] == "123"
+    assert result_df.iloc[0]["type"] == "White"
+
+    conflict_df = parsed_df([
+        {"url": "http://a.com", "is_match": True, "product_name_scraped": "Shrimp", "type": "White"},
+        {"url": "http://b.com", "is_match": True, "product_name_scraped": "Shrimp", "type": "Pink"},
+    ])
+    result_df = execute_finalizer(conflict_df, ShrimpAttributesFinalizer)
+    assert len(calls) == 1
+    assert result_df.iloc[0]["Confidence_Explanation_Shrimp"] == "llm"
+
+    execute_finalizer(single_df, ShrimpAttributesFinalizer, fast_path=False)
+    assert len(calls) == 2
+
+    snapshot = get_llm_metrics().snapshot()
+    assert snapshot["finalizer_fast_path"] == 1
+    assert snapshot["finalizer_llm"] == 2
@@ -18,13 +18,14 @@ store_secret(secret_name="des-wesel",project_id="cd-ds-384118")
 def test_get_all_ids(monkeypatch):
     # Create a fake Blob class for testing get_all_ids
     class FakeBlob:
-        def __init__(self, metadata):
+        def __init__(self, name, metadata):
+            self.name = name
             self.metadata = metadata
     
-    fake_blob1 = FakeBlob(metadata={"id": "1"})
-    fake_blob2 = FakeBlob(metadata={"id": "2"})
-    fake_blob3 = FakeBlob(metadata={"id": "3"})
-    fake_blob4 = FakeBlob(metadata=None)  # Should be ignored
+    fake_blob1 = FakeBlob(name="1.html", metadata={"id": "1"})
+    fake_blob2 = FakeBlob(name="2.html", metadata={"id": "2"})
+    fake_blob3 = FakeBlob(name="3.html", metadata={"id": "3"})
+    fake_blob4 = FakeBlob(name="4.html", metadata=None)  # Should be ignored
     fake_blobs = [fake_blob1, fake_blob2, fake_blob3, fake_blob4]
     
     # Create fake bucket and client classes
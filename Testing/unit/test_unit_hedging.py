@@ -0,0 +1,137 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from Workflow.structured_outputs import BeefAttributes
+from Models.gpt_models import GPTModel
+from Models.hedging import HedgeRejected, LatencyTracker, RequestHedger, get_request_hedger
+from Models.llm_metrics import get_llm_metrics
+from Models.rate_limiter import TokenBucketRateLimiter
+
+#############################
+# Test for RequestHedger
+#############################
+
+def make_hedger(latency=0.05):
+    hedger = RequestHedger(percentile=95, min_samples=5, min_delay_seconds=0.0)
+    for _ in range(20):
+        hedger.latencies.record(latency)
+    return hedger
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=10)
+    assert tracker.percentile(95) is None
+    for latency in range(1, 21):
+        tracker.record(latency)
+    assert tracker.percentile(50) == 15
+    assert tracker.percentile(95) == 20
+    assert tracker.percentile(95, min_samples=11) is None
+
+
+def test_slow_request_is_hedged():
+    hedger = make_hedger()
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(2)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "primary"
+
+    async def fast():
+        await asyncio.sleep(0.01)
+        return "hedge"
+
+    start = time.monotonic()
+    assert asyncio.run(hedger.run(slow, fast)) == "hedge"
+    assert time.monotonic() - start < 0.5
+    assert cancelled == [True]
+
+    snapshot = get_llm_metrics().snapshot()
+    assert snapshot["hedge_requests"] == 1
+    assert snapshot["hedges"] == 1
+    assert snapshot["hedge_wins"] == 1
+
+
+def test_fast_request_and_cold_start_are_not_hedged():
+    async def fast():
+        await asyncio.sleep(0.01)
+        return "primary"
+
+    assert asyncio.run(make_hedger(latency=1.0).run(fast)) == "primary"
+    assert asyncio.run(RequestHedger(min_samples=5).run(fast)) == "primary"
+    assert "hedges" not in get_llm_metrics().snapshot()
+
+
+def test_rejected_or_invalid_hedge_waits_for_primary():
+    hedger = make_hedger()
+
+    async def primary():
+        await asyncio.sleep(0.2)
+        return {"is_match": True}
+
+    async def rejected():
+        raise HedgeRejected("no quota")
+
+    async def invalid():
+        return None
+
+    assert asyncio.run(hedger.run(primary, rejected)) == {"is_match": True}
+    assert asyncio.run(hedger.run(primary, invalid)) == {"is_match": True}
+
+    snapshot = get_llm_metrics().snapshot()
+    assert snapshot["hedges"] == 2
+    assert snapshot["hedges_rejected"] == 1
+    assert "hedge_wins" not in snapshot
+
+
+def test_failed_primary_raises():
+    hedger = make_hedger()
+
+    async def failing():
+        await asyncio.sleep(0.1)
+        raise ValueError("content filter")
+
+    async def rejected():
+        raise HedgeRejected("no quota")
+
+    with pytest.raises(ValueError):
+        asyncio.run(hedger.run(failing, rejected))
+
+
+def test_cancelled_primary_is_recorded_and_refunded(monkeypatch, tmp_path):
+    monkeypatch.setenv("GPT_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_responses.sqlite"))
+    monkeypatch.setenv("LLM_CONCURRENCY_ADAPTIVE", "0")
+    monkeypatch.setenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0")
+    monkeypatch.setattr("Models.gpt_models.count_tokens", lambda text: 100)
+
+    # The primary hangs until cancelled; the hedge answers in 0.05s
+    calls = []
+    async def parse(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(2 if len(calls) == 1 else 0.05)
+        return SimpleNamespace(
+            usage={"completion_tokens": 50, "prompt_tokens": 100, "total_tokens": 150},
+            choices=[SimpleNamespace(message=SimpleNamespace(parsed={"is_match": True}))]
+        )
+    async_client = SimpleNamespace(beta=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=parse))))
+
+    limiter = TokenBucketRateLimiter(requests_per_minute=600, tokens_per_minute=100000, completion_tokens_estimate=500, clock=lambda: 0.0)
+    model = GPTModel(client=object(), async_client=async_client, rate_limiter=limiter)
+    hedger = get_request_hedger()
+    for _ in range(20):
+        hedger.latencies.record(0.02)
+
+    assert asyncio.run(model.agenerate_response("system", "user", BeefAttributes, hedge=True)) == {"is_match": True}
+    assert len(calls) == 2
+    assert get_llm_metrics().snapshot()["hedge_wins"] == 1
+
+    # The cancelled primary's latency (hedge delay + hedge latency) is in the window, not just the winner's
+    assert hedger.latencies.percentile(100) >= 0.06
+
+    # The primary is charged its prompt only and the hedge its real usage; both 600 token reservations are settled
+    assert limiter._tokens == pytest.approx(100000 - 100 - 150)
@@ -0,0 +1,155 @@
+import pytest
+from Tools import html_cleaning
+from Tools.html_cleaning import benchmark_engines, clean_html, get_cleaning_engine, lxml_engine, reference_engine, synthetic_page
+
+#############################
+# Test for the HTML cleaning engines
+#############################
+
+PAGES = [
+    "hello <b>world</b>",
+    "<p>a</p><p>b</p>",
+    "<div>x<!-- comment -->y</div> trailing",
+    '<?xml version="1.0" encoding="utf-8"?><html><body>Z &nbsp; &eacute; &amp;lt;b&amp;gt;</body></html>',
+    "<html><body><table><tr><td>1<td>2</table><ul><li>a<li>b</ul></body></html>",
+    "<p>unclosed <b>bold <i>italic</p> after",
+    "<noscript>ns</noscript><script>var x = 1;</script>t<style>.a{}</style>u<template>v</template>w",
+    "<html><head><title>T</title></head><body>\n\n   spaced    text   here \n</body></html>",
+    "&lt;script&gt;alert(1)&lt;/script&gt; ok",
+    "before<html><body>in</body></html>after",
+    "<!DOCTYPE html><textarea>t  a</textarea><pre> p\n q</pre>",
+    synthetic_page(50),
+    "",
+]
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_lxml_engine_matches_reference(html):
+    assert lxml_engine(html) == reference_engine(html)
+
+
+def test_clean_html_returns_plain_text():
+    assert clean_html("<html><body><h1>Beef</h1>\n<p>Angus  patty</p></body></html>") == "Beef\nAngus  patty"
+    assert clean_html("<p>x</p>", engine="reference") == "x"
+
+
+def test_get_cleaning_engine_fallback(monkeypatch):
+    assert get_cleaning_engine() is lxml_engine
+    monkeypatch.setenv("HTML_CLEANING_ENGINE", "reference")
+    assert get_cleaning_engine() is reference_engine
+
+    # Without lxml installed the default falls back to the reference engine
+    monkeypatch.delenv("HTML_CLEANING_ENGINE")
+    monkeypatch.setattr(html_cleaning, "CLEANING_ENGINES", {"reference": reference_engine})
+    assert get_cleaning_engine() is reference_engine
+    with pytest.raises(ValueError):
+        get_cleaning_engine("html5lib")
+
+
+def test_benchmark_engines_reports_throughput():
+    throughput = benchmark_engines([synthetic_page(20)], repeat=1)
+    assert set(throughput) == {"reference", "lxml"}
+    assert all(mb_per_second > 0 for mb_per_second in throughput.values())
+
+
+#############################
+# Test for boilerplate stripping
+#############################
+
+PRODUCT_PAGE = """<html><head><title>Angus Patty | Shop</title></head><body>
+<header><a href="/">Logo</a><div class="mega-menu"><a>Beef</a><a>Pork</a></div></header>
+<div id="cookie-banner">We use cookies to improve your experience.</div>
+<div role="navigation">Skip to content</div>
+<div class="page">
+  <div class="sidebar"><ul>""" + "".join(f'<li><a href="/c/{i}">Category number {i}</a></li>' for i in range(8)) + """</ul></div>
+  <div class="product"><h1>Angus Beef Patty 4oz</h1>
+    <p>""" + "Premium frozen Angus beef patties, 48 per case, choice grade. " * 4 + """</p>
+    <table><tr><td>Calories</td><td>280</td></tr></table>
+    <p>Brand: <a href="/acme">Acme</a></p>
+  </div>
+</div>
+<footer>Copyright Shop Inc.</footer><script>window.__STATE__ = {}</script></body></html>"""
+
+
+def test_boilerplate_rules():
+    root = html_cleaning.parse_html('<html><body><div class="site-nav">a</div><div class="canvas">b</div><div id="CookieBanner">c</div>'
+                                    '<section role="complementary">d</section><main class="modal-open">e</main></body></html>')
+    assert [html_cleaning.is_boilerplate(element) for element in root.iter("div", "section", "main")] == [False, False, True, True, False]
+
+    # Weak names only mark structural elements
+    root = html_cleaning.parse_html('<html><body><ul class="site-nav"><li class="menu-item">a</li></ul><span class="share-price">b</span>'
+                                    '<div class="overlay-spec">c</div><div class="page"><header class="social-bar">d</header></div></body></html>')
+    assert [html_cleaning.is_boilerplate(element) for element in root.iter("ul", "li", "span", "div", "header")] == [True, False, False, False, False, True]
+
+
+def test_clean_page_keeps_product_content():
+    text, stats = html_cleaning.clean_page(PRODUCT_PAGE, strip_boilerplate=True)
+
+    assert text.splitlines()[0] == "Angus Patty | Shop"
+    assert "Angus Beef Patty 4oz" in text
+    assert "Calories280" in text
+    assert "Brand: Acme" in text
+    for boilerplate in ("Logo", "cookies", "Skip to content", "Category number", "Copyright", "__STATE__"):
+        assert boilerplate not in text
+    assert stats["tokens_after"] < stats["tokens_before"]
+    assert stats["tokens_saved_ratio"] == 1 - stats["tokens_after"] / stats["tokens_before"]
+
+
+def test_clean_page_without_boilerplate_stripping(monkeypatch):
+    assert html_cleaning.clean_page(PRODUCT_PAGE, strip_boilerplate=False)[0] == lxml_engine(PRODUCT_PAGE)
+    assert html_cleaning.clean_page(PRODUCT_PAGE, engine="reference")[1]["tokens_saved_ratio"] == 0.0
+
+    # Stripping is opt-in
+    assert clean_html(PRODUCT_PAGE) == lxml_engine(PRODUCT_PAGE)
+    monkeypatch.setenv("HTML_STRIP_BOILERPLATE", "1")
+    assert clean_html(PRODUCT_PAGE) == html_cleaning.clean_page(PRODUCT_PAGE, strip_boilerplate=True)[0]
+
+
+RETAILER_PAGE = """<!DOCTYPE html><html><head><title>Angus Ground Beef Patties 4oz | Foodservice Direct</title></head><body>
+<header class="site-header"><a href="/">Foodservice Direct</a>
+  <ul class="main-menu">""" + "".join(f'<li class="menu-item"><a href="/c/{c}">{c}</a></li>' for c in ("Beef", "Pork", "Poultry", "Seafood", "Dairy")) + """</ul>
+</header>
+<div class="breadcrumbs"><a href="/">Home</a> / <a href="/c/beef">Beef</a> / Patties</div>
+<div class="container">
+  <div class="product-detail">
+    <div class="product-description">
+      <h1>Angus Ground Beef Patties 4oz</h1>
+      <p>""" + "Our premium Angus ground beef patties are made from USDA choice chuck, formed for consistent cooking and individually quick frozen to lock in flavor. " * 8 + """</p>
+      <p>Price: <span class="share-price">$89.99</span> per case</p>
+    </div>
+    <div class="product-specs"><h2>Specifications</h2>
+      <table><tr><th>Pack Size</th><td>40 x 4 oz</td></tr><tr><th>Grade</th><td>USDA Choice</td></tr><tr><th>Lean Ratio</th><td>80/20</td></tr></table>
+      <div class="overlay-spec">Storage: keep frozen at 0F</div>
+    </div>
+    <div class="nutrition"><h2>Nutrition Facts</h2>
+      <dl><dt>Calories</dt><dd>280</dd><dt>Protein</dt><dd>19g</dd></dl>
+    </div>
+  </div>
+  <div class="related"><h2>Related</h2><ul>""" + "".join(f'<li><a href="/p/{i}">Beef Burger Patty Item {i}</a></li>' for i in range(10)) + """</ul></div>
+</div>
+<footer><ul class="footer-links"><li><a href="/about">About</a></li><li><a href="/privacy">Privacy</a></li></ul></footer>
+</body></html>"""
+
+
+def test_clean_page_keeps_sibling_spec_tables():
+    text, stats = html_cleaning.clean_page(RETAILER_PAGE, strip_boilerplate=True)
+
+    # The description, price and the spec and nutrition blocks next to it all stay
+    assert "Angus Ground Beef Patties 4oz" in text
+    assert "USDA choice chuck" in text
+    assert "Price: $89.99 per case" in text
+    assert "Pack Size40 x 4 oz" in text
+    assert "Lean Ratio80/20" in text
+    assert "Storage: keep frozen at 0F" in text
+    assert "Calories280" in text
+
+    # Navigation, menus, related products and footer go
+    for boilerplate in ("Poultry", "Beef Burger Patty Item", "Privacy"):
+        assert boilerplate not in text
+    assert stats["tokens_after"] < stats["tokens_before"]
+
+
+def test_clean_page_falls_back_to_full_text():
+    # A region holding too little of the page's content is not trusted
+    full_text, text = html_cleaning.lxml_content_engine(RETAILER_PAGE, min_content_share=1.0)
+    assert text == full_text == lxml_engine(RETAILER_PAGE)
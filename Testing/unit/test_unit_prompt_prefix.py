@@ -0,0 +1,47 @@
+import io
+from types import SimpleNamespace
+from Models.gpt_models import GPTModel
+from Models.llm_metrics import get_llm_metrics
+from Pipeline.master_pipeline_module import build_packed_parser_message, build_parser_message, build_product_header, load_prompt
+
+
+ROWS = [
+    {"url": "http://a.com", "description": "Beef Patty", "manufacturer": "Acme", "html": "page a"},
+    {"url": "http://b.com", "description": "Beef Patty", "manufacturer": "Acme", "html": "page b"},
+]
+
+
+def test_parser_messages_share_product_header_prefix():
+    header = build_product_header(ROWS[0])
+
+    assert build_parser_message(ROWS[0]).startswith(header)
+    assert build_parser_message(ROWS[1]).startswith(header)
+    assert build_packed_parser_message(ROWS, ["p0", "p1"]).startswith(header)
+    assert "page a" not in header
+
+
+def test_load_prompt_reads_file_once(monkeypatch):
+    reads = []
+    def fake_open(file, mode="r", *args, **kwargs):
+        reads.append(file)
+        return io.StringIO("parser prompt")
+    monkeypatch.setattr("builtins.open", fake_open)
+
+    assert load_prompt("Prompts/beef_parser.txt") == "parser prompt"
+    assert load_prompt("Prompts/beef_parser.txt") == "parser prompt"
+    assert reads == ["Prompts/beef_parser.txt"]
+
+
+def test_record_usage_counts_cached_prompt_tokens(monkeypatch):
+    monkeypatch.setenv("GPT_KEY", "test-key")
+    model = GPTModel(client=object())
+
+    # SDK usage objects and Batch API usage dictionaries
+    model.record_usage({"completion_tokens": 10, "prompt_tokens": 2000, "total_tokens": 2010, "prompt_tokens_details": SimpleNamespace(cached_tokens=1536)})
+    model.record_usage({"completion_tokens": 10, "prompt_tokens": 2000, "total_tokens": 2010, "prompt_tokens_details": {"cached_tokens": 0}})
+    model.record_usage({"completion_tokens": 10, "prompt_tokens": 1000, "total_tokens": 1010})
+
+    assert model.token_usage["cached_prompt_tokens"] == 1536
+    snapshot = get_llm_metrics().snapshot()
+    assert snapshot["cached_prompt_tokens"] == 1536
+    assert snapshot["prompt_cache_hit_rate"] == 1536 / 5000
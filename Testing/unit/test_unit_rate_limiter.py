@@ -0,0 +1,70 @@
+import asyncio
+import time
+import pytest
+from Models.rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+
+#############################
+# Test for TokenBucketRateLimiter
+#############################
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limiter_buckets():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(requests_per_minute=60, tokens_per_minute=1200, completion_tokens_estimate=100, clock=clock)
+    assert limiter.estimate_tokens(500) == 600
+
+    # The token bucket runs dry first
+    assert limiter.try_acquire(600) == 0
+    assert limiter.try_acquire(600) == 0
+    wait = limiter.try_acquire(600)
+    assert wait == pytest.approx(30.0)
+
+    # Refills continuously
+    clock.now = 30.0
+    assert limiter.try_acquire(600) == 0
+
+    # Real usage below the reservation is refunded, and the completion estimate follows usage
+    limiter.reconcile(600, {"completion_tokens": 50, "total_tokens": 300})
+    assert limiter.try_acquire(300) == 0
+    assert limiter.completion_tokens_estimate == pytest.approx(95.0)
+
+
+def test_rate_limiter_request_quota():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(requests_per_minute=2, tokens_per_minute=100000, clock=clock)
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == pytest.approx(30.0)
+
+
+def test_rate_limiter_async_and_sync_waits():
+    limiter = TokenBucketRateLimiter(requests_per_minute=600, tokens_per_minute=1e6)
+    for _ in range(600):
+        assert limiter.try_acquire(1) == 0
+
+    async def acquire_all():
+        await asyncio.gather(*(limiter.aacquire(1) for _ in range(3)))
+
+    # Ten requests per second are admitted once the bucket is empty
+    start = time.monotonic()
+    asyncio.run(acquire_all())
+    limiter.acquire(1)
+    assert 0.3 <= time.monotonic() - start < 2.0
+
+
+def test_rate_limiter_from_environment(monkeypatch):
+    monkeypatch.setenv("LLM_RATE_LIMIT_RPM", "100")
+    monkeypatch.setenv("LLM_RATE_LIMIT_TPM", "5000")
+    limiter = get_rate_limiter()
+    assert limiter is get_rate_limiter()
+    assert (limiter.requests_per_minute, limiter.tokens_per_minute) == (100, 5000)
+
+    monkeypatch.setenv("LLM_RATE_LIMIT_TPM", "")
+    assert get_rate_limiter() is None
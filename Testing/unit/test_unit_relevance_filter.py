@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from Workflow.structured_outputs import BeefAttributes
+from Models.llm_metrics import get_llm_metrics
+from Pipeline.relevance_filter import RelevanceFilter, build_non_match_output, get_relevance_filter, tokenize
+
+# Import the functions from your module (assumed module name is "pipeline")
+from Pipeline.master_pipeline_module import *
+
+#############################
+# Test for the parser prefilter
+#############################
+
+def test_tokenize_splits_words_and_numbers():
+    assert tokenize("4OZ Angus Beef-Patty") == {"4", "oz", "angus", "beef", "patty"}
+
+
+def test_relevance_filter_thresholds():
+    row = {"description": "Angus Beef Patty 4oz", "manufacturer": "Acme Foods", "html": "Acme angus beef patty, 4 oz."}
+    other = {"description": "Angus Beef Patty 4oz", "manufacturer": "Acme Foods", "html": "Wild caught shrimp, 2 lbs."}
+
+    prefilter = RelevanceFilter(min_description_overlap=0.5)
+    assert prefilter.score(row) == (1.0, 0.5)
+    assert prefilter.is_relevant(row)
+    assert not prefilter.is_relevant(other)
+    assert not RelevanceFilter(min_description_overlap=0.5, min_manufacturer_overlap=1.0).is_relevant(row)
+
+
+def test_get_relevance_filter_from_env(monkeypatch):
+    assert get_relevance_filter() is None
+    monkeypatch.setenv("PARSER_PREFILTER", "1")
+    monkeypatch.setenv("PARSER_PREFILTER_MIN_DESCRIPTION_OVERLAP", "0.8")
+    assert get_relevance_filter().min_description_overlap == 0.8
+
+
+def test_execute_parser_skips_dropped_pages(monkeypatch):
+    requests = []
+
+    class FakeGPTModel:
+        async def agenerate_response(self, sys_inst, user_inst, Attributes, hedge=False):
+            requests.append(user_inst)
+            return {"is_match": True, "product_name_scraped": "Ribeye Steak"}
+    monkeypatch.setattr("Models.gpt_models.GPTModel", lambda: FakeGPTModel())
+
+    scrape_df = pd.DataFrame([
+        {"high_level_task": "beef", "description": "Ribeye Steak", "manufacturer": "Acme",
+         "html": html, "url": f"http://example.com/{i}", "id": "123"}
+        for i, html in enumerate(["Prime ribeye steak by Acme", "Store locator and careers"])
+    ])
+
+    result_df = execute_parser(scrape_df, BeefAttributes, prefilter=RelevanceFilter())
+
+    # Only the relevant page reaches the model; the dropped page is reported as a non-match
+    assert len(requests) == 1
+    assert list(result_df["is_match"]) == [True, False]
+    assert result_df["product_name_scraped"].tolist() == ["Ribeye Steak", None]
+    assert set(build_non_match_output(BeefAttributes)) <= set(result_df.columns)
+    snapshot = get_llm_metrics().snapshot()
+    assert snapshot["prefilter_pages"] == 2
+    assert snapshot["prefilter_pages_dropped"] == 1
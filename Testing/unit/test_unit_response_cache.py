@@ -0,0 +1,117 @@
+import time
+from types import SimpleNamespace
+import pytest
+from Models.response_cache import ResponseCache
+from Models.gpt_models import GPTModel
+from Workflow.structured_outputs import BeefAttributes
+
+#############################
+# Test for ResponseCache
+#############################
+
+def test_response_cache_modes(tmp_path):
+    cache = ResponseCache(str(tmp_path / "llm_responses.sqlite"))
+    messages = [{"role": "system", "content": "Parse"}, {"role": "user", "content": "<HTML>beef</HTML>"}]
+
+    key = cache.make_key("wesel-4o", messages, BeefAttributes, 0.2)
+    assert key == cache.make_key("wesel-4o", [dict(message) for message in messages], BeefAttributes, 0.2)
+    assert key != cache.make_key("wesel-4o", messages, BeefAttributes, 0.0)
+    assert key != cache.make_key("wesel-4o", messages[:1], BeefAttributes, 0.2)
+
+    assert cache.get(key) is None
+    cache.put(key, {"is_match": True})
+    assert cache.get(key) == {"is_match": True}
+
+    # Refresh skips reads but stores; bypass does neither
+    assert cache.get(key, mode="refresh") is None
+    cache.put(key, {"is_match": False}, mode="refresh")
+    cache.put(key, {"is_match": None}, mode="bypass")
+    assert cache.get(key) == {"is_match": False}
+    cache.close()
+
+    # Entries survive a restart
+    assert ResponseCache(str(tmp_path / "llm_responses.sqlite")).get(key) == {"is_match": False}
+
+
+def test_response_cache_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "llm_responses.sqlite"), max_entries=2, touch_interval_seconds=0)
+    cache.put("a", {"n": 1})
+    time.sleep(0.01)
+    cache.put("b", {"n": 2})
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", {"n": 3})
+
+    # "b" is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("c") == {"n": 3}
+
+    expiring = ResponseCache(str(tmp_path / "expiring.sqlite"), max_age_seconds=0.01)
+    expiring.put("a", {"n": 1})
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_response_cache_hot_path_is_batched(tmp_path):
+    db_path = str(tmp_path / "llm_responses.sqlite")
+    cache = ResponseCache(db_path, max_entries=100, touch_interval_seconds=0)
+    assert cache.evict_slack == 1
+
+    def last_used(key):
+        return cache._conn.execute("SELECT last_used FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+    # Hits don't write; their touches go out with the next insert
+    cache.put("a", {"n": 1})
+    written = last_used("a")
+    time.sleep(0.01)
+    assert cache.get("a") == {"n": 1}
+    assert last_used("a") == written
+    cache.put("b", {"n": 2})
+    assert last_used("a") > written
+
+    # Recently used entries aren't touched again
+    throttled = ResponseCache(db_path, touch_interval_seconds=300)
+    assert throttled.get("b") == {"n": 2}
+    assert throttled._pending_touches == {}
+    throttled.close()
+
+    # Eviction waits for the slack, then trims back to max_entries
+    for n in range(99):
+        cache.put(f"key-{n}", {"n": n})
+    assert cache._count == 101
+    cache.put("c", {"n": 3})
+    assert cache._count == 100
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 100
+
+    # Replacing an entry doesn't change the count
+    cache.put("c", {"n": 4})
+    assert cache._count == 100
+    cache.close()
+
+
+def test_generate_response_uses_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("GPT_KEY", "test-key")
+    monkeypatch.setattr("Models.gpt_models.count_tokens", lambda text: len(text) // 4)
+    calls = []
+
+    def fake_parse(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(
+            usage={"completion_tokens": 5, "prompt_tokens": 10, "total_tokens": 15},
+            choices=[SimpleNamespace(message=SimpleNamespace(parsed={"is_match": True, "Beef_Cut": "Ribeye"}))]
+        )
+
+    model = GPTModel(response_cache=ResponseCache(str(tmp_path / "llm_responses.sqlite")))
+    monkeypatch.setattr(model.client.beta.chat.completions, "parse", fake_parse)
+
+    first = model.generate_response("Parse the page", "<HTML>ribeye</HTML>", BeefAttributes)
+    second = model.generate_response("Parse the page", "<HTML>ribeye</HTML>", BeefAttributes)
+    assert first == second == {"is_match": True, "Beef_Cut": "Ribeye"}
+    assert len(calls) == 1
+    assert model.token_usage["total_tokens"] == 15
+
+    model.generate_response("Parse the page", "<HTML>ribeye</HTML>", BeefAttributes, cache_mode="refresh")
+    model.generate_response("Parse the page", "<HTML>sirloin</HTML>", BeefAttributes)
+    assert len(calls) == 3
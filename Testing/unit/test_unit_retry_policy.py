@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import openai
+import pytest
+from Models.retry_policy import RetryPolicy, parse_duration
+from Models.gpt_models import GPTModel
+from Models.llm_metrics import get_llm_metrics
+from Workflow.structured_outputs import BeefAttributes
+
+#############################
+# Test for RetryPolicy
+#############################
+
+REQUEST = httpx.Request("POST", "https://example.openai.azure.com/chat/completions")
+
+
+def status_error(status_code, headers=None):
+    response = httpx.Response(status_code, headers=headers or {}, request=REQUEST)
+    return openai.APIStatusError(f"HTTP {status_code}", response=response, body=None)
+
+
+def test_classify_and_retry_hints():
+    assert RetryPolicy.classify(status_error(429)) == "rate_limit"
+    assert RetryPolicy.classify(status_error(503)) == "transient"
+    assert RetryPolicy.classify(openai.APITimeoutError(request=REQUEST)) == "transient"
+    assert RetryPolicy.classify(status_error(400)) == "fatal"
+    assert RetryPolicy.classify(ValueError("schema")) == "fatal"
+
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("20ms") == pytest.approx(0.02)
+    assert parse_duration("soon") is None
+    assert RetryPolicy.retry_after(status_error(429, {"retry-after": "7"})) == 7
+    assert RetryPolicy.retry_after(status_error(429, {"retry-after-ms": "250"})) == pytest.approx(0.25)
+    assert RetryPolicy.retry_after(status_error(429, {"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "2.5s"})) == 2.5
+    assert RetryPolicy.retry_after(status_error(500)) is None
+
+    # Hints are honored (capped), otherwise full jitter backoff
+    policy = RetryPolicy(base_delay_seconds=1, max_delay_seconds=10, rng=lambda: 0.5)
+    assert policy.next_delay(1, status_error(429, {"retry-after": "4"})) == 4.5
+    assert policy.next_delay(1, status_error(429, {"retry-after": "40"})) == 10.5
+    assert policy.next_delay(3, status_error(500)) == 4.0
+
+
+def test_call_retries_transient_errors():
+    policy = RetryPolicy(base_delay_seconds=0.01, rng=lambda: 0)
+    errors = [status_error(429, {"retry-after-ms": "10"}), status_error(502)]
+    timeouts = []
+
+    def request(timeout):
+        timeouts.append(timeout)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert policy.call(request) == "ok"
+    assert len(timeouts) == 3
+    assert all(0 < timeout <= 60 for timeout in timeouts)
+    assert get_llm_metrics().snapshot()["retries_rate_limit"] == 1
+
+
+def test_call_stops_on_fatal_errors_attempts_and_budget():
+    calls = []
+
+    def failing(error):
+        def request(timeout):
+            calls.append(timeout)
+            raise error
+        return request
+
+    with pytest.raises(openai.APIStatusError):
+        RetryPolicy(rng=lambda: 0).call(failing(status_error(400)))
+    assert len(calls) == 1
+
+    with pytest.raises(openai.APIStatusError):
+        RetryPolicy(base_delay_seconds=0.001).call(failing(status_error(500)), max_attempts=3)
+    assert len(calls) == 4
+
+    # The server asks for more time than the call has left
+    with pytest.raises(openai.APIStatusError):
+        RetryPolicy(total_budget_seconds=1).call(failing(status_error(429, {"retry-after": "30"})))
+    assert len(calls) == 5
+
+
+def test_acall_retries_without_blocking():
+    policy = RetryPolicy(base_delay_seconds=0.05, rng=lambda: 1)
+    attempts = []
+
+    async def request(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            raise openai.APITimeoutError(request=REQUEST)
+        return "ok"
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        result, _ = await asyncio.gather(policy.acall(request), ticker())
+        return result, ticks
+
+    assert asyncio.run(run()) == ("ok", 5)
+    assert len(attempts) == 2
+
+
+def test_generate_response_retries_rate_limits(tmp_path, monkeypatch):
+    monkeypatch.setenv("GPT_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_PATH", "")
+    monkeypatch.setattr("Models.gpt_models.count_tokens", lambda text: len(text) // 4)
+    responses = [status_error(429, {"retry-after-ms": "5"})]
+
+    def fake_parse(**kwargs):
+        if responses:
+            raise responses.pop(0)
+        return SimpleNamespace(
+            usage={"completion_tokens": 5, "prompt_tokens": 10, "total_tokens": 15},
+            choices=[SimpleNamespace(message=SimpleNamespace(parsed={"is_match": True}))]
+        )
+
+    model = GPTModel(retry_policy=RetryPolicy(rng=lambda: 0))
+    monkeypatch.setattr(model.client.beta.chat.completions, "parse", fake_parse)
+    assert model.generate_response("Parse", "<HTML>ribeye</HTML>", BeefAttributes) == {"is_match": True}
+    assert model.token_usage["total_tokens"] == 15
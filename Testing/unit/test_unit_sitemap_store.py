@@ -0,0 +1,76 @@
+import threading
+import pandas as pd
+import pytest
+from Retrieval.sitemap_store import SitemapStore, get_sitemap_store, clear_sitemap_stores
+
+#############################
+# Test for SitemapStore
+#############################
+
+def test_sitemap_store(monkeypatch):
+    # Fake CSV data to be returned by read_csv_from_gcs, counting downloads
+    downloads = []
+    fake_csv_data = [
+        {"Mfr Item Code": "item1", "Manufacturer Name": "Maker A", "Description": "Product A"},
+        {"Mfr Item Code": "item2", "Manufacturer Name": "Maker B", "Description": "Product B"},
+        {"Mfr Item Code": "item1", "Manufacturer Name": "Maker A", "Description": "Product A2"},
+    ]
+    def fake_read_csv_from_gcs(path):
+        downloads.append(path)
+        return fake_csv_data
+    monkeypatch.setattr("Workflow.google_storage_workflow.read_csv_from_gcs", fake_read_csv_from_gcs)
+
+    clear_sitemap_stores()
+    store = get_sitemap_store("shrimp")
+    assert get_sitemap_store("shrimp") is store
+    assert downloads == ["rcc-attribution/sitemap/shrimp_sitemap.csv"]
+
+    # Every row of an item is returned with a fresh index
+    item_rows = store.lookup("item1")
+    assert list(item_rows["Description"]) == ["Product A", "Product A2"]
+    assert list(item_rows.index) == [0, 1]
+    assert store.lookup("missing").empty
+
+    # Lookups are copies, so items can't modify the shared sitemap
+    item_rows.loc[0, "high_level_task"] = "shrimp"
+    assert "high_level_task" not in store.sitemap_df.columns
+    clear_sitemap_stores()
+
+
+def test_sitemap_store_loads_do_not_block_other_tasks(monkeypatch):
+    # The beef sitemap download hangs until released; shrimp must not wait behind it, and a failed load is retried
+    started, release = threading.Event(), threading.Event()
+    downloads = []
+    def fake_read_csv_from_gcs(path):
+        downloads.append(path)
+        if "beef" in path:
+            started.set()
+            assert release.wait(5)
+            if downloads.count(path) == 1:
+                raise ConnectionError("GCS unavailable")
+        return [{"Mfr Item Code": "item1", "Description": path}]
+    monkeypatch.setattr("Workflow.google_storage_workflow.read_csv_from_gcs", fake_read_csv_from_gcs)
+
+    clear_sitemap_stores()
+    results = {}
+    def load_beef(name):
+        try:
+            results[name] = get_sitemap_store("beef")
+        except ConnectionError as e:
+            results[name] = e
+    threads = [threading.Thread(target=load_beef, args=(name,)) for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+
+    shrimp = get_sitemap_store("shrimp")
+    assert list(shrimp.lookup("item1")["Description"]) == ["rcc-attribution/sitemap/shrimp_sitemap.csv"]
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    stores = [result for result in results.values() if isinstance(result, SitemapStore)]
+    assert len(stores) == 1 and sum(isinstance(result, ConnectionError) for result in results.values()) == 1
+    assert get_sitemap_store("beef") is stores[0]
+    assert downloads.count("rcc-attribution/sitemap/beef_sitemap.csv") == 2
+    clear_sitemap_stores()
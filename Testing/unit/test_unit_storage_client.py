@@ -0,0 +1,78 @@
+import pytest
+import requests
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession
+from Retrieval.storage_client import get_storage_client, get_bucket_handle
+
+#############################
+# Test for get_storage_client
+#############################
+
+def test_storage_client(monkeypatch):
+    # Fake client counting constructions and bucket handles
+    created = []
+    class FakeSession(requests.Session):
+        pass
+    class FakeClient:
+        def __init__(self):
+            created.append(self)
+            self._http = FakeSession()
+        def bucket(self, bucket_name):
+            return ("bucket", bucket_name)
+        def get_bucket(self, bucket_name):
+            raise AssertionError("get_bucket makes a network request")
+    monkeypatch.setattr("google.cloud.storage.Client", FakeClient)
+    monkeypatch.setenv("GCS_HTTP_POOL_SIZE", "16")
+
+    # One client per process, with a resized connection pool
+    client = get_storage_client()
+    assert get_storage_client() is client
+    assert len(created) == 1
+    assert client._http.get_adapter("https://")._pool_maxsize == 16
+
+    # Bucket handles are lazy and reused
+    assert get_bucket_handle("bucket_a") == ("bucket", "bucket_a")
+    assert get_bucket_handle("bucket_a") is get_bucket_handle("bucket_a")
+
+
+def test_storage_client_keeps_auth_adapter(monkeypatch):
+    # Credentials whose token expires server-side: the first request gets a 401 and forces a refresh
+    class FakeCredentials(Credentials):
+        def __init__(self):
+            super().__init__()
+            self.token = "stale"
+            self.refreshes = 0
+        def refresh(self, request):
+            self.refreshes += 1
+            self.token = "fresh"
+
+    # The adapter google-auth set up (with retries), answering from memory
+    class FakeAdapter(requests.adapters.HTTPAdapter):
+        def send(self, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200 if request.headers["authorization"] == "Bearer fresh" else 401
+            response.request = request
+            response._content = b""
+            return response
+    credentials = FakeCredentials()
+    session = AuthorizedSession(credentials)
+    adapter = FakeAdapter(max_retries=3)
+    session.mount("https://", adapter)
+
+    class FakeClient:
+        def __init__(self):
+            self._http = session
+    monkeypatch.setattr("google.cloud.storage.Client", FakeClient)
+    monkeypatch.setenv("GCS_HTTP_POOL_SIZE", "16")
+
+    client = get_storage_client()
+
+    # The pool is resized on the existing adapter, which keeps its retries
+    assert client._http.get_adapter("https://") is adapter
+    assert adapter._pool_maxsize == 16
+    assert adapter.max_retries.total == 3
+
+    # Requests through the mounted adapter still refresh expired credentials
+    response = client._http.get("https://storage.googleapis.com/storage/v1/b/bucket_a")
+    assert response.status_code == 200
+    assert credentials.refreshes == 1
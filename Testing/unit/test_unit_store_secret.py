@@ -0,0 +1,54 @@
+import json
+import os
+import threading
+import time
+import pytest
+from utils import CachedSecretProvider, FileSecretProvider, set_secret_provider, store_secret
+
+#############################
+# Test for store_secret
+#############################
+
+def test_cached_secret_provider():
+    # Fake provider counting fetches
+    fetches = []
+    class FakeProvider:
+        def fetch(self, secret_name, project_id):
+            fetches.append(secret_name)
+            time.sleep(0.01)
+            return {"VALUE": str(len(fetches))}
+
+    provider = CachedSecretProvider(FakeProvider(), ttl_seconds=0.2)
+
+    # Concurrent workers share a single fetch
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(provider.get("secret", "project"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fetches == ["secret"]
+    assert all(result == {"VALUE": "1"} for result in results)
+
+    # Expired values are served stale while a background refresh runs
+    time.sleep(0.25)
+    assert provider.get("secret", "project") == {"VALUE": "1"}
+    for _ in range(100):
+        if provider.get("secret", "project") == {"VALUE": "2"}:
+            break
+        time.sleep(0.01)
+    assert provider.get("secret", "project") == {"VALUE": "2"}
+
+
+def test_store_secret_from_file(tmp_path):
+    # Offline runs read secrets from a local JSON file
+    secrets_file = tmp_path / "secrets.json"
+    secrets_file.write_text(json.dumps({"des-wesel": {"TEST_STORE_SECRET_KEY": "local-value"}}))
+    set_secret_provider(CachedSecretProvider(FileSecretProvider(str(secrets_file))))
+
+    try:
+        store_secret(secret_name="des-wesel", project_id="cd-ds-384118")
+        assert os.environ["TEST_STORE_SECRET_KEY"] == "local-value"
+    finally:
+        set_secret_provider(None)
+        os.environ.pop("TEST_STORE_SECRET_KEY", None)
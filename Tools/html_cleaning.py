@@ -0,0 +1,439 @@
+import logging
+import os
+import re
+import sys
+import time
+from logging import Logger
+from typing import Callable, Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup # type: ignore
+
+try:
+    import lxml.html # type: ignore
+    from lxml import etree # type: ignore
+except ImportError:
+    lxml = None
+
+
+logger: Logger = logging.getLogger(__name__)
+
+TAG_PATTERN = re.compile(r'<[^>]*>')
+
+# Elements whose strings BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = ("script", "style", "template")
+
+# Boilerplate rules: non-content tags, ARIA landmark roles, and class/id names (strong words match anywhere,
+# weak words only as a whole "-"/"_" separated segment of a structural element, so a "nav-menu" list matches
+# but "canvas", or a "menu-item" or "share-price" div or span, doesn't)
+BOILERPLATE_TAGS = ("nav", "footer", "aside", "noscript", "iframe", "svg", "dialog")
+BOILERPLATE_ROLES = ("navigation", "banner", "contentinfo", "complementary", "search", "menu", "menubar", "dialog", "alertdialog")
+BOILERPLATE_STRONG_NAMES = re.compile(r"cookie|consent|gdpr|newsletter|megamenu|mega-menu")
+BOILERPLATE_WEAK_NAMES = re.compile(r"(?:^|[-_])(?:nav|navbar|navigation|menu|footer|social|share|popup|modal|overlay|skip)(?:$|[-_])")
+BOILERPLATE_WEAK_NAME_TAGS = ("header", "ul", "ol", "menu")
+PROTECTED_TAGS = ("html", "body", "main", "article")
+
+# Density rules: link lists are dropped, and the content region is only searched among container elements,
+# never leaving behind a sibling that holds facts (spec or nutrition tables)
+LINK_LIST_TAGS = ("div", "section", "ul", "ol", "table")
+CONTAINER_TAGS = ("div", "section", "main", "article")
+FACT_TAGS = ("table", "dl")
+
+CHARS_PER_TOKEN = 4
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes extracted page text: leftover tags (e.g. from escaped markup) removed, lines stripped, blank lines dropped.
+
+    Args:
+        text (str): The extracted text.
+
+    Returns:
+        str: The cleaned text.
+    """
+    if "<" in text:
+        text = TAG_PATTERN.sub('', text)
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line).replace('   ', '')
+
+
+def reference_engine(html: str) -> str:
+    """
+    The reference cleaning engine: BeautifulSoup with the pure-Python `html.parser`.
+
+    Args:
+        html (str): The page HTML.
+
+    Returns:
+        str: The cleaned text.
+    """
+    return normalize_text(BeautifulSoup(html, 'html.parser').get_text())
+
+
+def parse_html(html: str):
+    """
+    Parses a page with lxml and drops the elements that carry no text (scripts, styles, templates, comments).
+
+    Args:
+        html (str): The page HTML.
+
+    Returns:
+        The root element, or None for an empty page.
+    """
+    if not html or not html.strip():
+        return None
+    try:
+        root = lxml.html.fromstring(html)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration must be parsed as bytes
+        root = lxml.html.fromstring(html.encode('utf-8'))
+
+    etree.strip_elements(root, *NON_TEXT_TAGS, etree.Comment, etree.ProcessingInstruction, with_tail=False)
+    return root
+
+
+def lxml_engine(html: str) -> str:
+    """
+    The fast cleaning engine: libxml2's HTML parser through lxml, extracting the same strings as `reference_engine`.
+
+    Args:
+        html (str): The page HTML.
+
+    Returns:
+        str: The cleaned text.
+    """
+    root = parse_html(html)
+    return '' if root is None else normalize_text("".join(root.itertext()))
+
+
+def is_boilerplate(element) -> bool:
+    """
+    Whether an element is page chrome (navigation, footer, cookie banner, menu, ...) rather than content.
+
+    Args:
+        element: An lxml element.
+
+    Returns:
+        bool: True for boilerplate.
+    """
+    tag = element.tag
+    if tag in BOILERPLATE_TAGS or (tag == "header" and getattr(element.getparent(), "tag", None) == "body"):
+        return True
+    if (element.get("role") or "").strip().lower() in BOILERPLATE_ROLES:
+        return True
+    if tag in PROTECTED_TAGS:
+        return False
+    names = f"{element.get('class') or ''} {element.get('id') or ''}".lower().split()
+    weak = tag in BOILERPLATE_WEAK_NAME_TAGS
+    return any(BOILERPLATE_STRONG_NAMES.search(name) or (weak and BOILERPLATE_WEAK_NAMES.search(name)) for name in names)
+
+
+def remove_boilerplate(root) -> int:
+    """
+    Removes boilerplate elements (see `is_boilerplate`) from a parsed page, keeping the text that follows them.
+
+    Args:
+        root: The root element.
+
+    Returns:
+        int: The number of removed elements.
+    """
+    removed = [element for element in root.iter() if isinstance(element.tag, str) and element is not root and is_boilerplate(element)]
+    for element in removed:
+        element.drop_tree()
+    return len(removed)
+
+
+def text_lengths(root) -> Tuple[Dict[object, int], Dict[object, int]]:
+    """
+    Measures the text and the link text of every element of a page in one pass.
+
+    Args:
+        root: The root element.
+
+    Returns:
+        Tuple[Dict[object, int], Dict[object, int]]: Stripped text characters and link (<a>) text characters by element.
+    """
+    text_chars: Dict[object, int] = {}
+    link_chars: Dict[object, int] = {}
+    # Reversed document order visits children before their parents
+    for element in reversed(list(root.iter())):
+        children = [child for child in element if isinstance(child.tag, str)]
+        text_chars[element] = len((element.text or "").strip()) + sum(
+            text_chars[child] + len((child.tail or "").strip()) for child in children
+        )
+        link_chars[element] = text_chars[element] if element.tag == "a" else sum(link_chars[child] for child in children)
+    return text_chars, link_chars
+
+
+def remove_link_lists(root, max_link_density: float = 0.8, min_chars: int = 100) -> int:
+    """
+    Removes blocks that are mostly link text (menus missed by the rules, related products, tag clouds).
+
+    Args:
+        root: The root element.
+        max_link_density (float): Share of link text above which a block is dropped. Defaults to 0.8.
+        min_chars (int): Smallest block considered, so short links in content ("Brand: <a>Acme</a>") stay. Defaults to 100.
+
+    Returns:
+        int: The number of removed elements.
+    """
+    text_chars, link_chars = text_lengths(root)
+    removed = [
+        element for element in root.iter(*LINK_LIST_TAGS)
+        if element is not root and text_chars[element] >= min_chars and link_chars[element] >= max_link_density * text_chars[element]
+    ]
+    for element in removed:
+        element.drop_tree()
+    return len(removed)
+
+
+def has_facts(element) -> bool:
+    """
+    Args:
+        element: An lxml element.
+
+    Returns:
+        bool: Whether the element is or contains a table or definition list with text.
+    """
+    return any(
+        "".join(fact.itertext()).strip()
+        for fact in element.iter(*FACT_TAGS)
+    )
+
+
+def select_main_content(root, dominance: float = 0.8, min_chars: int = 200):
+    """
+    Picks the main content region of a page by text density.
+
+    Starting from <body>, descends into the container child (div, section, main, article) holding at least
+    `dominance` of the current element's non-link text, as long as it holds at least `min_chars` characters.
+    The descent stops where content splits between siblings, at text blocks (paragraphs, headings, tables),
+    or where a sibling holds facts (a table or definition list), so the title, description and facts of a
+    product stay together.
+
+    Args:
+        root: The root element (boilerplate already removed).
+        dominance (float): Share of the text the chosen child must hold. Defaults to 0.8.
+        min_chars (int): Smallest content region. Defaults to 200.
+
+    Returns:
+        The main content element.
+    """
+    text_chars, link_chars = text_lengths(root)
+
+    def content_chars(element) -> int:
+        return text_chars[element] - link_chars[element]
+
+    node = next(root.iter("body"), root)
+    while True:
+        children = [child for child in node if isinstance(child.tag, str)]
+        if not children:
+            return node
+        best = max(children, key=content_chars)
+        if best.tag not in CONTAINER_TAGS or content_chars(best) < min_chars or content_chars(best) < dominance * content_chars(node):
+            return node
+        if any(child is not best and has_facts(child) for child in children):
+            return node
+        node = best
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    A cheap prompt token estimate (about four characters per token).
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated tokens.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def lxml_content_engine(html: str, min_content_share: float = 0.5) -> Tuple[str, str]:
+    """
+    Extracts both the full text of a page and the text of its main content region, boilerplate removed.
+
+    Args:
+        html (str): The page HTML.
+        min_content_share (float): Share of the page's non-boilerplate text the content region must hold,
+            otherwise the full text is kept (the region is likely too narrow). Defaults to 0.5.
+
+    Returns:
+        Tuple[str, str]: The full cleaned text (same as `lxml_engine`) and the content text.
+    """
+    root = parse_html(html)
+    if root is None:
+        return '', ''
+    full_text = normalize_text("".join(root.itertext()))
+
+    remove_boilerplate(root)
+    remove_link_lists(root)
+    content = select_main_content(root)
+    text = "".join(content.itertext())
+    if len(normalize_text(text)) < min_content_share * len(normalize_text("".join(root.itertext()))):
+        return full_text, full_text
+    if content is not root:
+        # The page title usually names the product, keep it above the content region
+        title = next(root.iter("title"), None)
+        if title is not None and title.text:
+            text = f"{title.text}\n{text}"
+    return full_text, normalize_text(text)
+
+
+CLEANING_ENGINES: Dict[str, Callable[[str], str]] = {"reference": reference_engine}
+if lxml is not None:
+    CLEANING_ENGINES["lxml"] = lxml_engine
+
+
+def get_cleaning_engine(name: Optional[str] = None) -> Callable[[str], str]:
+    """
+    Returns an HTML cleaning engine.
+
+    Args:
+        name (Optional[str]): "lxml" or "reference". Defaults to HTML_CLEANING_ENGINE, else "lxml".
+            Falls back to the reference engine when lxml isn't installed.
+
+    Returns:
+        Callable[[str], str]: The engine.
+    """
+    name = name or os.getenv("HTML_CLEANING_ENGINE", "lxml")
+    if name not in CLEANING_ENGINES:
+        if name != "lxml":
+            raise ValueError(f"Unknown HTML cleaning engine {name!r}, expected one of {list(CLEANING_ENGINES)}")
+        logger.warning("lxml is not installed, falling back to the reference HTML cleaning engine")
+        name = "reference"
+    return CLEANING_ENGINES[name]
+
+
+def get_cleaning_settings() -> Dict[str, object]:
+    """
+    Returns the cleaning settings `clean_page` uses by default (e.g. to fingerprint checkpointed parser outputs).
+
+    Returns:
+        Dict[str, object]: The engine name and whether boilerplate is stripped.
+    """
+    return {
+        "engine": next(name for name, engine in CLEANING_ENGINES.items() if engine is get_cleaning_engine()),
+        "strip_boilerplate": os.getenv("HTML_STRIP_BOILERPLATE", "0") == "1"
+    }
+
+
+def clean_page(
+        html: str,
+        engine: Optional[str] = None,
+        strip_boilerplate: Optional[bool] = None,
+        count_tokens: Callable[[str], int] = estimate_tokens
+    ) -> Tuple[str, Dict[str, float]]:
+    """
+    Extracts the readable text of a page and reports the prompt tokens saved by boilerplate stripping.
+
+    Args:
+        html (str): The page HTML.
+        engine (Optional[str]): Cleaning engine name. Defaults to `get_cleaning_engine()`.
+        strip_boilerplate (Optional[bool]): Remove navigation, footers, banners and menus and keep the main content
+            region (lxml engine only). Opt-in, as it changes the parser input (and response cache keys) of
+            existing runs. Defaults to HTML_STRIP_BOILERPLATE == "1".
+        count_tokens (Callable[[str], int]): Token counter of the stats. Defaults to `estimate_tokens`.
+
+    Returns:
+        Tuple[str, Dict[str, float]]: The cleaned text ('' if the page can't be parsed) and its stats
+            (tokens_before, tokens_after, tokens_saved_ratio).
+    """
+    clean = get_cleaning_engine(engine)
+    if strip_boilerplate is None:
+        strip_boilerplate = os.getenv("HTML_STRIP_BOILERPLATE", "0") == "1"
+
+    try:
+        if strip_boilerplate and clean is lxml_engine:
+            full_text, text = lxml_content_engine(str(html))
+        else:
+            full_text = text = clean(str(html))
+    except Exception:
+        full_text = text = ''
+
+    tokens_before, tokens_after = count_tokens(full_text), count_tokens(text)
+    return text, {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved_ratio": 1 - tokens_after / tokens_before if tokens_before else 0.0
+    }
+
+
+def clean_html(html: str, engine: Optional[str] = None, strip_boilerplate: Optional[bool] = None) -> str:
+    """
+    Extracts the readable text of a page.
+
+    Args:
+        html (str): The page HTML.
+        engine (Optional[str]): Cleaning engine name. Defaults to `get_cleaning_engine()`.
+        strip_boilerplate (Optional[bool]): Keep only the main content region (see `clean_page`). Defaults to HTML_STRIP_BOILERPLATE == "1".
+
+    Returns:
+        str: The cleaned text ('' if the page can't be parsed).
+    """
+    return clean_page(html, engine, strip_boilerplate)[0]
+
+
+def benchmark_engines(pages: List[str], engines: Optional[List[str]] = None, repeat: int = 3) -> Dict[str, float]:
+    """
+    Measures the throughput of cleaning engines.
+
+    Args:
+        pages (List[str]): The HTML pages.
+        engines (Optional[List[str]]): Engine names. Defaults to every available engine.
+        repeat (int): Passes over the pages; the fastest pass counts. Defaults to 3.
+
+    Returns:
+        Dict[str, float]: Throughput of each engine in MB/s.
+    """
+    megabytes = sum(len(page.encode('utf-8')) for page in pages) / 1e6
+    throughput = {}
+    for name in engines or list(CLEANING_ENGINES):
+        engine = CLEANING_ENGINES[name]
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            started_at = time.perf_counter()
+            for page in pages:
+                engine(page)
+            best = min(best, time.perf_counter() - started_at)
+        throughput[name] = megabytes / best if best > 0 else float("inf")
+    return throughput
+
+
+def synthetic_page(products: int = 2000) -> str:
+    """
+    Builds a large retailer-like page (navigation, scripts, product tiles) for benchmarks.
+
+    Args:
+        products (int): Number of product tiles. Defaults to 2000.
+
+    Returns:
+        str: The page HTML.
+    """
+    tiles = "".join(
+        f'<div class="tile"><a href="/p/{i}">Angus Beef Patty {i} &amp; Co.</a>'
+        f'<span class="price">${i % 50}.99</span>\n   <p>Frozen, 10 lbs case, {i % 7} per pack.</p></div>\n'
+        for i in range(products)
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Beef</title><style>.tile{margin:0}</style>'
+        '<script>window.__STATE__={"items":[1,2,3]}</script></head>'
+        f'<body><nav><ul><li>Home</li><li>Meat</li></ul></nav><main>{tiles}</main>'
+        '<!-- tracking --><footer>Contact us</footer></body></html>'
+    )
+
+
+if __name__ == "__main__":
+    # Usage: python -m Tools.html_cleaning [page.html ...]
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8", errors="replace") as file:
+                pages.append(file.read())
+    else:
+        pages = [synthetic_page()]
+
+    print(f"{len(pages)} pages, {sum(len(page.encode('utf-8')) for page in pages) / 1e6:.2f} MB")
+    for name, mb_per_second in benchmark_engines(pages).items():
+        print(f"{name:>10}: {mb_per_second:8.2f} MB/s")
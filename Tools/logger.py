@@ -12,6 +12,7 @@ import random
 import time
 from logging import Logger
 import os
+from Retrieval.storage_client import get_bucket_handle
 
 
 class LoggerUtil:
@@ -118,8 +119,7 @@ class LoggerUtil:
         if not hasattr(self, "bucket_name") or not hasattr(self, "file_path"):
             raise ValueError("Logger is not configured with GCS bucket and file path.")
 
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(self.bucket_name)
+        bucket = get_bucket_handle(self.bucket_name)
         blob = bucket.blob(self.file_path)
 
         log_contents = self.memory_file.getvalue()
@@ -160,11 +160,8 @@ class LoggerUtil:
             storage.Bucket: A Google Cloud Storage bucket object representing the specified bucket.
         """
 
-        # Initialize the GCP storage client
-        client = storage.Client()
-
-        # Get the bucket
-        bucket = client.bucket(self.bucket_name)
+        # Get the bucket from the shared GCP storage client
+        bucket = get_bucket_handle(self.bucket_name)
 
         return bucket
 
@@ -300,7 +297,7 @@ def configure_logging(id:str) -> Logger:
     LOG_FILE = f'''./logging/{id + "_" + timestamp + ".log"}''' # Change this to your preferred log file path
     logging.basicConfig(
         level=logging.INFO,  # Log all levels (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        format="%(asctime)s - %(levelname)s - %(message)s",
+        format="%(asctime)s - %(levelname)s - %(threadName)s - %(message)s",
         handlers=[
             logging.FileHandler(LOG_FILE, mode='a'),  # Append mode
         ]
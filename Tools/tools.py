@@ -11,6 +11,8 @@ import re
 import pandas as pd # type: ignore
 import json
 from google.cloud import storage # type: ignore
+from Retrieval.storage_client import get_bucket_handle
+from Tools import html_cleaning
 import re
 from PIL import Image
 import io
@@ -163,9 +165,8 @@ def list_nested_folder_paths(bucket_name:str, base_path:str, sku:str=None, manuf
     
     """
     
-    # Initialize the storage client
-    client = storage.Client()
-    bucket = client.get_bucket(bucket_name)
+    # Use the shared storage client
+    bucket = get_bucket_handle(bucket_name)
 
     # Define the complete folder prefix within the base path
     if sku and manufacturer and product_name:
@@ -203,8 +204,7 @@ def read_files_from_nested_folders(bucket_name:str, folder_path:str) -> Dict:
     Returns:
         return_data (Dict[str, List[Dict[str, Any]]]): A dictionary containing the data read from the files in the nested folders.
     """
-    client = storage.Client()
-    bucket = client.get_bucket(bucket_name)
+    bucket = get_bucket_handle(bucket_name)
 
     # Define paths for tier folders
     tier_one_path = f"{folder_path}/tier_one_results/"
@@ -267,17 +267,8 @@ def read_files_from_nested_folders(bucket_name:str, folder_path:str) -> Dict:
 
 def clean_html(html):
     
-    # Remove all HTML tags and extract plain text
-    try:
-        soup = BeautifulSoup(html, 'html.parser')
-        plain_text = soup.get_text()
-        plain_text = strip_tags(plain_text)
-        cleaned_text = "\n".join([line.strip() for line in plain_text.splitlines() if line.strip()])
-        cleaned_text = cleaned_text.replace('   ','')
-    except:
-        cleaned_text = ''
-        return str(cleaned_text)
-    return str({cleaned_text})
+    # Extract plain text with the configured engine (see Tools.html_cleaning)
+    return html_cleaning.clean_html(html)
 
 
 def convert_tiered_json_to_url_df(tiered_json_data,product):
@@ -7,6 +7,8 @@ import time
 import random
 import json 
 from io import BytesIO
+from Retrieval.blob_cache import download_blob
+from Retrieval.storage_client import get_bucket_handle
 
 def create_folder_if_not_exists(folders, max_retries=5):
 
@@ -20,8 +22,7 @@ def create_folder_if_not_exists(folders, max_retries=5):
                 # folder_name = f"2024-11-11-results".lower()
                 folder_path = f"{destination_blob_path}/{folder_name}/"
                 
-                client = storage.Client()
-                bucket = client.bucket(bucket_name)
+                bucket = get_bucket_handle(bucket_name)
 
                 # Check if the folder exists
                 blobs = list(bucket.list_blobs(prefix=folder_path, delimiter='/'))
@@ -52,8 +53,7 @@ def upload_csv_to_bucket(data, folder, subfolder, max_retries=5):
             destination_blob_path = f'wesel-enterprise/{folder}'
             folder_path = f"{destination_blob_path}/{subfolder}/"
             
-            client = storage.Client()
-            bucket = client.bucket(bucket_name)
+            bucket = get_bucket_handle(bucket_name)
             
             # Create the folder if it doesn't exist
             blob = bucket.blob(folder_path)
@@ -96,14 +96,11 @@ def read_csv_from_gcs(folder,max_retries=5):
             if attempt >= 0:
                 destination_blob_path = f'{folder}'
             
-            client = storage.Client()
-            bucket = client.bucket(bucket_name)
-            
-            bucket = client.get_bucket(bucket_name)
+            bucket = get_bucket_handle(bucket_name)
             blob = bucket.blob(destination_blob_path)
 
-            # Download the file as bytes and decode it into a string
-            content = blob.download_as_text()
+            # Download the file (through the local blob cache) and decode it into a string
+            content = download_blob(blob, as_text=True)
 
             # Use io.StringIO to read the CSV data
             csv_reader = csv.DictReader(StringIO(content))
@@ -125,8 +122,7 @@ def read_xlsx_from_gcs(folder, max_retries=5):
             bucket_name = "data-extraction-services"
             destination_blob_path = f'wesel-enterprise/{folder}'
             
-            client = storage.Client()
-            bucket = client.bucket(bucket_name)
+            bucket = get_bucket_handle(bucket_name)
             blob = bucket.blob(destination_blob_path)
 
             # Download the file as bytes
@@ -163,11 +159,8 @@ def download_json_from_gcs(source_blob_name):
     """
     bucket_name = "data-extraction-services"
 
-    # Initialize a GCS client
-    client = storage.Client()
-
-    # Get the bucket
-    bucket = client.bucket(bucket_name)
+    # Get the bucket from the shared GCS client
+    bucket = get_bucket_handle(bucket_name)
 
     # Get the blob (file object) from the bucket
     blob = bucket.blob(source_blob_name)
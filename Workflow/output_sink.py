@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+from typing import List, Optional
+import pandas as pd # type: ignore
+
+
+def _to_json_value(value):
+    """
+    JSON fallback for values pandas/numpy hand back (numpy scalars, timestamps, ...).
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class JsonlOutputSink:
+    """
+    An append-only JSONL sink for finalized item records.
+
+    Each record is written as one line as soon as its item finishes, so per-item output cost stays constant
+    however long the run gets. Writes are flushed immediately and fsynced every `fsync_every` records.
+    `compact` turns the stream into the final CSV or Parquet at the end of the run.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 20, truncate: bool = False):
+        """
+        Opens the sink.
+
+        Args:
+            path (str): Path to the JSONL file.
+            fsync_every (int): Number of records between fsyncs. Defaults to 20.
+            truncate (bool): Whether to drop records from earlier runs. Defaults to False (append).
+        """
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+        path_dir = os.path.dirname(path)
+        if path_dir:
+            os.makedirs(path_dir, exist_ok=True)
+        self._file = open(path, "w" if truncate else "a", encoding="utf-8")
+
+        # Start on a fresh line if an earlier run crashed mid-record
+        if not truncate and self._file.tell() > 0:
+            with open(path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def append(self, record: dict) -> None:
+        """
+        Appends one record.
+
+        Args:
+            record (dict): The finalized item record.
+        """
+        line = json.dumps(record, default=_to_json_value, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def flush(self) -> None:
+        """
+        Forces every appended record to disk.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        """
+        Flushes and closes the sink.
+        """
+        self.flush()
+        with self._lock:
+            self._file.close()
+
+    def read_records(self) -> List[dict]:
+        """
+        Reads back every record in the sink, skipping a torn last line left by a crash.
+
+        Returns:
+            List[dict]: The records, in write order.
+        """
+        if not self._file.closed:
+            self.flush()
+
+        records = []
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records
+
+    def compact(self, output_path: str, dedupe_key: Optional[str] = "id") -> pd.DataFrame:
+        """
+        Writes the streamed records to their final CSV or Parquet file (chosen by extension).
+
+        Args:
+            output_path (str): Path of the final file (".csv" or ".parquet").
+            dedupe_key (Optional[str]): Keep only the latest record per value of this key. Defaults to "id".
+
+        Returns:
+            pd.DataFrame: The compacted output.
+        """
+        output_df = pd.DataFrame(self.read_records())
+        if dedupe_key and dedupe_key in output_df.columns:
+            output_df = output_df.drop_duplicates(subset=dedupe_key, keep="last").reset_index(drop=True)
+
+        if output_path.endswith(".parquet"):
+            output_df.to_parquet(output_path)
+        else:
+            output_df.to_csv(output_path)
+
+        return output_df
@@ -0,0 +1,81 @@
+import threading
+from typing import Dict, List, Optional
+from Workflow.output_sink import JsonlOutputSink
+
+
+class RunJournal:
+    """
+    A checkpoint journal of completed pipeline stages, keyed by item id.
+
+    Every completed LLM stage output (parser, finalizer) is appended as one JSONL record
+    {"item_id", "stage", "records"} and fsynced, so a crashed or preempted run can be restarted and each
+    item resumed from its last completed stage instead of repeating LLM calls. Retrieved pages aren't
+    journaled: they are large, and re-reading them is cheap (local blob cache).
+    """
+
+    STAGES = ("parser", "finalizer")
+
+    def __init__(self, path: str, truncate: bool = False):
+        """
+        Opens the journal and loads the stages completed by earlier runs.
+
+        Args:
+            path (str): Path to the JSONL journal.
+            truncate (bool): Whether to discard earlier checkpoints and start fresh. Defaults to False.
+        """
+        self._lock = threading.Lock()
+        self._sink = JsonlOutputSink(path, fsync_every=1, truncate=truncate)
+
+        self._stages: Dict[str, Dict[str, List[dict]]] = {}
+        for entry in self._sink.read_records():
+            if entry["stage"] not in self.STAGES:
+                continue
+            self._stages.setdefault(entry["item_id"], {})[entry["stage"]] = entry["records"]
+
+    def record(self, item_id: str, stage: str, records: List[dict]) -> None:
+        """
+        Checkpoints a completed stage output.
+
+        Args:
+            item_id (str): Item ID.
+            stage (str): One of "parser" or "finalizer".
+            records (List[dict]): The stage output, as DataFrame records.
+        """
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+
+        self._sink.append({"item_id": item_id, "stage": stage, "records": records})
+        with self._lock:
+            self._stages.setdefault(item_id, {})[stage] = records
+
+    def get(self, item_id: str, stage: str) -> Optional[List[dict]]:
+        """
+        Returns a checkpointed stage output.
+
+        Args:
+            item_id (str): Item ID.
+            stage (str): One of "parser" or "finalizer".
+
+        Returns:
+            Optional[List[dict]]: The stage output records, or None if the stage hasn't completed.
+        """
+        with self._lock:
+            return self._stages.get(item_id, {}).get(stage)
+
+    def last_stage(self, item_id: str) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The latest completed stage of an item, or None if nothing was checkpointed.
+        """
+        with self._lock:
+            completed = self._stages.get(item_id, {})
+        for stage in reversed(self.STAGES):
+            if stage in completed:
+                return stage
+        return None
+
+    def close(self) -> None:
+        """
+        Closes the journal file.
+        """
+        self._sink.close()
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field 
-from typing import List, Optional, Literal
+from pydantic import BaseModel, Field, create_model
+from typing import List, Optional, Literal, Type
+from functools import lru_cache
 
 
 class BeefAttributes(BaseModel):
@@ -308,4 +309,26 @@ class ProductNameValidator(BaseModel):
 
 class ProductNameData(BaseModel):
     product_name_parsed: str
-    explanation: str
\ No newline at end of file
+    explanation: str
+
+@lru_cache(maxsize=None)
+def create_packed_model(Attributes: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Creates the list-wrapper schema of a packed multi-page request: one `Attributes` entry per page,
+    tagged with the page id it was extracted from.
+
+    Args:
+        Attributes (Type[BaseModel]): The per-page structured output (e.g. BeefAttributes).
+
+    Returns:
+        Type[BaseModel]: The wrapper model, e.g. PackedBeefAttributes(pages=[BeefAttributesPage(page_id=..., ...)]).
+    """
+    Page = create_model(
+        f"{Attributes.__name__}Page",
+        __base__=Attributes,
+        page_id=(str, Field(..., description="The id of the <Page> these attributes were extracted from.")),
+    )
+    return create_model(
+        f"Packed{Attributes.__name__}",
+        pages=(List[Page], Field(..., description="Exactly one entry per <Page> in the input, in input order.")),
+    )
@@ -8,8 +8,13 @@ from Workflow.structured_outputs import BeefAttributes, BeefAttributesFinalizer,
 from Models.gpt_models import GPTModel
 from pydantic import BaseModel
 from utils import store_secret
-from Pipeline.master_pipeline_module import get_all_ids, execute_pipeline
+from Pipeline.master_pipeline_module import get_all_ids, execute_pipelines_concurrently, execute_batch_run, get_run_fingerprint
 from Tools.logger import configure_logging
+from Retrieval.bucket_manifest import configure_manifest_store
+from Workflow.output_sink import JsonlOutputSink
+from Workflow.run_journal import RunJournal
+from Models.client_registry import configure_client_pool
+from Models.llm_metrics import get_llm_metrics
 
 
 def main(
@@ -18,7 +23,10 @@ def main(
         folder_path: str,
         metadata_key: str,
         structured_output_parser: BaseModel,
-        structured_output_finalizer: BaseModel
+        structured_output_finalizer: BaseModel,
+        max_workers: int = 8,
+        resume: bool = True,
+        mode: str = "online"
     ) -> None:
     """ 
         Main function to execute the pipeline.
@@ -30,53 +38,72 @@ def main(
         metadata_key (str): Metadata key to filter on.
         structured_output_parser (BaseModel): Structured output parser.
         structured_output_finalizer (BaseModel): Structured output finalizer.
+        max_workers (int): Maximum number of items processed concurrently. Defaults to 8.
+        resume (bool): Whether to resume items from the stages completed by earlier runs. Defaults to True.
+        mode (str): "online" sends parser requests as items are processed, "batch" sends every parser request of the
+            run through the Batch API (higher throughput and lower cost, no interactive latency). Defaults to "online".
     Returns:
         None
     """
 
+    # Persist the bucket manifest locally so later runs only refresh changed blobs
+    configure_manifest_store("./cache/bucket_manifest.sqlite", refresh="diff")
+
+    # Size the shared LLM client's connection pool to the run's concurrency
+    configure_client_pool(max_workers)
+
     # Get all item ids
     item_id_list = list(get_all_ids(bucket_name, folder_path))
 
     logger = configure_logging(high_level_task)
 
-    # Execute pipeline iteratively over items
-    df_list = []
-    for idx, item_id in enumerate(item_id_list):
-        try:
-            if (idx != 1):
-                continue 
-            
-            print(idx)
-            logger.info(f"Processing item {item_id}, index {idx}...")
-            
-            input_dict = {
-                "item_id": item_id,
-                "high_level_task": high_level_task,
-                "bucket_name": bucket_name,
-                "folder_path": folder_path,
-                "metadata_key": metadata_key,
-                "metadata_value": item_id,
-                "structured_output_parser": structured_output_parser,
-                "structured_output_finalizer": structured_output_finalizer
-            }
-
-            output_dict = execute_pipeline(**input_dict)
-
-            tmp_output_df = output_dict.get("output_df")
-            df_list.append(tmp_output_df.to_dict(orient='records')[0])
-
-            # Save output to CSV
-            tmp_df = pd.DataFrame(df_list)
-            tmp_df.to_csv(f"{high_level_task}_example.csv")
-        except Exception as e:
-            print('exception at idx: ', str(idx))
-            continue
-
-    # Create master dataframe
-    output_df = pd.DataFrame(df_list)
-
-    # Save output to CSV
-    output_df.to_csv(f"{high_level_task}_example.csv")
+    # Checkpoint completed stages so a crashed or preempted run can be restarted (a prompt or schema edit
+    # starts a new journal)
+    fingerprint = get_run_fingerprint(high_level_task, structured_output_parser, structured_output_finalizer)
+    run_journal = RunJournal(f"./cache/{high_level_task}_run_journal_{fingerprint}.jsonl", truncate=not resume)
+
+    input_dicts = [
+        {
+            "item_id": item_id,
+            "high_level_task": high_level_task,
+            "bucket_name": bucket_name,
+            "folder_path": folder_path,
+            "metadata_key": metadata_key,
+            "metadata_value": item_id,
+            "structured_output_parser": structured_output_parser,
+            "structured_output_finalizer": structured_output_finalizer,
+            "run_journal": run_journal
+        }
+        for item_id in item_id_list
+    ]
+
+    # Stream finalized records to disk as items complete (constant cost per item)
+    output_sink = JsonlOutputSink(f"{high_level_task}_example.jsonl", truncate=True)
+
+    if mode == "batch":
+        # Parse the whole run through the Batch API, then finalize items concurrently
+        execute_batch_run(
+            input_dicts,
+            max_workers=max_workers,
+            on_result=output_sink.append,
+            logger=logger
+        )
+    else:
+        # Execute pipeline concurrently over items
+        execute_pipelines_concurrently(
+            input_dicts,
+            max_workers=max_workers,
+            on_result=output_sink.append,
+            logger=logger
+        )
+    output_sink.close()
+    run_journal.close()
+
+    # Compact the streamed records into the final CSV
+    output_sink.compact(f"{high_level_task}_example.csv")
+
+    # Run-level token accounting across every item and worker
+    logger.info(f"LLM usage for task {high_level_task}: {get_llm_metrics().snapshot()}")
 
 
 if __name__ == "__main__":
@@ -99,5 +126,6 @@ if __name__ == "__main__":
         folder_path=folder_path,
         metadata_key=metadata_key,
         structured_output_parser=structured_output_parser,
-        structured_output_finalizer=structured_output_finalizer
+        structured_output_finalizer=structured_output_finalizer,
+        max_workers=8
     )
\ No newline at end of file
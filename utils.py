@@ -5,9 +5,12 @@ import pandas as pd # type: ignore
 from collections import defaultdict
 from sentence_transformers import SentenceTransformer, util
 from google.cloud import storage # type: ignore
+from Retrieval.storage_client import get_storage_client
 from Workflow.google_storage_workflow import read_csv_from_gcs
 from google.cloud import secretmanager # type: ignore
 import os
+import threading
+import time
 
 def extract_json_from_string(text: str):
     """Extracts first JSON object present from a string of text if present, else returns None"""
@@ -203,11 +206,8 @@ def list_folders_in_bucket(bucket_name:str, folder_path:str) -> list:
     Returns:
         list[str]: A list of folder names (subdirectories) within the specified path.
     """
-    # Initialize the Google Cloud Storage client
-    client = storage.Client()
-
-    # Access the specified bucket
-    bucket = client.bucket(bucket_name)
+    # Use the shared Google Cloud Storage client
+    client = get_storage_client()
 
     # List blobs in the specified folder
     blobs = client.list_blobs(bucket_name, prefix=folder_path, delimiter='/')
@@ -262,35 +262,182 @@ def generate_intersecting_sitemap_df(bucket_name:str,base_path:str,sitemap:list)
     
     return intersecting_sitemap_df
 
-def get_secret(secret_name: str, project_id: str) -> dict:
+class GCPSecretProvider:
+    """
+    Fetches secrets from GCP Secret Manager, reusing one client for the whole process.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def fetch(self, secret_name: str, project_id: str) -> dict:
+        """
+        Retrieve a secret from GCP Secret Manager and parse it as a dictionary.
+
+        Args:
+            secret_name (str): The name of the secret.
+            project_id (str): The GCP project ID.
+
+        Returns:
+            dict: A dictionary containing the secret's key-value pairs.
+        """
+        try:
+            # Create the Secret Manager client once
+            with self._client_lock:
+                if self._client is None:
+                    self._client = secretmanager.SecretManagerServiceClient()
+
+            # Build the resource name of the secret
+            secret_path = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
+
+            # Fetch the secret
+            response = self._client.access_secret_version(request={"name": secret_path})
+            secret_json = response.payload.data.decode("UTF-8")  # Decode secret value
+
+            # Parse the JSON secret
+            return json.loads(secret_json)
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to retrieve secret: {e}")
+
+
+class FileSecretProvider:
+    """
+    Reads secrets from a local JSON file for offline runs.
+
+    The file maps secret names to their key-value pairs, e.g. {"des-wesel": {"GPT_KEY": "..."}}.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path (str): Path to the JSON secrets file.
+        """
+        self.file_path = file_path
+
+    def fetch(self, secret_name: str, project_id: str) -> dict:
+        """
+        Read a secret from the local file.
+
+        Args:
+            secret_name (str): The name of the secret.
+            project_id (str): The GCP project ID (unused, kept for provider compatibility).
+
+        Returns:
+            dict: A dictionary containing the secret's key-value pairs.
+        """
+        try:
+            with open(self.file_path, "r") as file:
+                return json.load(file)[secret_name]
+        except Exception as e:
+            raise RuntimeError(f"Failed to retrieve secret: {e}")
+
+
+class CachedSecretProvider:
     """
-    Retrieve a secret from GCP Secret Manager and parse it as a dictionary.
+    Wraps a secret provider with a process-wide TTL cache.
+
+    The first request for a secret fetches it (concurrent callers wait for that single fetch). Once the TTL
+    has expired, callers keep getting the cached value while one background thread refreshes it.
+    """
+
+    def __init__(self, provider, ttl_seconds: float = 3600):
+        """
+        Args:
+            provider: The underlying provider, exposing `fetch(secret_name, project_id) -> dict`.
+            ttl_seconds (float): Seconds before a cached secret is refreshed. Defaults to 3600.
+        """
+        self.provider = provider
+        self.ttl_seconds = ttl_seconds
+        self._cache = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _refresh(self, key: tuple) -> None:
+        try:
+            value = self.provider.fetch(*key)
+            with self._lock:
+                self._cache[key] = (value, time.monotonic())
+        except Exception:
+            # Keep serving the cached value; the next expired read retries the refresh
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, secret_name: str, project_id: str) -> dict:
+        """
+        Return a secret, from the cache when available.
+
+        Args:
+            secret_name (str): The name of the secret.
+            project_id (str): The GCP project ID.
+
+        Returns:
+            dict: A dictionary containing the secret's key-value pairs.
+        """
+        key = (secret_name, project_id)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                value, fetched_at = cached
+                if time.monotonic() - fetched_at >= self.ttl_seconds and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                return value
+
+            # First fetch is done under the lock so concurrent workers share a single request
+            value = self.provider.fetch(secret_name, project_id)
+            self._cache[key] = (value, time.monotonic())
+            return value
+
+
+_secret_provider = None
+_secret_provider_lock = threading.Lock()
+
+
+def set_secret_provider(provider) -> None:
+    """
+    Replace the process-wide secret provider (e.g. a CachedSecretProvider over a FileSecretProvider for offline runs).
 
     Args:
-        secret_name (str): The name of the secret.
-        project_id (str): The GCP project ID.
+        provider: A provider exposing `get(secret_name, project_id) -> dict`.
+    """
+    global _secret_provider
+    with _secret_provider_lock:
+        _secret_provider = provider
 
-    Returns:
-        dict: A dictionary containing the secret's key-value pairs.
+
+def get_secret_provider():
     """
-    try:
-        # Create a Secret Manager client
-        client = secretmanager.SecretManagerServiceClient()
+    Return the process-wide secret provider, creating it on first use. Secrets are read from the JSON file
+    in the SECRETS_FILE environment variable when set, and from GCP Secret Manager otherwise.
 
-        # Build the resource name of the secret
-        secret_path = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
+    Returns:
+        CachedSecretProvider: The shared provider.
+    """
+    global _secret_provider
+    with _secret_provider_lock:
+        if _secret_provider is None:
+            secrets_file = os.getenv("SECRETS_FILE")
+            provider = FileSecretProvider(secrets_file) if secrets_file else GCPSecretProvider()
+            _secret_provider = CachedSecretProvider(provider)
+        return _secret_provider
 
-        # Fetch the secret
-        response = client.access_secret_version(request={"name": secret_path})
-        secret_json = response.payload.data.decode("UTF-8")  # Decode secret value
 
-        # Parse the JSON secret
-        secret_dict = json.loads(secret_json)
+def get_secret(secret_name: str, project_id: str) -> dict:
+    """
+    Retrieve a secret through the process-wide cached secret provider and parse it as a dictionary.
 
-        return secret_dict
+    Args:
+        secret_name (str): The name of the secret.
+        project_id (str): The GCP project ID.
 
-    except Exception as e:
-        raise RuntimeError(f"Failed to retrieve secret: {e}")
+    Returns:
+        dict: A dictionary containing the secret's key-value pairs.
+    """
+    return get_secret_provider().get(secret_name, project_id)
 
 def store_secret(secret_name:str,project_id:str):
     """
@@ -303,12 +450,12 @@ def store_secret(secret_name:str,project_id:str):
     Returns:
         dict: A dictionary containing the secret's key-value pairs.
     """
-    # Fetch the secret
+    # Fetch the secret (cached for the process)
     secrets = get_secret(secret_name, project_id)
 
-    # Set each secret as an environment variable
+    # Set each secret as an environment variable, skipping values that are already current
     for key, value in secrets.items():
-        os.environ[key] = value  # Store in environment
+        if os.environ.get(key) != value:
+            os.environ[key] = value  # Store in environment
 
     pass
-